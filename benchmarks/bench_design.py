@@ -0,0 +1,49 @@
+"""
+Timing budget of the crossover design: the lowpass and highpass of a crossover point, designed and
+encoded in one batch, as on every encoder step. Portable: also runs on the ESP32
+(import benchmarks.bench_design; benchmarks.bench_design.main()).
+
+    python -m benchmarks.bench_design
+"""
+import sys
+
+from features.crossover.design import BiquadDesigner, ALIGNMENTS
+from features.crossover.service import FREQUENCY_GRID
+from utils.ticks import ticks_us, ticks_diff
+
+N_ROUNDS = 200
+# us per crossover update, best round: an encoder step must leave room for the bus and the display
+BUDGET_US = 3000 if sys.implementation.name == 'micropython' else 200
+
+
+def crossover(alignment, cutoff):
+    return (('highpass', alignment, cutoff, 1), ('lowpass', alignment, cutoff, 1))
+
+
+def best_us(designer, alignment, cutoffs, buffer):
+    best = None
+    for i in range(N_ROUNDS):
+        filters = crossover(alignment, cutoffs[i % len(cutoffs)])
+        start = ticks_us()
+        designer.design_into(filters, buffer)
+        elapsed = ticks_diff(ticks_us(), start)
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def main():
+    cutoffs = [cutoff for start, stop, step in FREQUENCY_GRID for cutoff in range(start, stop, step)]
+    designer = BiquadDesigner()
+    failed = False
+    for alignment in ALIGNMENTS:
+        buffer = bytearray(designer.n_bytes(crossover(alignment, cutoffs[0])))
+        elapsed = best_us(designer, alignment, cutoffs, buffer)
+        over = elapsed > BUDGET_US
+        failed = failed or over
+        print("{:<4} {:>6} us (budget {} us){}".format(alignment, elapsed, BUDGET_US, '  OVER' if over else ''))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
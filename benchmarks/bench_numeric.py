@@ -0,0 +1,66 @@
+"""
+Benchmark of the 5.23 coefficient codec: per-object DspNumber path vs the bulk codec.
+
+    python -m benchmarks.bench_numeric
+"""
+import random
+import time
+from array import array
+
+from external.sigma.sigma_dsp.dsp_processor import DspNumber
+
+N_COEFFICIENTS = 10  # one crossover head: highpass + lowpass biquads
+N_ROUNDS = 2000
+
+
+def encode_per_object(values):
+    return b''.join([DspNumber(v).bytes for v in values])
+
+
+def decode_per_object(buffer):
+    blocks = [buffer[i:i + DspNumber.N_BYTES] for i in range(0, len(buffer), DspNumber.N_BYTES)]
+    return [DspNumber.from_bytes(b).value for b in blocks]
+
+
+def encode_bulk(values, buffer):
+    DspNumber.encode_into(values, buffer)
+    return buffer
+
+
+def decode_bulk(buffer, values):
+    DspNumber.decode_into(buffer, values)
+    return values
+
+
+def timeit(fun, *args, n_rounds=N_ROUNDS):
+    t_start = time.perf_counter()
+    for _ in range(n_rounds):
+        fun(*args)
+    return (time.perf_counter() - t_start) / n_rounds
+
+
+def main():
+    random.seed(0)
+    values = [random.uniform(-2, 2) for _ in range(N_COEFFICIENTS)]
+    buffer = bytearray(N_COEFFICIENTS * DspNumber.N_BYTES)
+    decoded = array('f', bytes(4 * N_COEFFICIENTS))
+
+    encoded = encode_per_object(values)
+    assert bytes(encode_bulk(values, buffer)) == encoded, 'Bulk encoding differs from DspNumber.bytes'
+
+    results = [
+        ('encode per object', timeit(encode_per_object, values)),
+        ('encode bulk', timeit(encode_bulk, values, buffer)),
+        ('decode per object', timeit(decode_per_object, encoded)),
+        ('decode bulk', timeit(decode_bulk, encoded, decoded)),
+    ]
+
+    print(f"{N_COEFFICIENTS} coefficients, {N_ROUNDS} rounds")
+    for name, seconds in results:
+        print(f"{name:<20}{seconds * 1e6:10.1f} us")
+    print(f"encode speedup: {results[0][1] / results[1][1]:.1f}x")
+    print(f"decode speedup: {results[2][1] / results[3][1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark of the ADAU1401 register map: full RegistersMap vs the table-backed CompactRegistersMap,
+on its own and as part of an ADAU1401 boot (virtual bus, no I/O).
+
+    python -m benchmarks.bench_register_map
+"""
+import gc
+import time
+import tracemalloc
+
+from external.sigma.bus.adapters import I2C as SigmaI2C
+from external.sigma.sigma_dsp.adau.adau1401.adau1401 import ADAU1401
+from external.sigma.sigma_dsp.adau.adau1401.compact_map import CompactRegistersMap
+from external.sigma.sigma_dsp.adau.adau1401.register import RegistersMap
+from external.sigma.sigma_dsp.adau.adau1401.registers_map import _get_all_registers
+
+N_ROUNDS = 200
+
+
+def full_map():
+    return RegistersMap(name = 'ADAU1401', description = 'ADAU1401 registers.', registers = _get_all_registers())
+
+
+def compact_map():
+    return CompactRegistersMap()
+
+
+def boot(make_map):
+    return ADAU1401(SigmaI2C(None), registers_map = make_map())
+
+
+def timeit(fun, *args, n_rounds=N_ROUNDS):
+    t_start = time.perf_counter()
+    for _ in range(n_rounds):
+        fun(*args)
+    return (time.perf_counter() - t_start) / n_rounds
+
+
+def retained_bytes(fun, *args):
+    """Heap still held by the result of fun, as seen by tracemalloc."""
+    gc.collect()
+    tracemalloc.start()
+    result = fun(*args)
+    gc.collect()
+    n_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return n_bytes
+
+
+def main():
+    boot(full_map)  # imports and one-time work out of the way
+    boot(compact_map)
+
+    results = [
+        ('map, full', timeit(full_map), retained_bytes(full_map)),
+        ('map, compact', timeit(compact_map), retained_bytes(compact_map)),
+        ('ADAU1401 boot, full map', timeit(boot, full_map), retained_bytes(boot, full_map)),
+        ('ADAU1401 boot, compact map', timeit(boot, compact_map), retained_bytes(boot, compact_map)),
+    ]
+
+    print(f"{N_ROUNDS} rounds")
+    for name, seconds, n_bytes in results:
+        print(f"{name:<30}{seconds * 1e6:10.1f} us{n_bytes:10d} bytes")
+    print(f"map speedup: {results[0][1] / results[1][1]:.1f}x, heap: {results[0][2] / results[1][2]:.1f}x less")
+    print(f"boot speedup: {results[2][1] / results[3][1]:.1f}x, heap: {results[2][2] / results[3][2]:.1f}x less")
+
+
+if __name__ == "__main__":
+    main()
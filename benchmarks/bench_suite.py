@@ -0,0 +1,251 @@
+"""
+Benchmark suite of the encoder-to-DSP hot path, on CPython against the simulated board (simulation/).
+
+For each case: best wall time of the rounds, tracemalloc peak of a round and, for the cases on the bus,
+bytes, transactions and bus time. The run fails if a heap or bus metric, which doesn't vary between runs,
+is more than --exact-tolerance above its baseline. Wall times more than --tolerance above theirs are
+reported as SLOWER but don't fail the run: they follow the load of the host as much as the code.
+
+    python -m benchmarks.bench_suite                    # compare with benchmarks/baselines.json
+    python -m benchmarks.bench_suite --tolerance 1 boot event_to_bus
+    python -m benchmarks.bench_suite --update           # record the results as the new baselines
+
+Wall times depend on the machine: record the baselines on the one the suite runs on.
+"""
+import argparse
+import os
+import random
+import sys
+
+from benchmarks.harness import Case, measure, load_baselines, save_baselines, regressions, slowdowns
+from config import COEFFICIENT_TABLE_PATH
+from external.sigma.bus.adapters import I2C as SigmaI2C
+from external.sigma.sigma_dsp.adau.adau1401.adau1401 import ADAU1401
+from external.sigma.sigma_dsp.messages import Message
+from features.crossover.design import BiquadDesigner, N_BYTES_PER_BIQUAD
+from features.crossover.service import CrossoverService, FREQUENCY_GRID
+from features.display.controller import Display
+from simulation.board import BoardI2C
+from simulation.oled import SSD1306_I2C
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), 'baselines.json')
+TOLERANCE = 0.25  # best of the rounds, reported only
+EXACT_TOLERANCE = 0.05
+EEPROM_SIZE = 0x4000
+
+
+# coefficients ==============================================
+
+def coefficients_setup():
+    cutoffs = [cutoff for start, stop, step in FREQUENCY_GRID for cutoff in range(start, stop, step)]
+    return {'cutoffs': cutoffs, 'idx': 0}
+
+
+def coefficients_run(state):
+    """Design and 5.23 encoding of the two filters of a crossover update in one batch, no cache or table."""
+    cutoff = state['cutoffs'][state['idx'] % len(state['cutoffs'])]
+    state['idx'] += 1
+    alignment = CrossoverService.alignment
+    CrossoverService.designer.design((('highpass', alignment, cutoff, 1), ('lowpass', alignment, cutoff, 1)))
+
+
+def design_lr4_setup():
+    state = coefficients_setup()
+    state['designer'] = BiquadDesigner()
+    state['buffer'] = bytearray(4 * N_BYTES_PER_BIQUAD)
+    return state
+
+
+def design_lr4_run(state):
+    """An LR4 crossover point (four sections, two of them copies) designed into a preallocated buffer."""
+    cutoff = state['cutoffs'][state['idx'] % len(state['cutoffs'])]
+    state['idx'] += 1
+    state['designer'].design_into((('highpass', 'LR4', cutoff, 1), ('lowpass', 'LR4', cutoff, 1)), state['buffer'])
+
+
+# event to bus ==============================================
+
+def app_setup():
+    import main
+    return {'app': main.App(), 'idx': 0}
+
+
+def event_to_bus_setup():
+    state = app_setup()
+    app = state['app']
+    app.event_bus.emit('click')  # menu: open the first crossover
+    app.event_bus.emit('click')  # crossover: edit the filter under the cursor
+    return state
+
+
+def event_to_bus_run(state):
+    """One encoder step, from the event to the safeload of the coefficients on the bus."""
+    app = state['app']
+    app.event_bus.emit('right' if state['idx'] % 2 == 0 else 'left')
+    state['idx'] += 1
+    app.scheduler.flush()
+
+
+def preset_recall_setup():
+    state = app_setup()
+    app = state['app']
+    for _ in app.two_way_crossovers:
+        app.event_bus.emit('right')  # menu: down to the presets
+    app.event_bus.emit('click')
+    return state
+
+
+def preset_recall_run(state):
+    """Recall of a preset that changes every crossover point, from the click to the safeload on the bus."""
+    app = state['app']
+    app.event_bus.emit('right' if state['idx'] % 2 == 0 else 'left')
+    app.event_bus.emit('click')
+    state['idx'] += 1
+    app.scheduler.flush()
+
+
+def app_bus(state):
+    return state['app'].dsp_bus.i2c
+
+
+# boot ======================================================
+
+def boot_setup():
+    return {}
+
+
+def boot_run(state):
+    import main
+    state['app'] = main.App()
+
+
+# multi-DSP dispatch ========================================
+
+DSP_ADDRESSES = (0x34, 0x35)
+
+
+def multi_dsp_setup():
+    i2c = BoardI2C(dsp_addresses=DSP_ADDRESSES)
+    bus = SigmaI2C(i2c)
+    dsps = [ADAU1401(bus, i2c_address=address) for address in DSP_ADDRESSES]
+    return {'i2c': i2c, 'services': [CrossoverService(dsp) for dsp in dsps], 'idx': 0}
+
+
+def multi_dsp_run(state):
+    """Both channels of a crossover moved on two DSPs, committed as one dispatch (interleaved safeloads)."""
+    low, high = (30, 500) if state['idx'] % 2 == 0 else (40, 510)
+    state['idx'] += 1
+    for service in state['services']:
+        service.set_bandpass_cutoff_frequencies(low, high, 1, flush=False)
+        service.set_bandpass_cutoff_frequencies(high, 20000, 11, flush=False)
+    CrossoverService.flush_all([service.dsp for service in state['services']])
+
+
+# eeprom ====================================================
+
+def eeprom_image():
+    """A self-boot image as SigmaStudio writes it: registers, program, parameters, registers, in a 16 KB EEPROM."""
+    rng = random.Random(0)
+    core_control = (0x081C, b'\x00\x1c')
+    head = [core_control, (ADAU1401._ParameterRAM.ADDRESS_MIN, bytes(rng.getrandbits(8) for _ in range(4096))),
+            (ADAU1401._ProgramRAM.ADDRESS_MIN, bytes(rng.getrandbits(8) for _ in range(5120)))]
+    messages = ADAU1401._EEPROM.generate_messages(head, [core_control])
+    image = b''.join(message.bytes for message in messages)
+    return image + b'\xff' * (EEPROM_SIZE - len(image))
+
+
+def eeprom_bytes_setup():
+    return {'image': eeprom_image()}
+
+
+def eeprom_bytes_run(state):
+    Message.messages_from_bytes(state['image'])
+
+
+def eeprom_bus_setup():
+    i2c = BoardI2C()
+    i2c.eeprom.memory[:] = eeprom_image()
+    return {'i2c': i2c, 'dsp': ADAU1401(SigmaI2C(i2c))}
+
+
+def eeprom_bus_run(state):
+    """The messages of the image, read and parsed in chunks through the bus."""
+    state['dsp'].eeprom.messages
+
+
+# display ===================================================
+
+FRAMES = ('> Xover-R\n  Xover-L', '  Xover-R\n> Xover-L',
+          'Xover-R\n> C LP  500 Hz\n  C HP   30 Hz', 'Xover-R\n> C LP  510 Hz\n  C HP   30 Hz')
+
+
+def display_setup():
+    i2c = BoardI2C()
+    oled = SSD1306_I2C(128, 64, i2c, addr=0x3C, external_vcc=False)
+    return {'i2c': i2c, 'display': Display(oled=oled, device='oled')}
+
+
+def display_run(state):
+    """Drawing the frames of a menu move and a frequency step, each followed by its changed pages."""
+    for frame in FRAMES:
+        state['display'].show(frame)
+
+
+def state_bus(state):
+    return state['i2c']
+
+
+CASES = (
+    Case('coefficients', coefficients_run, coefficients_setup, n_rounds=2000),
+    Case('design_lr4', design_lr4_run, design_lr4_setup, n_rounds=2000),
+    Case('event_to_bus', event_to_bus_run, event_to_bus_setup, app_bus, n_rounds=200),
+    Case('preset_recall', preset_recall_run, preset_recall_setup, app_bus, n_rounds=200),
+    Case('multi_dsp_dispatch', multi_dsp_run, multi_dsp_setup, state_bus, n_rounds=200),
+    Case('boot', boot_run, boot_setup, lambda state: state['app'].dsp_bus.i2c, n_rounds=10),
+    Case('eeprom_parse_bytes', eeprom_bytes_run, eeprom_bytes_setup, n_rounds=200),
+    Case('eeprom_parse_bus', eeprom_bus_run, eeprom_bus_setup, state_bus, n_rounds=50),
+    Case('display_frame', display_run, display_setup, state_bus, n_rounds=200),
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--baselines', default=BASELINES_PATH)
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help='increase of wall times reported as slower, e.g. 0.5 for 50%%')
+    parser.add_argument('--exact-tolerance', type=float, default=EXACT_TOLERANCE,
+                        help='allowed increase of heap and bus metrics')
+    parser.add_argument('--update', action='store_true', help='save the results as the baselines')
+    parser.add_argument('--rounds', type=int, default=None, help='rounds per case, instead of each case\'s own')
+    parser.add_argument('cases', nargs='*', help='names of the cases to run, all by default')
+    args = parser.parse_args(argv)
+
+    CrossoverService.load_coefficient_table(COEFFICIENT_TABLE_PATH)
+    baselines = load_baselines(args.baselines)
+    results = {}
+
+    print(f"{'case':<20}{'wall us':>12}{'peak bytes':>12}{'bus bytes':>11}{'bus txs':>9}{'bus us':>10}")
+    for case in CASES:
+        if args.cases and case.name not in args.cases:
+            continue
+        result = results[case.name] = measure(case, args.rounds)
+        print(f"{case.name:<20}{result['wall_us']:>12.1f}{result['alloc_peak_bytes']:>12d}"
+              f"{result.get('bus_bytes', ''):>11}{result.get('bus_transactions', ''):>9}{result.get('bus_us', ''):>10}")
+
+    if args.update:
+        save_baselines(args.baselines, {**baselines, **results})
+        print(f"baselines saved to {args.baselines}")
+        return 0
+
+    for name, metric, baseline, value in slowdowns(results, baselines, args.tolerance):
+        print(f"SLOWER {name}.{metric}: {value}, baseline {baseline}")
+    found = regressions(results, baselines, args.exact_tolerance)
+    for name, metric, baseline, value in found:
+        print(f"REGRESSION {name}.{metric}: {value}, baseline {baseline}")
+    if not baselines:
+        print("no baselines yet, run with --update to record them")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Measurement and baseline checks shared by the benchmark suite.
+
+A case is measured for wall time (best of the rounds, the least disturbed by the machine), heap (tracemalloc peak of one round) and,
+when it drives a simulated I2C bus, the bytes, transactions and bus time of one round.
+"""
+import contextlib
+import gc
+import json
+import os
+import time
+import tracemalloc
+
+METRICS = ('wall_us', 'alloc_peak_bytes', 'bus_bytes', 'bus_transactions', 'bus_us')
+TIMING_METRICS = ('wall_us',)  # the others are deterministic on the simulated board
+
+
+class Case:
+    """
+    A benchmarked path. setup() returns the state run(state) takes; bus(state), if given, returns the
+    simulation.i2c.MemoryI2C the path talks to.
+    """
+
+    def __init__(self, name, run, setup=None, bus=None, n_rounds=100):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.bus = bus
+        self.n_rounds = n_rounds
+
+
+@contextlib.contextmanager
+def quiet():
+    """The app prints events and boot reports; keep them out of the results."""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def measure(case, n_rounds=None):
+    n_rounds = case.n_rounds if n_rounds is None else n_rounds
+    with quiet():
+        state = case.setup() if case.setup else None
+        case.run(state)  # imports, caches and one-time work out of the way
+
+        times = []
+        for _ in range(n_rounds):
+            t_start = time.perf_counter_ns()
+            case.run(state)
+            times.append(time.perf_counter_ns() - t_start)
+
+        bus = case.bus(state) if case.bus else None
+        if bus is not None:
+            bus.reset_counters()
+        gc.collect()
+        tracemalloc.start()
+        case.run(state)
+        alloc_peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        if case.bus:
+            bus = case.bus(state)  # a bus created by the round itself (boot) counted from its creation
+
+    result = {'wall_us': round(min(times) / 1000, 1), 'alloc_peak_bytes': alloc_peak_bytes}
+    if bus is not None:
+        result['bus_bytes'] = bus.n_bytes_written + bus.n_bytes_read
+        result['bus_transactions'] = bus.n_writes + bus.n_reads
+        result['bus_us'] = round(bus.bus_us, 1)
+    return result
+
+
+def load_baselines(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except OSError:
+        return {}
+
+
+def save_baselines(path, results):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def _above(results, baselines, metrics, tolerance):
+    found = []
+    for name, result in results.items():
+        baseline = baselines.get(name, {})
+        for metric in metrics:
+            if metric in result and metric in baseline and result[metric] > baseline[metric] * (1 + tolerance):
+                found.append((name, metric, baseline[metric], result[metric]))
+    return found
+
+
+def regressions(results, baselines, exact_tolerance):
+    """
+    [(case, metric, baseline, value)] of the heap and bus metrics above their baseline by more than
+    exact_tolerance. These don't vary between runs, so an increase comes from the code.
+    """
+    return _above(results, baselines, [metric for metric in METRICS if metric not in TIMING_METRICS],
+                  exact_tolerance)
+
+
+def slowdowns(results, baselines, tolerance):
+    """
+    [(case, metric, baseline, value)] of the wall times above their baseline by more than tolerance.
+    Only reported: wall times follow the load of the host as much as the code.
+    """
+    return _above(results, baselines, TIMING_METRICS, tolerance)
@@ -8,4 +8,17 @@ ROTARY_ENCODER_CLK_PIN=12
 ROTARY_ENCODER_DT_PIN=13
 ROTARY_ENCODER_SW_PIN=26
 BACK_BUTTON_PIN=25
-I2C_FREQ=400000
\ No newline at end of file
+I2C_FREQ=400000
+COEFFICIENT_TABLE_PATH="params/coefficients.bin"
+PARAMS_SOURCE_PATH="params/dsp_params.params"
+PARAMS_IMAGE_PATH="params/params.bin"
+TRACE_BUS=False
+TRACE_PATH="bus_trace.bin"
+PRESETS_SOURCE_PATH="params/presets.json"
+PRESETS_PATH="params/presets.bin"
+DSP_ADDRESSES=(0x34,)  # 7-bit I2C addresses of the ADAU1401s on the DSP bus, all running the program of PARAMS_IMAGE_PATH
+# Crossovers, in menu order: (name, 2-way crossover cell of the parameters file, channel names, index in DSP_ADDRESSES)
+CROSSOVERS=(
+    ("Xover-R", "Crossover1", ("A", "B"), 0),
+    ("Xover-L", "Crossover1_2", ("C", "D"), 0),
+)
@@ -226,11 +226,22 @@ SHIFT_DATA = 4
 
 
 class I2cLcd(LcdApi):
-    """Implements a HD44780 character LCD connected via PCF8574 on I2C."""
+    """Implements a HD44780 character LCD connected via PCF8574 on I2C.
+
+    Keeps a shadow of the characters on screen: show() rewrites only the ones that
+    changed, packing the E-strobe nibble sequence of a whole run into one I2C write.
+    """
+
+    N_BYTES_PER_TRANSFER = 4  # high nibble with E, high nibble, low nibble with E, low nibble
+    MERGE_GAP_CHARS = 1  # unchanged characters worth resending rather than moving the cursor
 
     def __init__(self, i2c, i2c_addr, num_lines, num_columns):
         self.i2c = i2c
         self.i2c_addr = i2c_addr
+        self._transfer = bytearray(self.N_BYTES_PER_TRANSFER)  # a single command or character
+        self._run = bytearray(self.N_BYTES_PER_TRANSFER * (1 + min(num_columns, 40)))  # DDRAM address + a line
+        self._run_view = memoryview(self._run)
+        self.last_show_bytes = 0
         self.i2c.writeto(self.i2c_addr, bytes([0x00]))  # Inicializa o PCF8574
         time.sleep(0.020)  # Aguarda o tempo de inicialização do LCD
         # Envia o reset 3 vezes
@@ -270,28 +281,95 @@ class I2cLcd(LcdApi):
         """Aguarda por um tempo em microsegundos."""
         time.sleep(usecs / 1000000)
 
+    def _pack(self, buffer, offset, value, rs):
+        """Empacota os quatro bytes do PCF8574 que transferem value ao LCD, a partir de offset."""
+        byte = (rs |
+                (self.backlight << SHIFT_BACKLIGHT) |
+                (((value >> 4) & 0x0f) << SHIFT_DATA))
+        buffer[offset] = byte | MASK_E
+        buffer[offset + 1] = byte
+        byte = (rs |
+                (self.backlight << SHIFT_BACKLIGHT) |
+                ((value & 0x0f) << SHIFT_DATA))
+        buffer[offset + 2] = byte | MASK_E
+        buffer[offset + 3] = byte
+
     def hal_write_command(self, cmd):
         """Escreve um comando no LCD."""
-        byte = ((self.backlight << SHIFT_BACKLIGHT) |
-                (((cmd >> 4) & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
-        byte = ((self.backlight << SHIFT_BACKLIGHT) |
-                ((cmd & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
+        self._pack(self._transfer, 0, cmd, self.LCD_RS_CMD)
+        self.i2c.writeto(self.i2c_addr, self._transfer)
         if cmd <= 3:
             time.sleep(0.005)  # Delay necessário para comandos 'home' e 'clear'
 
     def hal_write_data(self, data):
         """Escreve dados no LCD."""
-        byte = (MASK_RS |
-                (self.backlight << SHIFT_BACKLIGHT) |
-                (((data >> 4) & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
-        byte = (MASK_RS |
-                (self.backlight << SHIFT_BACKLIGHT) |
-                ((data & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytes([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytes([byte]))
+        self._pack(self._transfer, 0, data, MASK_RS)
+        self.i2c.writeto(self.i2c_addr, self._transfer)
+
+    def clear(self):
+        """Limpa o LCD e a cópia dos caracteres na tela."""
+        LcdApi.clear(self)
+        self._shadow = bytearray(b' ' * (self.num_lines * self.num_columns))
+
+    def putchar(self, char):
+        """Escreve um caractere, mantendo a cópia da tela em dia."""
+        if char != '\n' and self.cursor_x < self.num_columns:
+            self._shadow[self.cursor_y * self.num_columns + self.cursor_x] = ord(char) & 0xff
+        LcdApi.putchar(self, char)
+
+    def _changed_runs(self, line, y):
+        """Trechos de colunas (x0, x1) da linha y cujos caracteres diferem da cópia da tela."""
+        start = y * self.num_columns
+        runs = []
+        x0 = x1 = -1
+        for x in range(self.num_columns):
+            if line[x] != self._shadow[start + x]:
+                if x0 < 0:
+                    x0 = x
+                elif x - x1 - 1 > self.MERGE_GAP_CHARS:
+                    runs.append((x0, x1))
+                    x0 = x
+                x1 = x
+        if x0 >= 0:
+            runs.append((x0, x1))
+        return runs
+
+    def show(self, content):
+        """Mostra content (linhas separadas por '\n') escrevendo só os caracteres que mudaram.
+
+        Cada trecho alterado é uma única escrita I2C: endereço DDRAM seguido dos
+        caracteres. Sem clear nem home, portanto sem as esperas de 5 ms.
+        Retorna o número de bytes escritos.
+        """
+        lines = content.split('\n')
+        n_bytes = 0
+        for y in range(self.num_lines):
+            text = lines[y] if y < len(lines) else ''
+            line = bytes(ord(c) if ord(c) < 256 else 0x3f for c in text[:self.num_columns])
+            line += b' ' * (self.num_columns - len(line))
+
+            for x0, x1 in self._changed_runs(line, y):
+                n = self.N_BYTES_PER_TRANSFER
+                self._pack(self._run, 0, self.LCD_DDRAM | self._ddram_address(x0, y), self.LCD_RS_CMD)
+                for x in range(x0, x1 + 1):
+                    self._pack(self._run, n, line[x], MASK_RS)
+                    n += self.N_BYTES_PER_TRANSFER
+                self.i2c.writeto(self.i2c_addr, self._run_view[:n])
+                n_bytes += n
+
+                start = y * self.num_columns
+                self._shadow[start + x0: start + x1 + 1] = line[x0: x1 + 1]
+                self.cursor_x = x1 + 1
+                self.cursor_y = y
+
+        self.last_show_bytes = n_bytes
+        return n_bytes
+
+    def _ddram_address(self, cursor_x, cursor_y):
+        """Endereço DDRAM de uma posição, como em move_to."""
+        addr = cursor_x & 0x3f
+        if cursor_y & 1:
+            addr += 0x40    # Lines 1 & 3 add 0x40
+        if cursor_y & 2:    # Lines 2 & 3 add number of columns
+            addr += self.num_columns
+        return addr
@@ -18,6 +18,7 @@ VIRTUAL_DEVICE_WARNING = '\n****** Virtual device. Data may not be real ! ******
 
 class Bus:
     DEBUG_MODE = False
+    tracer = None  # bus.trace.BusTracer, set by its attach().
 
 
     def __init__(self, bus):
@@ -49,10 +50,10 @@ class I2C(Bus):  # transform MicroPython, FTDI I2C objects into unified interfac
 
 
     def __init__(self, i2c, n_sub_address_bytes = N_SUB_ADDRESS_BYTES):
-        super().__init__(bus = i2c)
-
         self.n_sub_address_bytes = n_sub_address_bytes
 
+        super().__init__(bus = i2c)
+
 
     def init(self):
         if IS_RPi:
@@ -62,6 +63,27 @@ class I2C(Bus):  # transform MicroPython, FTDI I2C objects into unified interfac
             self._read_bytes = self._bus.readfrom
             self._write_bytes = self._bus.writeto
 
+            # zero-copy paths of machine.I2C / SoftI2C, None if the bus object doesn't have them.
+            self._writeto_mem = getattr(self._bus, 'writeto_mem', None)
+            self._readfrom_mem_into = getattr(self._bus, 'readfrom_mem_into', None)
+            self._readfrom_into = getattr(self._bus, 'readfrom_into', None)
+            self._writevto = getattr(self._bus, 'writevto', None)
+
+            # reused for every transaction: the sub address header and the [header, payload] vector.
+            self._header = bytearray(self.n_sub_address_bytes)
+            self._vector = [self._header, b'']
+
+
+    def _sub_address_header(self, sub_address, n_sub_address_bytes):
+        header = self._header
+        if n_sub_address_bytes != len(header):
+            return sub_address.to_bytes(n_sub_address_bytes, 'big')
+
+        for i in range(n_sub_address_bytes - 1, -1, -1):
+            header[i] = sub_address & 0xFF
+            sub_address >>= 8
+        return header
+
 
     def read_bytes(self, i2c_address, n_bytes):
         if not self.is_virtual_device:
@@ -69,11 +91,25 @@ class I2C(Bus):  # transform MicroPython, FTDI I2C objects into unified interfac
 
 
     def read_addressed_bytes(self, i2c_address, sub_address, n_bytes, n_sub_address_bytes = None, stop = False):
+        if not self.is_virtual_device:
+            return self.read_addressed_into(i2c_address, sub_address, bytearray(n_bytes), n_sub_address_bytes, stop)
+
+
+    def read_addressed_into(self, i2c_address, sub_address, buffer, n_sub_address_bytes = None, stop = False):
+        """Read len(buffer) bytes from sub_address into buffer (bytearray or memoryview), returns buffer."""
         if not self.is_virtual_device:
             n_sub_address_bytes = self.n_sub_address_bytes if n_sub_address_bytes is None else n_sub_address_bytes
 
-            self._write_bytes(i2c_address, sub_address.to_bytes(n_sub_address_bytes, 'big'), stop)
-            return self.read_bytes(i2c_address, n_bytes)
+            if self._readfrom_mem_into is not None:
+                self._readfrom_mem_into(i2c_address, sub_address, buffer, addrsize = n_sub_address_bytes * 8)
+                return buffer
+
+            self._write_bytes(i2c_address, self._sub_address_header(sub_address, n_sub_address_bytes), stop)
+            if self._readfrom_into is not None:
+                self._readfrom_into(i2c_address, buffer)
+            else:
+                buffer[:] = self.read_bytes(i2c_address, len(buffer))
+            return buffer
 
 
     def write_bytes(self, i2c_address, bytes_array):
@@ -85,5 +121,27 @@ class I2C(Bus):  # transform MicroPython, FTDI I2C objects into unified interfac
         if not self.is_virtual_device:
             n_sub_address_bytes = self.n_sub_address_bytes if n_sub_address_bytes is None else n_sub_address_bytes
 
-            return self.write_bytes(i2c_address = i2c_address,
-                                    bytes_array = sub_address.to_bytes(n_sub_address_bytes, 'big') + bytes_array)
+            # header and payload go out in one transaction without being concatenated.
+            if self._writeto_mem is not None:
+                return self._writeto_mem(i2c_address, sub_address, bytes_array, addrsize = n_sub_address_bytes * 8)
+
+            header = self._sub_address_header(sub_address, n_sub_address_bytes)
+            if self._writevto is not None:
+                vector = self._vector
+                vector[0] = header
+                vector[1] = bytes_array
+                return self._writevto(i2c_address, vector)
+
+            return self.write_bytes(i2c_address = i2c_address, bytes_array = bytes(header) + bytes(bytes_array))
+
+
+    def probe(self, i2c_address):
+        # the address alone, no data: a device acknowledges it unless busy, e.g. an EEPROM in its write cycle.
+        if self.is_virtual_device:
+            return True
+
+        try:
+            self._write_bytes(i2c_address, b'')
+            return True
+        except OSError:  # NACK
+            return False
@@ -0,0 +1,323 @@
+import struct
+from array import array
+
+from utils.ticks import ticks_us, ticks_diff
+
+
+
+OP_READ = 0
+OP_WRITE = 1
+OP_PROBE = 2
+OPERATIONS = ('read', 'write', 'probe')
+
+
+
+class BusTracer:
+    """
+    Bus transactions statistics, in buffers allocated once: recording a transaction allocates nothing.
+
+    Per device (I2C address), operation and action: count, bytes, total and max latency.
+    Per device and operation: a latency histogram, bucket k holding latencies below 2 ** (k + 5) us.
+    The last N_EVENTS transactions are kept in a ring, for dump().
+
+    The action is a tag set by the code driving the bus, e.g. 'safeload', 'crossover update', 'display flush':
+    set_action() (what ADAU._action calls) lasts until the next one; tag() or begin() / end() scope a
+    higher level action, which the set_action() calls within don't override.
+    """
+    MAGIC = b'BTRC'
+    VERSION = 1
+
+    N_DEVICES = 4
+    N_ACTIONS = 12  # action 0: untagged, the last one: everything past the table.
+    N_BUCKETS = 12
+    N_EVENTS = 128
+    EVENT_FORMAT = '<IIHBBB'  # start us, latency us, bytes, I2C address, operation, action
+    EVENT_SIZE = struct.calcsize(EVENT_FORMAT)
+
+
+    def __init__(self):
+        n_cells = self.N_DEVICES * len(OPERATIONS) * self.N_ACTIONS
+
+        self.devices = []  # I2C addresses, in order of first transaction
+        self.actions = ['']
+        self.action = 0
+        self._n_scopes = 0
+
+        self.counts = array('I', [0] * n_cells)
+        self.bytes = array('I', [0] * n_cells)
+        self.total_us = array('Q', [0] * n_cells)  # 32 bits wrap after 71 minutes of bus time.
+        self.max_us = array('I', [0] * n_cells)
+        self.histograms = array('I', [0] * (self.N_DEVICES * len(OPERATIONS) * self.N_BUCKETS))
+
+        self.events = bytearray(self.N_EVENTS * self.EVENT_SIZE)
+        self.n_events = 0
+
+
+    # actions ==========================================
+
+    def _action_index(self, name):
+        try:
+            return self.actions.index(name)
+        except ValueError:
+            if len(self.actions) < self.N_ACTIONS - 1:
+                self.actions.append(name)
+                return len(self.actions) - 1
+            return self.N_ACTIONS - 1  # 'other'
+
+
+    def set_action(self, name):
+        """Tag the next transactions with name, unless within begin() / end()."""
+        if not self._n_scopes:
+            self.action = self._action_index(name)
+
+
+    def begin(self, name):
+        """Tag the transactions with name until end(). Returns what end() takes."""
+        previous = self.action
+        self.action = self._action_index(name)
+        self._n_scopes += 1
+        return previous
+
+
+    def end(self, previous):
+        self._n_scopes -= 1
+        self.action = previous
+
+
+    def tag(self, name):
+        """with tracer.tag('crossover update'): ... -- begin() and end() as a context manager."""
+        return _Tag(self, name)
+
+
+    def action_name(self, idx):
+        return self.actions[idx] if idx < len(self.actions) else 'other'
+
+
+    # recording ========================================
+
+    def _device_slot(self, i2c_address):
+        devices = self.devices
+        for slot in range(len(devices)):
+            if devices[slot] == i2c_address:
+                return slot
+
+        if len(devices) < self.N_DEVICES:
+            devices.append(i2c_address)
+            return len(devices) - 1
+        return self.N_DEVICES - 1
+
+
+    def record(self, i2c_address, op, n_bytes, start_us):
+        latency_us = ticks_diff(ticks_us(), start_us)
+        slot = self._device_slot(i2c_address)
+
+        cell = (slot * len(OPERATIONS) + op) * self.N_ACTIONS + self.action
+        self.counts[cell] += 1
+        self.bytes[cell] += n_bytes
+        self.total_us[cell] += latency_us
+        if latency_us > self.max_us[cell]:
+            self.max_us[cell] = latency_us
+
+        bucket = 0
+        value = latency_us >> 5
+        while value and bucket < self.N_BUCKETS - 1:
+            value >>= 1
+            bucket += 1
+        self.histograms[(slot * len(OPERATIONS) + op) * self.N_BUCKETS + bucket] += 1
+
+        struct.pack_into(self.EVENT_FORMAT, self.events, (self.n_events % self.N_EVENTS) * self.EVENT_SIZE,
+                         start_us & 0xFFFFFFFF, latency_us, min(n_bytes, 0xFFFF), i2c_address & 0xFF, op, self.action)
+        self.n_events += 1
+
+
+    def _stats(self):
+        return self.counts, self.bytes, self.total_us, self.max_us, self.histograms
+
+
+    def reset(self):
+        for buffer in self._stats():
+            for i in range(len(buffer)):
+                buffer[i] = 0
+        self.n_events = 0
+
+
+    # attaching ========================================
+
+    def attach(self, bus):
+        """Trace a sigma bus adapter (bus.adapters.I2C): its bound methods are wrapped on the instance."""
+        read_into = bus.read_addressed_into
+        write = bus.write_addressed_bytes
+        probe = bus.probe
+        tracer = self
+
+        def read_addressed_into(i2c_address, sub_address, buffer, *args, **kwargs):
+            start_us = ticks_us()
+            result = read_into(i2c_address, sub_address, buffer, *args, **kwargs)
+            tracer.record(i2c_address, OP_READ, len(buffer), start_us)
+            return result
+
+        def write_addressed_bytes(i2c_address, sub_address, bytes_array, *args, **kwargs):
+            start_us = ticks_us()
+            result = write(i2c_address, sub_address, bytes_array, *args, **kwargs)
+            tracer.record(i2c_address, OP_WRITE, len(bytes_array), start_us)
+            return result
+
+        def traced_probe(i2c_address):
+            start_us = ticks_us()
+            result = probe(i2c_address)
+            tracer.record(i2c_address, OP_PROBE, 0, start_us)
+            return result
+
+        bus.read_addressed_into = read_addressed_into
+        bus.write_addressed_bytes = write_addressed_bytes
+        bus.probe = traced_probe
+        bus.tracer = self
+        return bus
+
+
+    def attach_i2c(self, i2c):
+        """Trace an object with the machine.I2C interface (a Python one: native objects take no attributes)."""
+        tracer = self
+
+        def wrap(name, op, size):
+            method = getattr(i2c, name, None)
+            if method is None:
+                return
+
+            def traced(addr, *args, **kwargs):
+                start_us = ticks_us()
+                result = method(addr, *args, **kwargs)
+                tracer.record(addr, op, size(args), start_us)
+                return result
+
+            setattr(i2c, name, traced)
+
+        wrap('writeto', OP_WRITE, lambda args: len(args[0]))
+        wrap('writevto', OP_WRITE, lambda args: sum(len(buf) for buf in args[0]))
+        wrap('readfrom', OP_READ, lambda args: args[0])
+        wrap('readfrom_into', OP_READ, lambda args: len(args[0]))
+        wrap('writeto_mem', OP_WRITE, lambda args: len(args[1]))
+        wrap('readfrom_mem_into', OP_READ, lambda args: len(args[1]))
+        return i2c
+
+
+    # queries ==========================================
+
+    def summary(self):
+        """[(address, operation, action, count, bytes, mean us, max us)] of the cells with transactions."""
+        rows = []
+        for slot in range(len(self.devices)):
+            for op in range(len(OPERATIONS)):
+                for action in range(self.N_ACTIONS):
+                    cell = (slot * len(OPERATIONS) + op) * self.N_ACTIONS + action
+                    count = self.counts[cell]
+                    if count:
+                        rows.append((self.devices[slot], OPERATIONS[op], self.action_name(action), count,
+                                     self.bytes[cell], self.total_us[cell] // count, self.max_us[cell]))
+        return rows
+
+
+    def histogram(self, i2c_address, operation = 'write'):
+        """[(upper bound us, count)] of the latencies of a device and operation."""
+        slot = self.devices.index(i2c_address)
+        start = (slot * len(OPERATIONS) + OPERATIONS.index(operation)) * self.N_BUCKETS
+        return [(32 << k, self.histograms[start + k]) for k in range(self.N_BUCKETS)]
+
+
+    def last_events(self):
+        """The transactions still in the ring, oldest first: (start us, latency us, bytes, address, operation, action)."""
+        n = min(self.n_events, self.N_EVENTS)
+        first = self.n_events - n
+        events = []
+        for i in range(first, first + n):
+            start_us, latency_us, n_bytes, address, op, action = struct.unpack_from(
+                self.EVENT_FORMAT, self.events, (i % self.N_EVENTS) * self.EVENT_SIZE)
+            events.append((start_us, latency_us, n_bytes, address, OPERATIONS[op], self.action_name(action)))
+        return events
+
+
+    def print(self):
+        print('{:>7} {:>6} {:<20} {:>8} {:>9} {:>8} {:>8}'.format('address', 'op', 'action', 'count', 'bytes',
+                                                               'mean us', 'max us'))
+        for address, op, action, count, n_bytes, mean_us, max_us in self.summary():
+            print('{:>7} {:>6} {:<20} {:>8} {:>9} {:>8} {:>8}'.format(hex(address), op, action[:20], count, n_bytes,
+                                                                   mean_us, max_us))
+
+
+    # serialization ====================================
+    # header, device addresses, action names (length-prefixed), the statistics arrays (little-endian
+    # uint32, total latencies uint64), then the event ring, oldest first.
+
+    HEADER_FORMAT = '<4sBBBBBBI'  # magic, version, devices, operations, actions, buckets, used actions, events
+    STATS_TYPES = 'IIQII'  # counts, bytes, total_us, max_us, histograms
+
+    def dump(self, path):
+        n = min(self.n_events, self.N_EVENTS)
+        with open(path, 'wb') as f:
+            f.write(struct.pack(self.HEADER_FORMAT, self.MAGIC, self.VERSION, self.N_DEVICES, len(OPERATIONS),
+                                self.N_ACTIONS, self.N_BUCKETS, len(self.actions), n))
+            f.write(bytes(self.devices + [0] * (self.N_DEVICES - len(self.devices))))
+            for name in self.actions:
+                encoded = name.encode()[:255]
+                f.write(bytes([len(encoded)]))
+                f.write(encoded)
+            for type_code, buffer in zip(self.STATS_TYPES, self._stats()):
+                f.write(struct.pack('<{}{}'.format(len(buffer), type_code), *buffer))
+            first = self.n_events - n
+            for i in range(first, first + n):
+                idx = (i % self.N_EVENTS) * self.EVENT_SIZE
+                f.write(self.events[idx: idx + self.EVENT_SIZE])
+
+
+    @classmethod
+    def load(cls, path):
+        """A tracer holding the statistics of a dump(), e.g. to analyse on the host."""
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        header_size = struct.calcsize(cls.HEADER_FORMAT)
+        magic, version, n_devices, n_ops, n_actions, n_buckets, n_used_actions, n_events = \
+            struct.unpack_from(cls.HEADER_FORMAT, data)
+        assert magic == cls.MAGIC and version == cls.VERSION, 'Not a bus trace: {}'.format(path)
+
+        tracer = cls()
+        assert (n_devices, n_ops, n_actions, n_buckets) == (cls.N_DEVICES, len(OPERATIONS), cls.N_ACTIONS,
+                                                           cls.N_BUCKETS), 'Trace of another layout.'
+        offset = header_size
+        tracer.devices = [a for a in data[offset: offset + n_devices] if a]
+        offset += n_devices
+
+        tracer.actions = []
+        for _ in range(n_used_actions):
+            length = data[offset]
+            tracer.actions.append(data[offset + 1: offset + 1 + length].decode())
+            offset += 1 + length
+
+        for type_code, buffer in zip(cls.STATS_TYPES, tracer._stats()):
+            buffer_format = '<{}{}'.format(len(buffer), type_code)
+            values = struct.unpack_from(buffer_format, data, offset)
+            for i, value in enumerate(values):
+                buffer[i] = value
+            offset += struct.calcsize(buffer_format)
+
+        tracer.events[:n_events * cls.EVENT_SIZE] = data[offset: offset + n_events * cls.EVENT_SIZE]
+        tracer.n_events = n_events
+        return tracer
+
+
+
+class _Tag:
+
+    def __init__(self, tracer, name):
+        self._tracer = tracer
+        self._name = name
+        self._previous = 0
+
+
+    def __enter__(self):
+        self._previous = self._tracer.begin(self._name)
+        return self._tracer
+
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._tracer.end(self._previous)
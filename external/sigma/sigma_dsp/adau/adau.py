@@ -1,8 +1,8 @@
 from math import ceil
 
-
 from external.sigma.sigma_dsp import dsp_processor
-from external.sigma.sigma_dsp.messages import Message, MessageWrite
+from external.sigma.sigma_dsp.messages import Message, MessageWrite, Messages
+from utils.ticks import ticks_us, ticks_diff
 
 SAMPLING_FREQ_DEFAULT = 48000
 
@@ -53,6 +53,14 @@ class ADAU(dsp_processor.Device):
                                                           n_bytes = n_bytes)
 
 
+        def read_into(self, buffer, address = None):
+            address = self.ADDRESS_MIN if address is None else address
+
+            return self._parent._bus.read_addressed_into(i2c_address = self._i2c_address,
+                                                         sub_address = address,
+                                                         buffer = buffer)
+
+
         def write(self, bytes_array, address = None):
             address = self.ADDRESS_MIN if address is None else address
 
@@ -109,6 +117,8 @@ class ADAU(dsp_processor.Device):
         N_BYTES = (ADDRESS_MAX - ADDRESS_MIN + 1) * ADDR_INCREMENT
         N_BYTES_PER_PAGE = 32
         N_ADDRESS_BYTES = 2
+        MESSAGES_CHUNK_SIZE = 64  # message headers are parsed from reads of this size.
+        WRITE_CYCLE_MAX_POLLS = 500  # a page write cycle is 5 ms at most, a poll about 50 us at 400 kHz.
 
         INTERFACE_REGISTERS_ADDRESS_MIN = 32
 
@@ -132,15 +142,57 @@ class ADAU(dsp_processor.Device):
                 sub_addr_start = 0
 
 
-        def write(self, bytes_array, address = None):
+        def __init__(self, parent, i2c_address = None):
+            super().__init__(parent, i2c_address)
+
+            self.pages_written = 0
+            self.pages_skipped = 0
+            self.last_pages_written = 0
+            self.n_ack_polls = 0
+
+
+        def write(self, bytes_array, address = None, verify = True):
+            """
+            Differential write: the range is read back in one sequential read and only the pages whose
+            content differs are programmed, each followed by ACK polling and, if verify, a read back.
+            """
+            self._parent._action = 'eeprom write'
             address = self.ADDRESS_MIN if address is None else address
+            current = self.read(len(bytes_array), address)
 
+            self.last_pages_written = 0
+            offset = 0
             for data_bytes, addr in self._get_pages(bytes_array, address):
-                super().write(bytes_array = data_bytes, address = addr)
+                data_bytes = bytes(data_bytes)
+                n_bytes = len(data_bytes)
+
+                if current is not None and bytes(current[offset:offset + n_bytes]) == data_bytes:
+                    self.pages_skipped += 1
+                else:
+                    super().write(bytes_array = data_bytes, address = addr)
+                    self._wait_write_cycle()
+                    if verify:
+                        assert bytes(self.read(n_bytes, addr)) == data_bytes, \
+                            'EEPROM page at 0x{:04X} failed verification.'.format(addr)
+                    self.pages_written += 1
+                    self.last_pages_written += 1
+
+                offset += n_bytes
 
             return len(bytes_array)
 
 
+        def _wait_write_cycle(self):
+            """ACK polling: the EEPROM ignores its address until the internal write cycle is over. Returns the number of polls."""
+            n_polls = 0
+            while not self._parent._bus.probe(self._i2c_address):
+                assert n_polls < self.WRITE_CYCLE_MAX_POLLS, 'EEPROM write cycle not done after {} polls.'.format(n_polls)
+                n_polls += 1
+
+            self.n_ack_polls += n_polls
+            return n_polls
+
+
         @property
         def bytes(self):
             return self.messages.bytes
@@ -150,7 +202,13 @@ class ADAU(dsp_processor.Device):
 
         @property
         def messages(self):
-            return self._parent.control.messages_from_bytes(self.read(self.N_BYTES))
+            return Messages([message for _, message in self.iter_messages()])
+
+
+        def iter_messages(self, with_data = True, chunk_size = MESSAGES_CHUNK_SIZE):
+            """(offset, message) of the boot image, read in chunks up to its 'End' instead of the whole EEPROM."""
+            return Message.stream(self.read, self.N_BYTES, offset = self.ADDRESS_MIN,
+                                  chunk_size = chunk_size, with_data = with_data)
 
 
         @messages.setter
@@ -180,10 +238,23 @@ class ADAU(dsp_processor.Device):
         N_BYTES_IST_REGISTER = 2
         IST_BIT_IDX = 5
 
+        # the transfer happens at the end of the current audio frame, give it two frames before polling is needed.
+        SAFELOAD_SETTLE_FRAMES = 2
+        SAFELOAD_MAX_POLLS = 50
+
 
         def __init__(self, parent, i2c_address = None):
             super().__init__(parent, i2c_address)
             self._safeload_idx = 0
+            self._safeload_pending = False
+            self._safeload_ticks_us = 0
+            self._ist_buffer = bytearray(self.N_BYTES_IST_REGISTER)  # polled often, read in place.
+
+            # data registers (0x0810~0x0814) are followed by the address registers (0x0815~0x0819),
+            # so a whole IST cycle is written in one burst starting at the first data register.
+            self._safeload_buffer = bytearray(self.N_SAFELOAD_REGISTERS *
+                                              (self.N_BYTES_SAFELOAD_DATA_REGISTERS +
+                                               self.N_BYTES_SAFELOAD_ADDRESS_REGISTERS))
 
 
         @property
@@ -214,6 +285,8 @@ class ADAU(dsp_processor.Device):
 
         # safe load =================================
         def safe_load(self, param_address, data_bytes, send_now = True):
+            self._wait_safeload_done()
+
             n_bytes_pre_pend = self.N_BYTES_SAFELOAD_DATA_REGISTERS - len(data_bytes)
             data_bytes = b''.join([bytes(n_bytes_pre_pend), data_bytes])
             assert len(data_bytes) == self.N_BYTES_SAFELOAD_DATA_REGISTERS
@@ -233,17 +306,110 @@ class ADAU(dsp_processor.Device):
             n_bytes_per_number = self._parent.N_BYTES_PER_PARAMETER
             n_numbers = ceil(len(data_bytes) / n_bytes_per_number)
 
-            for i in range(n_numbers):
-                idx_start = i * n_bytes_per_number
-                self.safe_load(param_address = param_address + idx_start,
-                               data_bytes = data_bytes[:n_bytes_per_number],
-                               send_now = False)
-                data_bytes = data_bytes[n_bytes_per_number:]
+            pairs = [(param_address + i, data_bytes[i * n_bytes_per_number: (i + 1) * n_bytes_per_number])
+                     for i in range(n_numbers)]
+
+            return self.safe_load_batch([pairs])
+
+
+        def safe_load_batch(self, groups):
+            """
+            Safeload any number of (param_address, data_bytes) pairs, filling all the safeload register
+            pairs on every IST cycle. groups: sequences of pairs; a group of up to N_SAFELOAD_REGISTERS pairs
+            (e.g. the 5 coefficients of a biquad) never straddles two IST cycles.
+            Returns the number of bus transactions used.
+            """
+            n_transactions = 0
+            for n in self.safe_load_cycles(groups):
+                n_transactions += n
+            return n_transactions
+
+
+        def safe_load_cycles(self, groups):
+            """
+            safe_load_batch() one IST cycle at a time: yields the number of bus transactions of each, so that
+            the cycles of several DSPs can be interleaved.
+            """
+            cycle = []
+
+            for group in groups:
+                if len(cycle) > 0 and len(cycle) + len(group) > self.N_SAFELOAD_REGISTERS:
+                    self._parent._action = 'safeload'
+                    yield self._safe_load_cycle(cycle)
+                    cycle = []
+
+                for pair in group:
+                    if len(cycle) == self.N_SAFELOAD_REGISTERS:  # group longer than one IST cycle.
+                        self._parent._action = 'safeload'
+                        yield self._safe_load_cycle(cycle)
+                        cycle = []
+                    cycle.append(pair)
+
+            if len(cycle) > 0:
+                self._parent._action = 'safeload'
+                yield self._safe_load_cycle(cycle)
 
-            self.initiate_safeload_transfer()
+
+        def _safe_load_cycle(self, pairs):
+            n_transactions = self._wait_safeload_done()
+
+            n_slots = self.N_SAFELOAD_REGISTERS
+            n_bytes_data = self.N_BYTES_SAFELOAD_DATA_REGISTERS
+            n_bytes_address = self.N_BYTES_SAFELOAD_ADDRESS_REGISTERS
+            ba = self._safeload_buffer
+
+            for i in range(n_slots):
+                # spare slots repeat the last pair, rewriting the same word twice in a frame is harmless.
+                param_address, data_bytes = pairs[min(i, len(pairs) - 1)]
+
+                idx = i * n_bytes_data
+                n_bytes_pre_pend = n_bytes_data - len(data_bytes)
+                for j in range(n_bytes_pre_pend):
+                    ba[idx + j] = 0
+                ba[idx + n_bytes_pre_pend: idx + n_bytes_data] = data_bytes
+
+                idx = n_slots * n_bytes_data + i * n_bytes_address
+                ba[idx: idx + n_bytes_address] = param_address.to_bytes(n_bytes_address, 'big')
+
+            self._parent.write_addressed_bytes(sub_address = self.SAFELOAD_REGISTERS_PAIRS[0][1], bytes_array = ba)
+
+            return n_transactions + 1 + self.initiate_safeload_transfer()
+
+
+        @property
+        def safeload_settle_us(self):
+            return self.SAFELOAD_SETTLE_FRAMES * 1e6 / self._parent.sample_rate
+
+
+        def _safeload_started(self):
+            self._safeload_pending = True
+            self._safeload_ticks_us = ticks_us()
+
+
+        def _safeload_transfer_done(self):
+            ba = self._parent.read_addressed_into(sub_address = self.IST_REGISTER_ADDRESS, buffer = self._ist_buffer)
+            return ba is None or (int.from_bytes(ba, 'big') >> self.IST_BIT_IDX) & 0x01 == 0
+
+
+        def _wait_safeload_done(self):
+            """Wait for the previous IST cycle, polling only when it may still be running. Returns the number of polls."""
+            if not self._safeload_pending:
+                return 0
+
+            self._safeload_pending = False
+            if ticks_diff(ticks_us(), self._safeload_ticks_us) >= self.safeload_settle_us:
+                return 0
+
+            n_polls = 1
+            while not self._safeload_transfer_done():
+                assert n_polls < self.SAFELOAD_MAX_POLLS, 'Safeload transfer not done after {} polls.'.format(n_polls)
+                n_polls += 1
+
+            return n_polls
 
 
         def initiate_safeload_transfer(self):
+            """Returns the number of bus transactions used."""
             address = self.IST_REGISTER_ADDRESS
             n_bytes = self.N_BYTES_IST_REGISTER
 
@@ -251,6 +417,8 @@ class ADAU(dsp_processor.Device):
             ba = (value | (1 << self.IST_BIT_IDX)).to_bytes(n_bytes, 'big')
 
             self._parent.write_addressed_bytes(sub_address = address, bytes_array = ba)
+            self._safeload_started()
+            return 2
 
 
     class _Control(_Base):
@@ -269,6 +437,7 @@ class ADAU(dsp_processor.Device):
         def write_message(self, message):
             if message.message_type == 'Write':
                 self._parent.write_addressed_bytes(sub_address = message.subaddress, bytes_array = message.data)
+                self._parent.invalidate_register_cache()  # may have rewritten control registers.
 
 
         # eeprom operations ===================
@@ -280,9 +449,9 @@ class ADAU(dsp_processor.Device):
 
     def __init__(self, bus, i2c_address = I2C_ADDRESS, sample_rate = None, **kwargs):
 
+        self._bus = bus  # before DeviceBase sets the first _action.
         super().__init__(**kwargs)
 
-        self._bus = bus
         self._i2c_address = i2c_address
         self.sample_rate = self.SAMPLE_RATE if sample_rate is None else sample_rate
 
@@ -298,6 +467,20 @@ class ADAU(dsp_processor.Device):
         # ====================================    
 
 
+    @property
+    def _action(self):
+        return self._action_name
+
+
+    @_action.setter
+    def _action(self, action):
+        # the transactions that follow are counted under this action by a tracer of the bus.
+        self._action_name = action
+        tracer = getattr(self._bus, 'tracer', None)
+        if tracer is not None:
+            tracer.set_action(action)
+
+
     def init(self):
         self._action = 'init'
 
@@ -334,6 +517,10 @@ class ADAU(dsp_processor.Device):
         return self._bus.read_addressed_bytes(self._i2c_address, sub_address, n_bytes, **kwargs)
 
 
+    def read_addressed_into(self, sub_address, buffer, **kwargs):
+        return self._bus.read_addressed_into(self._i2c_address, sub_address, buffer, **kwargs)
+
+
     def write_addressed_bytes(self, sub_address, bytes_array, **kwargs):
         return self._bus.write_addressed_bytes(self._i2c_address, sub_address, bytes_array, **kwargs)
 
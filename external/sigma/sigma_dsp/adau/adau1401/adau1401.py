@@ -2,9 +2,9 @@ import time
 from math import ceil
 
 from external.sigma.sigma_dsp.adau.adau import ADAU, SAMPLING_FREQ_DEFAULT
-from external.sigma.sigma_dsp.adau.adau1401.register import RegistersMap
-from external.sigma.sigma_dsp.adau.adau1401.registers_map import _get_all_registers
-from external.sigma.sigma_dsp.messages import Message, MessageWrite, MessageWrite_SUBADDRESS_SLICE
+from external.sigma.sigma_dsp.adau.adau1401.compact_map import CompactRegistersMap
+from external.sigma.sigma_dsp.messages import Message, MessageWrite, MessageWrite_SUBADDRESS_SLICE, \
+    MessageWrite_DATA_SLICE, MessageWrite_LENGTH_SLICE, MessageWrite_DEVICE_ADDRESS_SUBADDRESS_LENGTH
 
 
 
@@ -32,8 +32,8 @@ class ADAU1701(ADAU):
 
 
         @classmethod
-        def _chunks_to_write(cls, bytes_array, address, n_bytes_per_address = 1):
-            chunk_size = cls.CHUNK_SIZE_WRITE
+        def _chunks_to_write(cls, bytes_array, address, n_bytes_per_address = 1, chunk_size = None):
+            chunk_size = cls.CHUNK_SIZE_WRITE if chunk_size is None else chunk_size
             n_chunks = ceil(len(bytes_array) / chunk_size)
             assert chunk_size % n_bytes_per_address == 0
 
@@ -44,14 +44,20 @@ class ADAU1701(ADAU):
 
 
         def read(self, n_bytes, address = None):
+            return self.read_into(bytearray(n_bytes), address)
+
+
+        def read_into(self, buffer, address = None):
             address = self.ADDRESS_MIN if address is None else address
-            ba = []
+            mv = memoryview(buffer)
+            offset = 0
 
-            for addr, nbytes in self._chunks_to_read(n_bytes, address, self.ADDR_INCREMENT):
-                ba.append(self._parent._bus.read_addressed_bytes(i2c_address = self._i2c_address,
-                                                                 sub_address = addr,
-                                                                 n_bytes = nbytes))
-            return b''.join(ba)
+            for addr, nbytes in self._chunks_to_read(len(buffer), address, self.ADDR_INCREMENT):
+                self._parent._bus.read_addressed_into(i2c_address = self._i2c_address,
+                                                      sub_address = addr,
+                                                      buffer = mv[offset: offset + nbytes])
+                offset += nbytes
+            return buffer
 
 
         def write(self, bytes_array, address = None):
@@ -89,9 +95,19 @@ class ADAU1701(ADAU):
         def find_params_start_address(self, messages = None):
             # avoid accessing self.message (lazy fetch) over TCPi, which may take a long time.
             # it will take 4.6 seconds if access via TCPi.
-            messages = self.messages if messages is None else messages
-            param_message = self._find_message_write(messages, self._parent.parameter_ram.ADDRESS_MIN)
-            self._params_start_address = messages.bytes.find(param_message.data)
+            if messages is not None:
+                # offsets as the parser tracks them, no search of the data in the bytes.
+                offsets_messages = Message.iter_messages(messages.bytes)
+            else:
+                # only the message headers are read.
+                offsets_messages = self.iter_messages(with_data = False)
+
+            # the parameters start right after the write header.
+            self._params_start_address = -1
+            for offset, message in offsets_messages:
+                if message.message_type == 'Write' and message.subaddress == self._parent.parameter_ram.ADDRESS_MIN:
+                    self._params_start_address = offset + MessageWrite_DATA_SLICE.start
+                    break
             return self._params_start_address
 
 
@@ -125,18 +141,24 @@ class ADAU1701(ADAU):
 
 
         def save_as_message(self, address, data_bytes):
-            messages = self.messages
-            message = self._find_message_write(messages, address)
+            # an existing message is rewritten in place, only the pages of its data that changed are written.
+            for offset, message in self.iter_messages(with_data = False):
+                if message.message_type == 'Write' and message.subaddress == address:
+                    assert len(data_bytes) == self._message_data_length(offset)
 
-            if message is not None:
-                assert len(data_bytes) == len(message.data)
-
-                message.data = data_bytes
-                self.write(messages.bytes)
-                return
+                    self.write(bytes_array = data_bytes, address = offset + MessageWrite_DATA_SLICE.start)
+                    return self.last_pages_written
 
+            messages = self.messages
             messages.append(MessageWrite(subaddress = address, data = data_bytes))
             self.write(messages.bytes)
+            return self.last_pages_written
+
+
+        def _message_data_length(self, offset):
+            header = self.read(MessageWrite_DATA_SLICE.start, offset)
+            return int.from_bytes(header[MessageWrite_LENGTH_SLICE.start:MessageWrite_LENGTH_SLICE.stop], 'big') - \
+                   MessageWrite_DEVICE_ADDRESS_SUBADDRESS_LENGTH
 
 
         @classmethod
@@ -167,19 +189,276 @@ class ADAU1701(ADAU):
 
     class _ParameterRAM(ADAU._ParameterRAM, _RAM):
 
-        def safe_loads(self, param_address, data_bytes):
-            assert self.safeload_done, 'Previous safeload is still on going.'
+        # shadow ==============================================================
+        # In-memory copy of the parameter RAM. stage() only touches the shadow and records the words whose
+        # bytes changed; flush() sends them in as few bursts as possible.
+
+        N_WORDS = ADAU._ParameterRAM.ADDRESS_MAX - ADAU._ParameterRAM.ADDRESS_MIN + 1
+        CHUNK_SIZE_FLUSH = 1020  # no USBi in the way, a burst is only limited by the RAM size.
+        CHUNK_SIZE_READ = 1020
+        MERGE_GAP_WORDS = 2  # resending a few known words is cheaper than a new transaction on SoftI2C.
+
+
+        def __init__(self, parent, i2c_address = None):
+            super().__init__(parent, i2c_address)
 
-            super().safe_loads(param_address = param_address, data_bytes = data_bytes)
+            self._shadow = bytearray(self.N_BYTES)
+            self._known = bytearray(self.N_WORDS)  # 1: shadow word is known to match the DSP.
+            self._dirty = bytearray(self.N_WORDS)  # 1: shadow word is waiting for flush(), 2: also starts a group.
+            self._dirty_min = self.N_WORDS
+            self._dirty_max = -1
+
+
+        def write(self, bytes_array, address = None):
+            address = self.ADDRESS_MIN if address is None else address
+
+            super().write(bytes_array = bytes_array, address = address)
+            self._update_shadow(bytes_array, address)
+
+
+        def _update_shadow(self, bytes_array, address):
+            n_bytes_per_word = self.ADDR_INCREMENT
+            idx_word = address - self.ADDRESS_MIN
+            n_words = len(bytes_array) // n_bytes_per_word
+
+            if len(bytes_array) % n_bytes_per_word != 0:  # partial word, DSP content no longer known.
+                n_words += 1
+                for i in range(idx_word, min(idx_word + n_words, self.N_WORDS)):
+                    self._known[i] = 0
+                return
+
+            idx_byte = idx_word * n_bytes_per_word
+            self._shadow[idx_byte: idx_byte + n_words * n_bytes_per_word] = bytes_array
+            for i in range(idx_word, idx_word + n_words):
+                self._known[i] = 1
+                self._dirty[i] = 0
+
+
+        def stage(self, bytes_array, address = None, group_words = None):
+            """
+            Copy words into the shadow, marking only the changed ones dirty. Returns the number of dirty words.
+            group_words: split the words into groups (e.g. 5 for biquads) that a safeload flush keeps in one IST cycle.
+            """
+            address = self.ADDRESS_MIN if address is None else address
+            n_bytes_per_word = self.ADDR_INCREMENT
+            n_words = len(bytes_array) // n_bytes_per_word
+            idx_word = address - self.ADDRESS_MIN
+
+            assert n_words * n_bytes_per_word == len(bytes_array), 'Need whole {}-byte words.'.format(n_bytes_per_word)
+            assert 0 <= idx_word and idx_word + n_words <= self.N_WORDS, 'Out of parameter RAM: {}'.format(address)
+
+            shadow = self._shadow
+            n_changed = 0
+            group_started = False
+
+            for i in range(n_words):
+                word = idx_word + i
+                if group_words is not None and i % group_words == 0:
+                    group_started = False
+                idx_byte = word * n_bytes_per_word
+                idx_src = i * n_bytes_per_word
+
+                if self._known[word] or self._dirty[word]:
+                    for j in range(n_bytes_per_word):
+                        if shadow[idx_byte + j] != bytes_array[idx_src + j]:
+                            break
+                    else:
+                        continue  # same bytes as the DSP (or as the pending write) already has.
+
+                shadow[idx_byte: idx_byte + n_bytes_per_word] = bytes_array[idx_src: idx_src + n_bytes_per_word]
+                self._dirty[word] = 1 if group_started else 2
+                group_started = True
+                self._dirty_min = min(self._dirty_min, word)
+                self._dirty_max = max(self._dirty_max, word)
+                n_changed += 1
+
+            return n_changed
+
+
+        def reconcile(self):
+            """
+            Read back the span of the dirty words in large chunks: words the DSP already holds stop being dirty,
+            the others in the span become known. Returns the number of words read.
+            """
+            if self._dirty_max < 0:
+                return 0
+
+            self._parent._action = 'reconcile'
+            n_bytes_per_word = self.ADDR_INCREMENT
+            start, stop = self._dirty_min, self._dirty_max + 1
+            current = self.read(n_bytes = (stop - start) * n_bytes_per_word, address = start + self.ADDRESS_MIN)
+
+            shadow, dirty, known = self._shadow, self._dirty, self._known
+            self._dirty_min = self.N_WORDS
+            self._dirty_max = -1
+            group_start = False  # a group whose first words turned out clean starts at its next dirty word.
+
+            for word in range(start, stop):
+                idx_byte = word * n_bytes_per_word
+                idx_src = (word - start) * n_bytes_per_word
+                flag = dirty[word]
+
+                if not flag:
+                    shadow[idx_byte: idx_byte + n_bytes_per_word] = current[idx_src: idx_src + n_bytes_per_word]
+                    known[word] = 1
+                    continue
+
+                for j in range(n_bytes_per_word):
+                    if shadow[idx_byte + j] != current[idx_src + j]:
+                        break
+                else:
+                    dirty[word] = 0
+                    known[word] = 1
+                    group_start = group_start or flag == 2
+                    continue
+
+                if group_start:
+                    dirty[word] = 2
+                    group_start = False
+                self._dirty_min = min(self._dirty_min, word)
+                self._dirty_max = word
+
+            return stop - start
+
+
+        def _dirty_ranges(self):
+            """Yield merged (first word, stop word) ranges; gaps are only bridged over words known to the DSP."""
+            dirty, known = self._dirty, self._known
+            start = stop = None
+            word = self._dirty_min
+
+            while word <= self._dirty_max:
+                if dirty[word]:
+                    if start is None:
+                        start = word
+                    elif word - stop > self.MERGE_GAP_WORDS or not all(known[stop: word]):
+                        yield start, stop
+                        start = word
+                    stop = word + 1
+                word += 1
+
+            if start is not None:
+                yield start, stop
+
+
+        def _dirty_groups(self):
+            n_bytes_per_word = self.ADDR_INCREMENT
+            groups = []
+            group = None
+
+            for word in range(self._dirty_min, self._dirty_max + 1):
+                flag = self._dirty[word]
+                if flag:
+                    if flag == 2 or group is None or len(group) == self.N_SAFELOAD_REGISTERS:
+                        group = []
+                        groups.append(group)
+                    idx_byte = word * n_bytes_per_word
+                    group.append((word + self.ADDRESS_MIN, self._shadow[idx_byte: idx_byte + n_bytes_per_word]))
+
+            return groups
+
+
+        def flush(self, safeload = False):
+            """
+            Send the dirty words of the shadow to the DSP. Returns the number of bus transactions.
+            safeload: go through the safeload registers, so every staged group is swapped in within one audio frame.
+            """
+            if safeload:
+                n_transactions = self.safe_load_batch(self._dirty_groups())
+                self._trim_dirty_range()
+                return n_transactions
+
+            self._parent._action = 'parameter flush'
+            n_bytes_per_word = self.ADDR_INCREMENT
+            n_transactions = 0
+
+            shadow = memoryview(self._shadow)
+            for start, stop in self._dirty_ranges():
+                bytes_array = shadow[start * n_bytes_per_word: stop * n_bytes_per_word]
+
+                for addr, data_bytes in self._chunks_to_write(bytes_array, start + self.ADDRESS_MIN,
+                                                              n_bytes_per_word, self.CHUNK_SIZE_FLUSH):
+                    self._parent._bus.write_addressed_bytes(i2c_address = self._i2c_address,
+                                                            sub_address = addr,
+                                                            bytes_array = data_bytes)
+                    n_transactions += 1
+
+                for i in range(start, stop):
+                    self._known[i] = 1
+                    self._dirty[i] = 0
+
+            self._dirty_min = self.N_WORDS
+            self._dirty_max = -1
+            return n_transactions
+
+
+        def flush_cycles(self):
+            """
+            flush(safeload = True) one IST cycle at a time, yielding the bus transactions of each: the cycles of
+            several DSPs interleaved, each DSP's transfer runs while the others are written instead of being polled.
+            Each cycle's words stop being dirty once it is sent: the words of the cycles not sent yet, if the
+            generator is dropped halfway, stay dirty for the next flush.
+            """
+            for n_transactions in self.safe_load_cycles(self._dirty_groups()):
+                yield n_transactions
+
+            self._trim_dirty_range()
+
+
+        def _trim_dirty_range(self):
+            """Shrink the dirty range to the words still dirty, e.g. staged again while their cycle was sent."""
+            dirty = self._dirty
+            while self._dirty_min <= self._dirty_max and not dirty[self._dirty_min]:
+                self._dirty_min += 1
+            while self._dirty_max >= self._dirty_min and not dirty[self._dirty_max]:
+                self._dirty_max -= 1
+
+            if self._dirty_max < self._dirty_min:
+                self._dirty_min = self.N_WORDS
+                self._dirty_max = -1
+
+
+        @property
+        def n_dirty_words(self):
+            dirty = self._dirty
+            return sum(1 for word in range(self._dirty_min, self._dirty_max + 1) if dirty[word])
+
+
+        # safe load =================================
+        def _safe_load_cycle(self, pairs):
+            n_transactions = super()._safe_load_cycle(pairs)
+
+            n_bytes_per_word = self.ADDR_INCREMENT
+            shadow, dirty = self._shadow, self._dirty
+            for param_address, data_bytes in pairs:
+                word = param_address - self.ADDRESS_MIN
+                if dirty[word] and len(data_bytes) == n_bytes_per_word:
+                    idx_byte = word * n_bytes_per_word
+                    for j in range(n_bytes_per_word):
+                        if shadow[idx_byte + j] != data_bytes[j]:
+                            break
+                    else:
+                        self._known[word] = 1
+                        dirty[word] = 0
+                    continue  # staged again since: the newer bytes stay dirty.
+
+                self._update_shadow(data_bytes, param_address)
+
+            return n_transactions
 
 
         def initiate_safeload_transfer(self):
+            # written from the registers map, no read-modify-write of the core control register.
             self._parent._write_element_by_name('IST', 1)
+            # the DSP clears IST by itself, don't let the next core control write start another transfer.
+            self._parent.map.set_element_value('IST', 0)
+            self._safeload_started()
+            return 1
 
 
         @property
         def safeload_done(self):
-            return self._parent._read_element_by_name('IST').value == 0
+            return self._safeload_transfer_done()
 
 
     class _Control(ADAU._Control):
@@ -195,19 +474,21 @@ class ADAU1701(ADAU):
 
 
         def power_up(self):
-            self._parent.reference_clock.power_down_oscillator(False)
-            self.power_down_voltage_reference(False)
-            self._parent.dac.power_down(False)
-            self._parent.adc.power_down(False)
-            self.setup_control_registers(True)
+            with self._parent.register_batch():
+                self._parent.reference_clock.power_down_oscillator(False)
+                self.power_down_voltage_reference(False)
+                self._parent.dac.power_down(False)
+                self._parent.adc.power_down(False)
+                self.setup_control_registers(True)
 
 
         def power_down(self):
-            self.setup_control_registers(False)
-            self._parent.adc.power_down(True)
-            self._parent.dac.power_down(True)
-            self.power_down_voltage_reference(True)
-            self._parent.reference_clock.power_down_oscillator(True)
+            with self._parent.register_batch():
+                self.setup_control_registers(False)
+                self._parent.adc.power_down(True)
+                self._parent.dac.power_down(True)
+                self.power_down_voltage_reference(True)
+                self._parent.reference_clock.power_down_oscillator(True)
 
 
         def setup_control_registers(self, value = True):
@@ -221,8 +502,9 @@ class ADAU1701(ADAU):
 
 
         def mute(self, value = True):
-            self._parent.adc.mute(value)
-            self._parent.dac.mute(value)
+            with self._parent.register_batch():
+                self._parent.adc.mute(value)
+                self._parent.dac.mute(value)
 
 
         # ======================
@@ -728,10 +1010,8 @@ class ADAU1701(ADAU):
                  registers_map = None, registers_values = None,
                  sample_rate = None):
 
-        registers_map = RegistersMap(name = 'ADAU1401',
-                                     description = 'ADAU1401 registers.',
-                                     registers = _get_all_registers()) \
-            if registers_map is None else registers_map
+        # the full RegistersMap (register.py + registers_map.py) can still be passed in, e.g. for descriptions.
+        registers_map = CompactRegistersMap() if registers_map is None else registers_map
 
         self._pin_reset = pin_reset
         self._pin_self_boot = pin_self_boot
@@ -743,33 +1023,47 @@ class ADAU1701(ADAU):
                          registers_map = registers_map, registers_values = registers_values)
 
 
+    # sub-blocks built on first access, see __getattr__.
+    LAZY_BLOCKS = {'adc'                         : '_ADC',
+                   'dac'                         : '_DAC',
+                   'serial_input'                : '_SerialInput',
+                   'serial_output'               : '_SerialOutput',
+                   'interface_registers'         : '_InterfaceRegisters',
+                   'aux_adc'                     : '_AuxADC',
+                   'auxiliary_adc_data_registers': '_AuxiliaryAdcDataRegisters',
+                   'program_ram'                 : '_ProgramRAM',
+                   'reference_clock'             : '_ReferenceClock',
+                   'pll'                         : '_PLL',
+                   'data_capturer'               : '_DataCapturer',
+                   'gpio'                        : '_GPIO'}
+
+
     def _build(self):
         super()._build()
 
         # ====================================
-        self.adc = self._ADC(self)
-        self.dac = self._DAC(self)
-
-        self.serial_input = self._SerialInput(self)
-        self.serial_output = self._SerialOutput(self)
-
-        self.interface_registers = self._InterfaceRegisters(self)
-        self.aux_adc = self._AuxADC(self)
-        self.auxiliary_adc_data_registers = self._AuxiliaryAdcDataRegisters(self)
+        for name in self.LAZY_BLOCKS:  # rebuilt on next access after a reset.
+            try:
+                delattr(self, name)
+            except AttributeError:
+                pass
 
-        self.program_ram = self._ProgramRAM(self)
 
-        self.reference_clock = self._ReferenceClock(self)
-        self.pll = self._PLL(self)
+    def __getattr__(self, name):
+        # only called for attributes not found the normal way: build a lazy sub-block once.
+        class_name = self.LAZY_BLOCKS.get(name)
+        if class_name is None:
+            raise AttributeError(name)
 
-        self.data_capturer = self._DataCapturer(self)
-
-        self.gpio = self._GPIO(self)
+        block = getattr(self, class_name)(self)
+        setattr(self, name, block)
+        return block
 
 
     def init(self):
         self._action = 'init'
         self.map.reset()
+        self.invalidate_register_cache()
 
         self._build()
         self.control.power_up()
@@ -796,6 +1090,7 @@ class ADAU1701(ADAU):
             for level in (1, 0, 1):
                 self._pin_reset.value(level)
                 time.sleep(0.001)
+            self.invalidate_register_cache()
 
 
     # encapsulated hardware functions =======================
@@ -807,26 +1102,81 @@ class ADAU1701(ADAU):
     # hardware related IO========= ======================================
 
     # register related ============================================
+    # interface, GPIO pin, aux ADC data, safeload and data capture registers are changed by the DSP or written
+    # raw, IST in the core control register clears by itself: these always go to the bus.
+    VOLATILE_REGISTERS = range(0x0800, 0x081D)
+
+
     def _read_register(self, register):
-        value = self.read_addressed_bytes(sub_address = register.address, n_bytes = register.n_bytes)
+        address = register.address
+        if self._batch_depth and self._is_batched(register):
+            return register.value  # pending write, the map already holds what the device will.
+
+        if address not in self.VOLATILE_REGISTERS and address in self._register_cache:
+            register.load_value(self._register_cache[address])
+            self.bus_reads_saved += 1
+            return register.value
+
+        value = self.read_addressed_bytes(sub_address = address, n_bytes = register.n_bytes)
         if value:
             register.load_value(int.from_bytes(value, 'big'))
-        self._show_bus_data(register.bytes, address = register.address, reading = True)
+            self._cache_register(register)
+        if self.DEBUG_MODE_SHOW_BUS_DATA:
+            self._show_bus_data(register.bytes, address = address, reading = True)
         self._print_register(register)
         return register.value
 
 
     def _write_register(self, register, reset = False):
-        if register.address not in self.READ_ONLY_REGISTERS:
-            super()._write_register(register, reset = reset)
-            return self.write_addressed_bytes(sub_address = register.address, bytes_array = register.bytes)
+        if register.address in self.READ_ONLY_REGISTERS:
+            return
+        if reset:
+            register.reset()
+
+        if self._batch_depth:
+            return self._batch_write_register(register)
+        if self._is_cached(register):
+            self.bus_writes_saved += 1
+            return
+
+        super()._write_register(register)
+        result = self.write_addressed_bytes(sub_address = register.address,
+                                            bytes_array = register.value.to_bytes(register.n_bytes, 'big'))
+        self._cache_register(register)
+        return result
+
+
+    def _write_registers(self, registers):
+        # consecutive addresses go out as one burst, the sub address auto-increments register by register.
+        runs = []
+        for reg in registers:
+            if reg.address in self.READ_ONLY_REGISTERS:
+                continue
+            if self._is_cached(reg):
+                self.bus_writes_saved += 1
+            elif runs and reg.address == runs[-1][-1].address + 1:
+                runs[-1].append(reg)
+            else:
+                runs.append([reg])
+
+        for run in runs:
+            data = b''.join([reg.value.to_bytes(reg.n_bytes, 'big') for reg in run])
+            self.write_addressed_bytes(sub_address = run[0].address, bytes_array = data)
+            self.bus_writes_saved += len(run) - 1
+            for reg in run:
+                super()._write_register(reg)
+                self._cache_register(reg)
 
 
     # by element's name ===========================================
 
     def _duplicated_element_names_guard(self, element_name):
+        if element_name in self._checked_element_names:
+            return
+
         assert element_name not in self.map.duplicated_element_names, \
             f"More than one elements have the same name {element_name} ."
+        self._checked_element_names.add(element_name)
 
 
     def _read_element_by_name(self, element_name):
@@ -839,7 +1189,6 @@ class ADAU1701(ADAU):
         return super()._write_element_by_name(element_name, value)
 
 
-
 class ADAU1702(ADAU1701):
     class _ProgramRAM(ADAU1701._ProgramRAM):
         ADDRESS_MIN = 0x0400
@@ -0,0 +1,338 @@
+from array import array
+
+from external.sigma.sigma_dsp.adau.adau1401 import registers_table
+
+
+
+class CompactRegistersMap:
+    """
+    Table-backed stand-in for RegistersMap, built from the generated registers_table.
+
+    Register values are kept packed, one integer per register; element values are read and
+    written through precomputed masks and shifts. Register and element objects are small
+    views created on first access, and there are no description strings at runtime.
+    """
+
+    def __init__(self, table = registers_table):
+        self._table = table
+        self.name = table.NAME
+        self.description = None
+        self.duplicated_element_names = table.DUPLICATED_ELEMENT_NAMES
+
+        self._values = array('Q', table.REGISTER_DEFAULTS)
+        self._register_views = [None] * len(table.REGISTER_NAMES)
+        self._element_views = [None] * len(table.ELEMENT_NAMES)
+        self._element_entries = {}
+
+        self.registers = _RegisterIndex(self, table.REGISTER_INDEX)
+        self.registers_by_address = _RegisterIndex(self, table.REGISTER_ADDRESS_INDEX)
+        self.elements = _ElementIndex(self)
+
+
+    # views ==============================================================
+
+    def _register(self, idx):
+        view = self._register_views[idx]
+        if view is None:
+            view = self._register_views[idx] = CompactRegister(self, idx)
+        return view
+
+
+    def _element(self, idx):
+        view = self._element_views[idx]
+        if view is None:
+            view = self._element_views[idx] = CompactElement(self, idx)
+        return view
+
+
+    @property
+    def _registers(self):
+        return [self._register(i) for i in range(len(self._values))]
+
+
+    # packed values ======================================================
+
+    def _element_value(self, idx):
+        r = self._table.ELEMENT_REGISTERS[idx]
+        return (self._values[r] & self._table.ELEMENT_MASKS[idx]) >> self._table.ELEMENT_SHIFTS[idx]
+
+
+    def _set_element_value(self, idx, value):
+        if self._table.ELEMENT_READ_ONLY[idx]:
+            return
+        r = self._table.ELEMENT_REGISTERS[idx]
+        mask = self._table.ELEMENT_MASKS[idx]
+        self._values[r] = (self._values[r] & ~mask) | ((int(value) << self._table.ELEMENT_SHIFTS[idx]) & mask)
+
+
+    def _load_register_value(self, r, value):
+        # element by element, so read-only elements keep their value as in Register.load_value
+        table = self._table
+        for idx in range(table.REGISTER_FIRST_ELEMENTS[r], table.REGISTER_FIRST_ELEMENTS[r + 1]):
+            self._set_element_value(idx, (value & table.ELEMENT_MASKS[idx]) >> table.ELEMENT_SHIFTS[idx])
+
+
+    # RegistersMap interface =============================================
+
+    @property
+    def has_same_name_elements(self):
+        return len(self.duplicated_element_names) > 0
+
+
+    def value_of_element(self, element_name):
+        return self._element_value(self._table.ELEMENT_INDEX[element_name])
+
+
+    def register_address_of_element(self, element_name):
+        return self._table.REGISTER_ADDRESSES[self._table.ELEMENT_REGISTERS[self._table.ELEMENT_INDEX[element_name]]]
+
+
+    def set_element_value(self, element_name, value):
+        idx = self._table.ELEMENT_INDEX[element_name]
+        self._set_element_value(idx, value)
+        return self._register(self._table.ELEMENT_REGISTERS[idx])
+
+
+    def write_element(self, element_name, value):
+        idx = self._table.ELEMENT_INDEX[element_name]
+        self._set_element_value(idx, value)
+        return self._register(self._table.ELEMENT_REGISTERS[idx]), self._element(idx)
+
+
+    @property
+    def values(self):
+        return list(self._values)
+
+
+    @property
+    def address_name_values(self):
+        return sorted(zip(self._table.REGISTER_ADDRESSES, self._table.REGISTER_NAMES, self._values))
+
+
+    @property
+    def addressed_values(self):
+        return sorted(zip(self._table.REGISTER_ADDRESSES, self._values))
+
+
+    def load_values_by_name(self, named_values):
+        for (reg_name, value) in named_values:
+            self._load_register_value(self._table.REGISTER_INDEX[reg_name], value)
+
+
+    def load_values(self, addressed_values):
+        for (address, value) in addressed_values:
+            try:
+                self._load_register_value(self._table.REGISTER_ADDRESS_INDEX[address], value)
+            except KeyError as e:
+                print('There is no register as address {}.'.format(e))
+
+
+    def reset(self):
+        for r in range(len(self._values)):
+            self._load_register_value(r, self._table.REGISTER_DEFAULTS[r])
+
+
+    def print(self, as_hex = False):
+        for register in self._registers:
+            register.print(as_hex = as_hex)
+
+
+
+class _RegisterIndex:
+    # name or address -> register view, like RegistersMap.registers / registers_by_address
+
+    def __init__(self, registers_map, index):
+        self._map = registers_map
+        self._index = index
+
+
+    def __getitem__(self, key):
+        return self._map._register(self._index[key])
+
+
+    def __contains__(self, key):
+        return key in self._index
+
+
+    def __len__(self):
+        return len(self._index)
+
+
+    def keys(self):
+        return self._index.keys()
+
+
+
+class _ElementIndex:
+    # element name -> {'element': ..., 'register': ...}, like RegistersMap.elements
+
+    def __init__(self, registers_map):
+        self._map = registers_map
+
+
+    def __getitem__(self, element_name):
+        entry = self._map._element_entries.get(element_name)
+        if entry is None:
+            idx = self._map._table.ELEMENT_INDEX[element_name]
+            entry = {'element' : self._map._element(idx),
+                     'register': self._map._register(self._map._table.ELEMENT_REGISTERS[idx])}
+            self._map._element_entries[element_name] = entry
+        return entry
+
+
+    def __contains__(self, element_name):
+        return element_name in self._map._table.ELEMENT_INDEX
+
+
+    def keys(self):
+        return self._map._table.ELEMENT_INDEX.keys()
+
+
+
+class CompactRegister:
+    __slots__ = ('_map', '_idx')
+
+
+    def __init__(self, registers_map, idx):
+        self._map = registers_map
+        self._idx = idx
+
+
+    @property
+    def name(self):
+        return self._map._table.REGISTER_NAMES[self._idx]
+
+
+    @property
+    def code_name(self):
+        return self.name
+
+
+    @property
+    def description(self):
+        return None
+
+
+    @property
+    def address(self):
+        return self._map._table.REGISTER_ADDRESSES[self._idx]
+
+
+    @property
+    def default_value(self):
+        return self._map._table.REGISTER_DEFAULTS[self._idx]
+
+
+    @property
+    def _elements(self):
+        table = self._map._table
+        return [self._map._element(i) for i in range(table.REGISTER_FIRST_ELEMENTS[self._idx],
+                                                     table.REGISTER_FIRST_ELEMENTS[self._idx + 1])]
+
+
+    @property
+    def elements(self):
+        return {e.name: e for e in self._elements}
+
+
+    @property
+    def n_bytes(self):
+        return self._map._table.REGISTER_N_BYTES[self._idx]
+
+
+    @property
+    def n_bits(self):
+        return sum([e.n_bits for e in self._elements])
+
+
+    @property
+    def value(self):
+        return self._map._values[self._idx]
+
+
+    @property
+    def bytes(self):
+        return array('B', self.value.to_bytes(self.n_bytes, 'big'))
+
+
+    def load_value(self, value):
+        self._map._load_register_value(self._idx, value)
+
+
+    def reset(self):
+        self.load_value(self.default_value)
+
+
+    def print(self, as_hex = False):
+        elements = self._elements
+        len_name_field = max([len(e.name) for e in elements] + [0])
+        print('\n{:<{}s}:  {}'.format('<< ' + self.name + ' >>', len_name_field + 7,
+                                      (hex(self.value), bin(self.value))))
+        for e in elements:
+            print('{:<{}s}:  {}'.format('[ ' + e.name + ' ]', len_name_field + 5,
+                                        (hex(e.value), bin(e.value)) if as_hex else e.value))
+        return len_name_field
+
+
+
+class CompactElement:
+    __slots__ = ('_map', '_idx')
+
+
+    def __init__(self, registers_map, idx):
+        self._map = registers_map
+        self._idx = idx
+
+
+    @property
+    def name(self):
+        return self._map._table.ELEMENT_NAMES[self._idx]
+
+
+    @property
+    def code_name(self):
+        return self.name
+
+
+    @property
+    def idx_lowest_bit(self):
+        return self._map._table.ELEMENT_SHIFTS[self._idx]
+
+
+    @property
+    def mask(self):
+        return self._map._table.ELEMENT_MASKS[self._idx]
+
+
+    @property
+    def n_bits(self):
+        mask = self.mask >> self.idx_lowest_bit
+        n_bits = 0
+        while mask:
+            mask >>= 1
+            n_bits += 1
+        return n_bits
+
+
+    @property
+    def read_only(self):
+        return bool(self._map._table.ELEMENT_READ_ONLY[self._idx])
+
+
+    @property
+    def value(self):
+        return self._map._element_value(self._idx)
+
+
+    @value.setter
+    def value(self, value):
+        self._map._set_element_value(self._idx, value)
+
+
+    @property
+    def shifted_value(self):
+        return self.value << self.idx_lowest_bit
+
+
+    def load_value(self, value):
+        self.value = (value & self.mask) >> self.idx_lowest_bit
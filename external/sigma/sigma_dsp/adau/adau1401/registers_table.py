@@ -0,0 +1,24 @@
+# Generated by utils/build_register_table.py from registers_map.py. Do not edit.
+from array import array
+
+NAME = 'ADAU1401'
+
+# registers; values wider than 32 bits (safeload data) need the 64-bit type codes
+REGISTER_NAMES = ('Interface Register 0', 'Interface Register 1', 'Interface Register 2', 'Interface Register 3', 'Interface Register 4', 'Interface Register 5', 'Interface Register 6', 'Interface Register 7', 'GPIO Pin Setting', 'Auxiliary ADC Data 0', 'Auxiliary ADC Data 1', 'Auxiliary ADC Data 2', 'Auxiliary ADC Data 3', 'Safeload Registers 0', 'Safeload Registers 1', 'Safeload Registers 2', 'Safeload Registers 3', 'Safeload Registers 4', 'Safeload Address 0', 'Safeload Address 1', 'Safeload Address 2', 'Safeload Address 3', 'Safeload Address 4', 'Data Capture 0', 'Data Capture 1', 'DSP Core Control', 'Serial Output Control', 'Serial Input Control', 'Multipurpose Pin Configuration 0', 'Multipurpose Pin Configuration 1', 'Auxiliary ADC and Power Control', 'Auxiliary ADC Enable', 'Oscillator Power Down', 'DAC Setup')
+REGISTER_ADDRESSES = array('H', [2048, 2049, 2050, 2051, 2052, 2053, 2054, 2055, 2056, 2057, 2058, 2059, 2060, 2064, 2065, 2066, 2067, 2068, 2069, 2070, 2071, 2072, 2073, 2074, 2075, 2076, 2078, 2079, 2080, 2081, 2082, 2084, 2086, 2087])
+REGISTER_N_BYTES = array('B', [4, 4, 4, 4, 4, 4, 4, 4, 2, 2, 2, 2, 2, 5, 5, 5, 5, 5, 2, 2, 2, 2, 2, 2, 2, 2, 2, 1, 3, 3, 2, 2, 2, 2])
+REGISTER_DEFAULTS = array('Q', [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0])
+REGISTER_FIRST_ELEMENTS = array('H', [0, 2, 4, 6, 8, 10, 12, 14, 16, 18, 20, 22, 24, 26, 27, 28, 29, 30, 31, 33, 35, 37, 39, 41, 44, 47, 58, 68, 72, 78, 84, 94, 96, 99, 101])  # register i holds elements [first[i], first[i + 1])
+
+# elements
+ELEMENT_NAMES = ('RSVD', 'IF', 'RSVD', 'IF', 'RSVD', 'IF', 'RSVD', 'IF', 'RSVD', 'IF', 'RSVD', 'IF', 'RSVD', 'IF', 'RSVD', 'IF', 'RSVD', 'MP', 'RSVD', 'AA', 'RSVD', 'AA', 'RSVD', 'AA', 'RSVD', 'AA', 'SD', 'SD', 'SD', 'SD', 'SD', 'RSVD', 'SA', 'RSVD', 'SA', 'RSVD', 'SA', 'RSVD', 'SA', 'RSVD', 'SA', 'RSVD', 'PC', 'RS', 'RSVD', 'PC', 'RS', 'RSVD_1', 'GD', 'RSVD_0', 'AACW', 'GPCW', 'IFCW', 'IST', 'ADM', 'DAM', 'CR', 'SR', 'RSVD', 'OLRP', 'OBP', 'M_S', 'OBF', 'OLF', 'FST', 'TDM', 'MSB', 'OWL', 'RSVD', 'ILP', 'IBP', 'M', 'MP_0', 'MP_1', 'MP_2', 'MP_3', 'MP_4', 'MP_5', 'MP_6', 'MP_7', 'MP_8', 'MP_9', 'MP_10', 'MP_11', 'RSVD_1', 'FIL', 'AAPD', 'VBPD', 'VRPD', 'RSVD_0', 'D0PD', 'D1PD', 'D2PD', 'D3PD', 'AAEN', 'RSVD', 'RSVD_1', 'OPD', 'RSVD_0', 'RSVD', 'DS')
+ELEMENT_SHIFTS = array('B', [28, 0, 28, 0, 28, 0, 28, 0, 28, 0, 28, 0, 28, 0, 28, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 0, 0, 0, 0, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 0, 12, 2, 0, 12, 2, 0, 14, 12, 9, 8, 7, 6, 5, 4, 3, 2, 0, 14, 13, 12, 11, 9, 7, 6, 5, 3, 0, 5, 4, 3, 0, 0, 4, 8, 12, 16, 20, 0, 4, 8, 12, 16, 20, 10, 8, 7, 6, 5, 4, 3, 2, 1, 0, 15, 0, 3, 2, 0, 2, 0])
+ELEMENT_MASKS = array('Q', [4026531840, 268435455, 4026531840, 268435455, 4026531840, 268435455, 4026531840, 268435455, 4026531840, 268435455, 4026531840, 268435455, 4026531840, 268435455, 4026531840, 268435455, 61440, 4095, 61440, 4095, 61440, 4095, 61440, 4095, 61440, 4095, 1099511627775, 1099511627775, 1099511627775, 1099511627775, 1099511627775, 61440, 4095, 61440, 4095, 61440, 4095, 61440, 4095, 61440, 4095, 61440, 4092, 3, 61440, 4092, 3, 49152, 12288, 3584, 256, 128, 64, 32, 16, 8, 4, 3, 49152, 8192, 4096, 2048, 1536, 384, 64, 32, 24, 3, 224, 16, 8, 7, 15, 240, 3840, 61440, 983040, 15728640, 15, 240, 3840, 61440, 983040, 15728640, 64512, 768, 128, 64, 32, 16, 8, 4, 2, 1, 32768, 32767, 65528, 4, 3, 65532, 3])
+ELEMENT_READ_ONLY = b'\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+
+# indexes
+REGISTER_INDEX = {'Interface Register 0': 0, 'Interface Register 1': 1, 'Interface Register 2': 2, 'Interface Register 3': 3, 'Interface Register 4': 4, 'Interface Register 5': 5, 'Interface Register 6': 6, 'Interface Register 7': 7, 'GPIO Pin Setting': 8, 'Auxiliary ADC Data 0': 9, 'Auxiliary ADC Data 1': 10, 'Auxiliary ADC Data 2': 11, 'Auxiliary ADC Data 3': 12, 'Safeload Registers 0': 13, 'Safeload Registers 1': 14, 'Safeload Registers 2': 15, 'Safeload Registers 3': 16, 'Safeload Registers 4': 17, 'Safeload Address 0': 18, 'Safeload Address 1': 19, 'Safeload Address 2': 20, 'Safeload Address 3': 21, 'Safeload Address 4': 22, 'Data Capture 0': 23, 'Data Capture 1': 24, 'DSP Core Control': 25, 'Serial Output Control': 26, 'Serial Input Control': 27, 'Multipurpose Pin Configuration 0': 28, 'Multipurpose Pin Configuration 1': 29, 'Auxiliary ADC and Power Control': 30, 'Auxiliary ADC Enable': 31, 'Oscillator Power Down': 32, 'DAC Setup': 33}
+REGISTER_ADDRESS_INDEX = {2048: 0, 2049: 1, 2050: 2, 2051: 3, 2052: 4, 2053: 5, 2054: 6, 2055: 7, 2056: 8, 2057: 9, 2058: 10, 2059: 11, 2060: 12, 2064: 13, 2065: 14, 2066: 15, 2067: 16, 2068: 17, 2069: 18, 2070: 19, 2071: 20, 2072: 21, 2073: 22, 2074: 23, 2075: 24, 2076: 25, 2078: 26, 2079: 27, 2080: 28, 2081: 29, 2082: 30, 2084: 31, 2086: 32, 2087: 33}
+ELEMENT_INDEX = {'RSVD': 99, 'IF': 15, 'MP': 17, 'AA': 25, 'SD': 30, 'SA': 40, 'PC': 45, 'RS': 46, 'RSVD_1': 96, 'GD': 48, 'RSVD_0': 98, 'AACW': 50, 'GPCW': 51, 'IFCW': 52, 'IST': 53, 'ADM': 54, 'DAM': 55, 'CR': 56, 'SR': 57, 'OLRP': 59, 'OBP': 60, 'M_S': 61, 'OBF': 62, 'OLF': 63, 'FST': 64, 'TDM': 65, 'MSB': 66, 'OWL': 67, 'ILP': 69, 'IBP': 70, 'M': 71, 'MP_0': 72, 'MP_1': 73, 'MP_2': 74, 'MP_3': 75, 'MP_4': 76, 'MP_5': 77, 'MP_6': 78, 'MP_7': 79, 'MP_8': 80, 'MP_9': 81, 'MP_10': 82, 'MP_11': 83, 'FIL': 85, 'AAPD': 86, 'VBPD': 87, 'VRPD': 88, 'D0PD': 90, 'D1PD': 91, 'D2PD': 92, 'D3PD': 93, 'AAEN': 94, 'OPD': 97, 'DS': 100}  # last one wins for duplicated names, as in RegistersMap
+ELEMENT_REGISTERS = array('B', [0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5, 6, 6, 7, 7, 8, 8, 9, 9, 10, 10, 11, 11, 12, 12, 13, 14, 15, 16, 17, 18, 18, 19, 19, 20, 20, 21, 21, 22, 22, 23, 23, 23, 24, 24, 24, 25, 25, 25, 25, 25, 25, 25, 25, 25, 25, 25, 26, 26, 26, 26, 26, 26, 26, 26, 26, 26, 27, 27, 27, 27, 28, 28, 28, 28, 28, 28, 29, 29, 29, 29, 29, 29, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 31, 31, 32, 32, 32, 33, 33])
+DUPLICATED_ELEMENT_NAMES = ('AA', 'IF', 'PC', 'RS', 'RSVD', 'RSVD_0', 'RSVD_1', 'SA', 'SD')
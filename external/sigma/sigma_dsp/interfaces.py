@@ -23,6 +23,13 @@ class DeviceBase:
         self._enabled = False
         self._action = ''
 
+        self._register_cache = {}  # address: value last written to / read from the device.
+        self._batch_depth = 0
+        self._batch_registers = []
+        self._checked_element_names = set()
+        self.bus_writes_saved = 0
+        self.bus_reads_saved = 0
+
         self.map = registers_map
         if registers_values is not None:
             self.load_registers(registers_values)  # addressed registers values
@@ -157,12 +164,67 @@ class DeviceBase:
             register.print()
 
 
+    # register cache ==================================================
+    # A write of the value the device already holds is skipped and a read is served from the cache,
+    # except for VOLATILE_REGISTERS, which the device changes by itself (status bits, self-clearing bits).
+    VOLATILE_REGISTERS = ()
+
+
+    def register_batch(self):
+        """with device.register_batch(): ... -- writes are sent on exit, consecutive addresses combined."""
+        return _RegisterBatch(self)
+
+
+    def invalidate_register_cache(self, address = None):
+        if address is None:
+            self._register_cache.clear()
+        else:
+            self._register_cache.pop(address, None)
+
+
+    def _is_cached(self, register):
+        address = register.address
+        return address not in self.VOLATILE_REGISTERS and self._register_cache.get(address) == register.value
+
+
+    def _cache_register(self, register):
+        if register.address not in self.VOLATILE_REGISTERS:
+            self._register_cache[register.address] = register.value
+
+
+    def _is_batched(self, register):
+        for reg in self._batch_registers:
+            if reg.address == register.address:
+                return True
+        return False
+
+
+    def _batch_write_register(self, register):
+        # only the latest value of each register is sent, in the order registers were first written.
+        if self._is_batched(register):
+            self.bus_writes_saved += 1
+        else:
+            self._batch_registers.append(register)
+
+
+    def _end_register_batch(self):
+        registers = self._batch_registers
+        self._batch_registers = []
+        self._write_registers(registers)
+
+
+    def _write_registers(self, registers):
+        for reg in registers:
+            self._write_register(reg)
+
+
     # =================================================================
 
     def _write_register(self, register, reset = False):
         if reset:
             register.reset()
-        self._show_bus_data(register.bytes, address = register.address)
+        if self.DEBUG_MODE_SHOW_BUS_DATA:
+            self._show_bus_data(register.bytes, address = register.address)
         self._print_register(register)
 
 
@@ -191,8 +253,9 @@ class DeviceBase:
 
 
     def write_all_registers(self, reset = False):
-        for reg in self.map._registers:
-            self._write_register(reg, reset = reset)
+        with self.register_batch():
+            for reg in self.map._registers:
+                self._write_register(reg, reset = reset)
 
 
     def _read_register(self, register):
@@ -227,6 +290,25 @@ class DeviceBase:
 
 
 
+class _RegisterBatch:
+
+    def __init__(self, device):
+        self._device = device
+
+
+    def __enter__(self):
+        self._device._batch_depth += 1
+        return self._device
+
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        device = self._device
+        device._batch_depth -= 1
+        if device._batch_depth == 0:
+            device._end_register_batch()
+
+
+
 class Device(DeviceBase):
     FREQ_REF = None
     N_OUTPUT_CLOCKS = None
@@ -62,54 +62,98 @@ class Message:
 
 
     @classmethod
-    def from_bytes(cls, message_bytes):
-        message_id = message_bytes[0]
-        message_type = cls.MESSAGE_TYPES_value_key[message_id]
+    def parse(cls, buffer, offset = 0, with_data = True):
+        """
+        Message at offset of buffer and the offset of the next message, None after 'End'.
+        Write data is a memoryview into buffer, not a copy, or None if not with_data.
+        """
+        mv = memoryview(buffer)
+        message_type = cls.MESSAGE_TYPES_value_key[mv[offset]]
 
         if message_type == 'Write':
-            device_address = int.from_bytes(
-                message_bytes[MessageWrite_DEVICE_ADDRESS_SLICE.start:MessageWrite_DEVICE_ADDRESS_SLICE.stop],
-                'big')
+            device_address = int.from_bytes(mv[offset + MessageWrite_DEVICE_ADDRESS_SLICE.start:
+                                               offset + MessageWrite_DEVICE_ADDRESS_SLICE.stop], 'big')
 
-            subaddress = int.from_bytes(
-                message_bytes[MessageWrite_SUBADDRESS_SLICE.start: MessageWrite_SUBADDRESS_SLICE.stop],
-                'big')
+            subaddress = int.from_bytes(mv[offset + MessageWrite_SUBADDRESS_SLICE.start:
+                                           offset + MessageWrite_SUBADDRESS_SLICE.stop], 'big')
 
-            nbytes_data = int.from_bytes(message_bytes[MessageWrite_LENGTH_SLICE.start: MessageWrite_LENGTH_SLICE.stop],
+            nbytes_data = int.from_bytes(mv[offset + MessageWrite_LENGTH_SLICE.start:
+                                            offset + MessageWrite_LENGTH_SLICE.stop],
                                          'big') - MessageWrite_DEVICE_ADDRESS_SUBADDRESS_LENGTH
 
-            data_slice = slice(MessageWrite_DATA_SLICE.start, MessageWrite_DATA_SLICE.start + nbytes_data)
+            data_start = offset + MessageWrite_DATA_SLICE.start
+            data_stop = data_start + nbytes_data
 
             message = MessageWrite(subaddress = subaddress,
-                                   data = message_bytes[data_slice.start: data_slice.stop],
+                                   data = mv[data_start:data_stop] if with_data else None,
                                    device_address = device_address)
-
-            return message, message_bytes[data_slice.stop:]
+            return message, data_stop
 
         elif message_type == 'Delay':
-            delay_ms = int.from_bytes(message_bytes[MessageDelay_DELAY_SLICE.start: MessageDelay_DELAY_SLICE.stop],
-                                      'big')
-            message = MessageDelay(delay_ms = delay_ms)
-            return message, message_bytes[MessageDelay_DELAY_SLICE.stop:]
+            delay_ms = int.from_bytes(mv[offset + MessageDelay_DELAY_SLICE.start:
+                                         offset + MessageDelay_DELAY_SLICE.stop], 'big')
+            return MessageDelay(delay_ms = delay_ms), offset + MessageDelay_DELAY_SLICE.stop
 
         elif message_type == 'End':
-            message = Message(message_type = message_type)
-            return message, b''
+            return Message(message_type = message_type), None
 
         else:
-            message = Message(message_type = message_type)
-            return message, message_bytes[1:]
+            return Message(message_type = message_type), offset + 1
 
 
     @classmethod
-    def messages_from_bytes(cls, message_bytes):
-        messages = []
+    def from_bytes(cls, message_bytes):
+        message, offset = cls.parse(message_bytes)
+        if message.message_type == 'Write':
+            message.data = bytes(message.data)
+        return message, b'' if offset is None else message_bytes[offset:]
 
-        while len(message_bytes) > 0:
-            message, message_bytes = cls.from_bytes(message_bytes)
-            messages.append(message)
 
-        return Messages(messages)
+    @classmethod
+    def iter_messages(cls, message_bytes, offset = 0):
+        """Yields (offset, message) up to 'End' or the end of message_bytes, write data not copied."""
+        n_bytes = len(message_bytes)
+
+        while offset is not None and offset < n_bytes:
+            message, next_offset = cls.parse(message_bytes, offset)
+            yield offset, message
+            offset = next_offset
+
+
+    @classmethod
+    def stream(cls, read, n_bytes, offset = 0, chunk_size = 64, with_data = True):
+        """
+        Yields (offset, message) from a device read lazily, read(n_bytes, address) -> bytes, up to 'End'.
+        Headers are parsed in chunk_size reads; write data is read on its own, or skipped if not with_data.
+        """
+        stop = offset + n_bytes
+        chunk = b''
+        chunk_start = offset
+
+        while offset is not None and offset < stop:
+            pos = offset - chunk_start
+            if pos < 0 or pos + MessageWrite_DATA_SLICE.start > len(chunk) and chunk_start + len(chunk) < stop:
+                chunk = read(min(chunk_size, stop - offset), offset)
+                chunk_start = offset
+                pos = 0
+
+            message, next_pos = cls.parse(chunk, pos, with_data = False)
+            next_offset = None if next_pos is None else chunk_start + next_pos
+
+            if with_data and message.message_type == 'Write':
+                data_start = offset + MessageWrite_DATA_SLICE.start
+                if next_pos <= len(chunk):
+                    message.data = bytes(chunk[data_start - chunk_start:next_pos])
+                else:
+                    message.data = read(next_offset - data_start, data_start)
+
+            yield offset, message
+            offset = next_offset
+
+
+    @classmethod
+    def messages_from_bytes(cls, message_bytes):
+        return Messages([message for _, message in cls.iter_messages(message_bytes)])
 
 
     @staticmethod
@@ -164,7 +208,7 @@ class MessageWrite(Message):
 
         bytes_subaddress = self.subaddress.to_bytes(MessageWrite_SUBADDRESS_SLICE_LENGTH, self.BYTEORDER)
 
-        return b''.join([bytes_length, bytes_device_address, bytes_subaddress, self.data])
+        return b''.join([bytes_length, bytes_device_address, bytes_subaddress, bytes(self.data)])
 
 
 
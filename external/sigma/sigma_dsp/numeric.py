@@ -3,6 +3,7 @@
 # https://en.wikipedia.org/wiki/Single-precision_floating-point_format
 # https://docs.python.org/3/library/struct.html
 
+from array import array
 from math import ceil
 
 
@@ -103,6 +104,109 @@ class Number:
         #                      signed = False)
 
 
+    # bulk codec =========================================================
+    # Encode / decode whole coefficient blocks without building a Number per value.
+
+    @classmethod
+    def encode_into(cls, values, buffer, offset = 0, saturate = True, n_bits_A = None, n_bits_B = None):
+        """
+        Encode a sequence of numbers into buffer (bytearray / memoryview), big endian like to_bytes().
+        Out of range values are clipped to the limits if saturate, otherwise they fail limit_guard.
+        Returns the number of bytes written.
+        """
+        n_bits_A = cls.N_BITS_A if n_bits_A is None else n_bits_A
+        n_bits_B = cls.N_BITS_B if n_bits_B is None else n_bits_B
+
+        n_bits = n_bits_A + n_bits_B
+        n_bytes = (n_bits + 7) // 8
+        denominator = 1 << n_bits_B
+        bits_max = (1 << (n_bits - 1)) - 1
+        bits_min = -bits_max - 1
+        modulus = 1 << n_bits
+        idx = offset
+
+        for value in values:
+            bits = int(value * denominator)
+
+            if bits > bits_max or bits < bits_min:
+                if not saturate:
+                    cls.limit_guard(value, n_bits_A)
+                bits = bits_max if bits > bits_max else bits_min
+
+            if bits < 0:
+                bits += modulus
+
+            if n_bytes == 4:
+                buffer[idx] = (bits >> 24) & 0xFF
+                buffer[idx + 1] = (bits >> 16) & 0xFF
+                buffer[idx + 2] = (bits >> 8) & 0xFF
+                buffer[idx + 3] = bits & 0xFF
+            else:
+                for j in range(n_bytes - 1, -1, -1):
+                    buffer[idx + j] = bits & 0xFF
+                    bits >>= 8
+
+            idx += n_bytes
+
+        return idx - offset
+
+
+    @classmethod
+    def encode(cls, values, saturate = True, n_bits_A = None, n_bits_B = None):
+        n_bits_A = cls.N_BITS_A if n_bits_A is None else n_bits_A
+        n_bits_B = cls.N_BITS_B if n_bits_B is None else n_bits_B
+
+        buffer = bytearray(len(values) * ((n_bits_A + n_bits_B + 7) // 8))
+        cls.encode_into(values, buffer, 0, saturate, n_bits_A, n_bits_B)
+        return buffer
+
+
+    @classmethod
+    def decode_into(cls, buffer, values, offset = 0, n_values = None, n_bits_A = None, n_bits_B = None):
+        """Decode numbers from buffer into values (e.g. array('f')). Returns the number of values decoded."""
+        n_bits_A = cls.N_BITS_A if n_bits_A is None else n_bits_A
+        n_bits_B = cls.N_BITS_B if n_bits_B is None else n_bits_B
+
+        n_bits = n_bits_A + n_bits_B
+        n_bytes = (n_bits + 7) // 8
+        n_values = (len(buffer) - offset) // n_bytes if n_values is None else n_values
+        scale = 1 / (1 << n_bits_B)
+        sign_mask = 1 << (n_bits - 1)
+        modulus = 1 << n_bits
+        idx = offset
+
+        for i in range(n_values):
+            if n_bytes == 4:
+                bits = (buffer[idx] << 24) | (buffer[idx + 1] << 16) | (buffer[idx + 2] << 8) | buffer[idx + 3]
+            else:
+                bits = 0
+                for j in range(n_bytes):
+                    bits = (bits << 8) | buffer[idx + j]
+
+            bits &= modulus - 1
+            if bits & sign_mask:
+                bits -= modulus
+
+            values[i] = bits * scale
+            idx += n_bytes
+
+        return n_values
+
+
+    @classmethod
+    def decode(cls, buffer, offset = 0, n_values = None, n_bits_A = None, n_bits_B = None):
+        """Decode numbers from buffer into a new array('f')."""
+        n_bits_A = cls.N_BITS_A if n_bits_A is None else n_bits_A
+        n_bits_B = cls.N_BITS_B if n_bits_B is None else n_bits_B
+
+        n_bytes = (n_bits_A + n_bits_B + 7) // 8
+        n_values = (len(buffer) - offset) // n_bytes if n_values is None else n_values
+
+        values = array('f', bytes(4 * n_values))
+        cls.decode_into(buffer, values, offset, n_values, n_bits_A, n_bits_B)
+        return values
+
+
     @property
     def value(self):
         cased_value = self.type(self._value)
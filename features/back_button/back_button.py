@@ -1,16 +1,20 @@
-import time
+from utils.ticks import ticks_ms, ticks_diff
 
 class BackButton:
-    def __init__(self, back_button_pin, event_bus):
+    def __init__(self, back_button_pin, event_bus, clock=ticks_ms, wake=None):
         """
         Initialize the BackButton.
 
         Args:
             back_button_pin (Pin): A configured Pin instance for the back button.
             event_bus: The event bus to emit events to.
+            clock: Millisecond tick source, replaceable when running on a host.
+            wake: Optional ThreadSafeFlag set by the interrupt handler when there is something to read().
         """
         self.back_button = back_button_pin
         self.event_bus = event_bus
+        self.clock = clock
+        self.wake = wake
 
         # Set up the IRQ handler
         self.back_button.irq(trigger=self.back_button.IRQ_FALLING, handler=self.handle_back)
@@ -18,12 +22,24 @@ class BackButton:
         # Variables for debouncing
         self.last_click_time = 0  # Track the last click time
         self.debounce_time = 10
+        self._presses = 0  # Debounced presses not yet emitted by read()
 
     def handle_back(self, pin):
         """
-        Handle the button press event.
+        Handle the button press event. Runs in interrupt context: the press is only
+        counted, read() emits it.
         """
-        current_time = time.ticks_ms()
-        if current_time - self.last_click_time > self.debounce_time:  # Debounce check
+        current_time = self.clock()
+        if ticks_diff(current_time, self.last_click_time) > self.debounce_time:  # Debounce check
             self.last_click_time = current_time
-            self.event_bus.emit("back")
\ No newline at end of file
+            self._presses += 1
+            if self.wake is not None:
+                self.wake.set()
+
+    def read(self):
+        """
+        Emit a back event for each press recorded by the interrupt handler.
+        """
+        while self._presses:
+            self._presses -= 1
+            self.event_bus.emit("back")
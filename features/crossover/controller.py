@@ -1,24 +1,43 @@
+from features.crossover.design import n_sections
 from features.crossover.service import CrossoverService
+from utils.hashing import fnv1a32
 
 class TwoWayCrossover():
     MAX_CURSOR_POSITION = 3
     CURSOR_SYMBOL = '>'
     DEFAULT_CUTOFF_1 = (30, 500) # Default for channel 1
     DEFAULT_CUTOFF_2 = (500, 20 * 1000) # Default for channel 2
+    MIN_FREQUENCY = 20
+    MAX_FREQUENCY = 20 * 1000
 
-    def __init__(self, dsp, params, name='2way Crossover', channel_names=['A', 'B']):
+    # Parameters of a SigmaStudio 2-way crossover cell, without the cell prefix (see ParamsCell):
+    # the heads of its 4 five-coefficient filters, then the low invert.
+    FILTER_PARAMETER_NAMES = ('B0_0', 'B0_1', 'B0_2', 'B0_3', 'LowInvert')
+    CHANNEL_HEAD_NAMES = ('B0_0', 'B0_2')  # Each channel: highpass then lowpass from its head
+    assert n_sections(CrossoverService.alignment) == 1, 'The 2-way cell holds one biquad per filter'
+
+    FILTER_TO_FREQUENCIES = {
+        0: ('ch_1_lpf', 'ch_1_hpf'),
+        1: ('ch_1_lpf', 'ch_1_hpf'),
+        2: ('ch_2_lpf', 'ch_2_hpf'),
+        3: ('ch_2_lpf', 'ch_2_hpf')
+    }
+
+    def __init__(self, dsp, params, name='2way Crossover', channel_names=['A', 'B'], scheduler=None, flush=True):
         self.name = name
         self.params = self.parse_params(params)
         self.cursor_position = 0
         self.channel_names = channel_names
         self.service = CrossoverService(dsp)
+        self.scheduler = scheduler  # Live preview of the selected filter while the knob turns, if given
         self.selected_filter = None  # Track which filter is selected for adjustment
         self.temp_frequencies = {}   # Store temporary frequency adjustments
         
-        # Load saved frequencies from RTC memory (if any)
-        self.load_frequencies_from_rtc()
+        # Load saved frequencies from RTC memory (if any); with flush=False they are only staged, e.g. for
+        # CrossoverService.reconcile() once every crossover is built
+        self.load_frequencies_from_rtc(flush)
 
-    def load_frequencies_from_rtc(self):
+    def load_frequencies_from_rtc(self, flush=True):
         """ Load saved frequencies from RTC memory and store them in the object """
         # Load frequencies using the crossover's name as the key
         saved_frequencies = self.service.load_state(self.name)
@@ -26,13 +45,15 @@ class TwoWayCrossover():
         if saved_frequencies:
             # If saved frequencies exist, update the DSP and store them in the object
             for head_address, (low_cutoff, high_cutoff) in saved_frequencies.items():
-                self.service.set_bandpass_cutoff_frequencies(low_cutoff, high_cutoff, int(head_address))
+                self.service.set_bandpass_cutoff_frequencies(low_cutoff, high_cutoff, int(head_address), flush=False)
+            if flush:
+                self.service.flush(safeload=False)
             self.saved_frequencies = saved_frequencies
         else:
             # If no saved frequencies exist, write default frequencies to the DSP and RTC memory
-            self.write_default_frequencies()
+            self.write_default_frequencies(flush)
 
-    def write_default_frequencies(self):
+    def write_default_frequencies(self, flush=True):
         """ Write default frequencies to the DSP and RTC memory """
         default_frequencies = {
             str(self.params[0]): self.DEFAULT_CUTOFF_1,
@@ -40,11 +61,17 @@ class TwoWayCrossover():
         }
         # Write default frequencies to the DSP
         for head_address, (low_cutoff, high_cutoff) in default_frequencies.items():
-            self.service.set_bandpass_cutoff_frequencies(low_cutoff, high_cutoff, int(head_address))
-        # Save default frequencies to RTC memory
-        self.service.save_state(default_frequencies, self.name)
+            self.service.set_bandpass_cutoff_frequencies(low_cutoff, high_cutoff, int(head_address), flush=False)
+        if flush:
+            self.service.flush(safeload=False)
         # Store default frequencies in the object
         self.saved_frequencies = default_frequencies
+        # Save default frequencies to RTC memory
+        self.save_frequencies()
+
+    def save_frequencies(self):
+        """ Save the confirmed frequencies to RTC memory; the store commits them in the background """
+        self.service.save_state(self.saved_frequencies, self.name)
 
     def name(self):
         return self.name
@@ -63,15 +90,10 @@ class TwoWayCrossover():
 
     def parse_params(self, params):
         """
-        The 2-way crossover is composed of 4 filters, each with 5 coefficients, and a low invert filter.
+        The 2-way crossover is composed of 4 filters, each with 5 coefficients, and a low invert filter (not used for now).
+        Addresses are looked up by parameter name in the cell, so they don't depend on the export order.
         """
-        return {
-            0: params[0]['Parameter Address'],  # the head of a 5-coefficient filter
-            1: params[5]['Parameter Address'],  # the head of another 5-coefficient filter
-            2: params[10]['Parameter Address'],  # the head of another 5-coefficient filter
-            3: params[15]['Parameter Address'],  # the head of another 5-coefficient filter
-            4: params[20]['Parameter Address'] # NOTE: not used for now
-        }
+        return {i: params.address(name) for i, name in enumerate(self.FILTER_PARAMETER_NAMES)}
 
     def format_frequency(self, freq):
         """ Format the frequency to be displayed on the LCD """
@@ -109,13 +131,17 @@ class TwoWayCrossover():
 
     def set_frequency(self, low_cutoff, high_cutoff, head_address):
         """ Set the cutoff frequencies for a specific channel and save to RTC memory """
-        self.service.set_bandpass_cutoff_frequencies(low_cutoff, high_cutoff, head_address)
+        if self.scheduler is not None:
+            # Left to the DSP writer; supersedes any preview of this channel still waiting for the bus
+            self.submit_frequency(low_cutoff, high_cutoff, head_address)
+        else:
+            self.service.set_bandpass_cutoff_frequencies(low_cutoff, high_cutoff, head_address)
        
         # Update the saved frequencies in the object
         self.saved_frequencies[str(head_address)] = (low_cutoff, high_cutoff)
 
         # Save the updated frequencies to RTC memory
-        self.service.save_state(self.saved_frequencies, self.name)
+        self.save_frequencies()
 
     def on_click(self, data=None, navigator=None):
         """ Handle click events """
@@ -133,39 +159,94 @@ class TwoWayCrossover():
             }
         else:
             # Map selected filter to the corresponding frequency keys
-            filter_to_frequencies = {
-                0: ('ch_1_lpf', 'ch_1_hpf'),
-                1: ('ch_1_lpf', 'ch_1_hpf'),
-                2: ('ch_2_lpf', 'ch_2_hpf'),
-                3: ('ch_2_lpf', 'ch_2_hpf')
-            }
-            low_key, high_key = filter_to_frequencies[self.selected_filter]
+            low_key, high_key = self.FILTER_TO_FREQUENCIES[self.selected_filter]
             
             print(self.temp_frequencies)
 
-            selected_head_address_index = 0 if self.selected_filter <= 1 else 2
-
             self.set_frequency(
                 self.temp_frequencies[low_key],
                 self.temp_frequencies[high_key],
-                self.params[selected_head_address_index]
+                self.selected_head_address()
             )
             
             # Reset selection
             self.selected_filter = None
             self.temp_frequencies = {}
 
+    def selected_head_address(self):
+        """ Head address of the 5-coefficient filters holding the selected cutoff """
+        return self.params[0 if self.selected_filter <= 1 else 2]
+
+    def submit_frequency(self, low_cutoff, high_cutoff, head_address):
+        """ Queue cutoffs of a channel for the rate-limited DSP writer, replacing a pending update of that channel """
+        def update():
+            self.service.set_bandpass_cutoff_frequencies(low_cutoff, high_cutoff, head_address, flush=False)
+
+        self.scheduler.submit((self.name, head_address), update)
+
+    def recall_preset(self, channels):
+        """
+        Apply the channels of a preset that are this crossover's,
+        {(name hash, head address): (low, high, encoded block)}: the blocks are staged as they are, through
+        the scheduler if any so that every crossover's land in the same commit, and replace a pending preview
+        of the channel. Returns the number of channels applied.
+        """
+        name_hash = fnv1a32(self.name)
+        n_applied = 0
+        for (channel_name_hash, head_address), (low_cutoff, high_cutoff, block) in channels.items():
+            if channel_name_hash != name_hash or str(head_address) not in self.saved_frequencies:
+                continue
+            if block is None:  # encoded for another alignment: computed from the cutoffs
+                if self.scheduler is not None:
+                    self.submit_frequency(low_cutoff, high_cutoff, head_address)
+                else:
+                    self.service.set_bandpass_cutoff_frequencies(low_cutoff, high_cutoff, head_address, flush=False)
+            else:
+                self.submit_block(block, head_address)
+            self.saved_frequencies[str(head_address)] = (low_cutoff, high_cutoff)
+            n_applied += 1
+
+        if n_applied:
+            self.selected_filter = None
+            self.temp_frequencies = {}
+            self.save_frequencies()
+        return n_applied
+
+    def submit_block(self, block, head_address):
+        """ Stage the encoded coefficients of a channel, through the scheduler if any """
+        def update():
+            self.service.stage_channel_block(block, head_address)
+
+        if self.scheduler is not None:
+            self.scheduler.submit((self.name, head_address), update)
+        else:
+            update()
+
+    def preview_frequency(self):
+        """ Queue the temporary cutoffs of the selected filter for a live, rate-limited DSP update """
+        low_key, high_key = self.FILTER_TO_FREQUENCIES[self.selected_filter]
+        self.submit_frequency(self.temp_frequencies[low_key], self.temp_frequencies[high_key], self.selected_head_address())
+
+    def restore_saved_frequencies(self):
+        """ Put the saved coefficients of the selected filter back after a preview """
+        head_address = self.selected_head_address()
+        low_cutoff, high_cutoff = self.saved_frequencies[str(head_address)]
+        # Only the words changed by the preview are dirty, so this is a single write
+        self.submit_frequency(low_cutoff, high_cutoff, head_address)
+
     def on_back(self, data=None):
         """ Handle back events """
         if self.selected_filter is not None:
+            if self.scheduler is not None:
+                self.restore_saved_frequencies()
             # Cancel the selection and reset temporary frequencies
             self.selected_filter = None
             self.temp_frequencies = {}
             return True
         return False # Allow Navigator to go back
 
-    def adjust_frequency(self, direction):
-        """ Helper method to adjust frequency based on direction ('left' or 'right') """
+    def adjust_frequency(self, direction, multiplier=1):
+        """ Helper method to adjust frequency based on direction ('left' or 'right') and spin speed multiplier """
         if self.selected_filter is not None:
             # Map selected filter to the corresponding frequency key
             filter_to_key = {
@@ -175,22 +256,31 @@ class TwoWayCrossover():
                 3: 'ch_2_hpf'
             }
             key = filter_to_key[self.selected_filter]
-            step = 10  if self.temp_frequencies[key] < 1000 else 100 # move faster if frequency is higher
+            frequency = self.temp_frequencies[key]
+            step = 10  if frequency < 1000 else 100 # move faster if frequency is higher
             if direction == 'right':
-                self.temp_frequencies[key] += step
+                frequency += step * multiplier
             elif direction == 'left':
-                self.temp_frequencies[key] -= step
+                frequency -= step * multiplier
+
+            # Accelerated steps can cross the 1 kHz boundary: snap back onto the 10/100 Hz grid
+            grid = 10 if frequency < 1000 else 100
+            frequency = (frequency + grid // 2) // grid * grid
+            self.temp_frequencies[key] = max(self.MIN_FREQUENCY, min(frequency, self.MAX_FREQUENCY))
+
+            if self.scheduler is not None:
+                self.preview_frequency()
 
     def on_right(self, data=None):
         """ Handle right events """
         if self.selected_filter is not None:
-            self.adjust_frequency('right')
+            self.adjust_frequency('right', data or 1)
         else:
             self.update_cursor_position('right')
 
     def on_left(self, data=None):
         """ Handle left events """
         if self.selected_filter is not None:
-            self.adjust_frequency('left')
+            self.adjust_frequency('left', data or 1)
         else:
             self.update_cursor_position('left')
\ No newline at end of file
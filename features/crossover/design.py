@@ -0,0 +1,124 @@
+# Biquad design of the crossover filters, quantized straight into the parameter RAM layout of the DSP.
+import math
+
+from external.sigma.sigma_dsp.adau.adau import SAMPLING_FREQ_DEFAULT
+from external.sigma.sigma_dsp.dsp_processor import DspNumber
+
+N_COEFFICIENTS_PER_BIQUAD = 5
+N_BYTES_PER_BIQUAD = N_COEFFICIENTS_PER_BIQUAD * DspNumber.N_BYTES
+FILTER_TYPES = ('lowpass', 'highpass')
+
+# Biquad sections of each alignment, by their Q; None is a first-order section (B2 = A2 = 0).
+# LR2 is a first-order Butterworth squared, LR4 a second-order Butterworth squared.
+ALIGNMENTS = {
+    'BW1': (None,),
+    'BW2': (0.7071067811865476,),
+    'LR2': (0.5,),
+    'BW4': (0.5411961001461971, 1.3065629648763766),
+    'LR4': (0.7071067811865476, 0.7071067811865476),
+}
+
+
+def n_sections(alignment):
+    return len(ALIGNMENTS[alignment])
+
+
+def section_coefficients(filter_type, q, cos_w0, sin_w0, gain=1):
+    """
+    (B0, B1, A1, B2, A2) of one section, in the order and sign convention of the DSP biquad:
+    y = B0 x0 + B1 x1 + B2 x2 + A1 y1 + A2 y2, the feedback coefficients negated.
+    Bilinear transform with prewarping (the Audio EQ Cookbook forms for the biquads).
+    """
+    if q is None:
+        k = sin_w0 / (1 + cos_w0)  # tan(w0 / 2)
+        norm = 1 / (1 + k)
+        if filter_type == 'lowpass':
+            b0 = k * norm
+            b1 = b0
+        else:
+            b0 = norm
+            b1 = -norm
+        return gain * b0, gain * b1, (1 - k) * norm, 0, 0
+
+    alpha = sin_w0 / (2 * q)
+    norm = 1 / (1 + alpha)
+    if filter_type == 'lowpass':
+        b1 = (1 - cos_w0) * norm
+        b0 = b1 / 2
+    else:
+        b1 = -(1 + cos_w0) * norm
+        b0 = -b1 / 2
+    return gain * b0, gain * b1, 2 * cos_w0 * norm, gain * b0, -(1 - alpha) * norm
+
+
+class BiquadDesigner:
+    """
+    Designs the sections of a batch of filters in one pass and encodes them as 5.23 words, biquad after
+    biquad, ready to be staged in the parameter RAM.
+
+    The cosine and sine of a cutoff are computed once per batch, whatever the number of filters at that
+    cutoff (the lowpass and highpass of a crossover point), and a section equal to one already designed
+    (the two halves of an LR4) is copied instead of computed again.
+    """
+
+    def __init__(self, fs=SAMPLING_FREQ_DEFAULT):
+        self.fs = fs
+        self.n_trig = 0
+        self.n_sections = 0
+        self._trig = {}  # cutoff: (cos w0, sin w0), of the current batch
+        self._designed = {}  # (filter type, cutoff, Q, gain): offset in buffer of a section of the current batch
+
+    def n_bytes(self, filters):
+        return sum(n_sections(alignment) for _, alignment, _, _ in filters) * N_BYTES_PER_BIQUAD
+
+    def design_into(self, filters, buffer, offset=0):
+        """
+        filters: (filter type, alignment, cutoff, gain) tuples; the gain goes to the first section of
+        each filter. Writes the sections of every filter in order into buffer at offset.
+        Returns the number of bytes written.
+        """
+        two_pi_over_fs = 2 * math.pi / self.fs
+        trig = self._trig
+        designed = self._designed
+        trig.clear()
+        designed.clear()
+        idx = offset
+
+        for filter_type, alignment, cutoff, gain in filters:
+            assert filter_type in FILTER_TYPES, 'Unknown filter type: {}'.format(filter_type)
+            cos_sin = trig.get(cutoff)
+            if cos_sin is None:
+                w0 = two_pi_over_fs * cutoff
+                cos_sin = trig[cutoff] = (math.cos(w0), math.sin(w0))
+                self.n_trig += 1
+
+            for q in ALIGNMENTS[alignment]:
+                key = (filter_type, cutoff, q, gain)
+                same = designed.get(key)
+                if same is None:
+                    designed[key] = idx
+                    DspNumber.encode_into(section_coefficients(filter_type, q, cos_sin[0], cos_sin[1], gain),
+                                          buffer, idx)
+                    self.n_sections += 1
+                else:
+                    buffer[idx: idx + N_BYTES_PER_BIQUAD] = buffer[same: same + N_BYTES_PER_BIQUAD]
+                idx += N_BYTES_PER_BIQUAD
+                gain = 1
+
+        return idx - offset
+
+    def design(self, filters):
+        """The sections of filters as a new buffer of 5.23 words."""
+        buffer = bytearray(self.n_bytes(filters))
+        self.design_into(filters, buffer)
+        return buffer
+
+    def coefficients(self, filters):
+        """[(B0, B1, A1, B2, A2), ...] of the sections of filters, unquantized, e.g. to check a response."""
+        sections = []
+        for filter_type, alignment, cutoff, gain in filters:
+            w0 = 2 * math.pi * cutoff / self.fs
+            for q in ALIGNMENTS[alignment]:
+                sections.append(section_coefficients(filter_type, q, math.cos(w0), math.sin(w0), gain))
+                gain = 1
+        return sections
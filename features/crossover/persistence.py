@@ -0,0 +1,231 @@
+import json
+import struct
+
+try:
+    from esp32 import NVS
+except ImportError:  # CPython: blobs kept in memory by the stand-in in simulation/
+    from simulation.nvs import MemoryNVS as NVS
+
+from utils.hashing import fnv1a32, crc16_ccitt
+from utils.ticks import ticks_ms, ticks_diff
+
+
+class CrossoverStore:
+    """
+    Write-behind store of the confirmed crossover cutoffs, kept in a single NVS blob.
+
+    save() only updates memory. poll() commits once no edit came for debounce_ms (or
+    max_delay_ms after the first pending edit), so a burst of edits is one commit; flush()
+    commits right away, for shutdown or a power-fail warning. A commit whose record is
+    byte-identical to the last one is skipped. A JSON record of older firmware is
+    migrated on load and erased once the new record is committed.
+
+    Record: header (version, number of entries, CRC-16 of the entries), then one
+    fixed-size entry per crossover: FNV-1a hash of its name and (head address, low
+    cutoff, high cutoff) per channel, unused channels zeroed.
+    """
+    VERSION = 1
+    NAMESPACE = 'crossover'
+    KEY = 'state'
+    HEADER_FORMAT = '<BBH'
+    MAX_CHANNELS = 2
+    ENTRY_FORMAT = '<I' + 'HHH' * MAX_CHANNELS
+    MAX_ENTRIES = 8
+
+    DEBOUNCE_MS = 2000
+    MAX_DELAY_MS = 30 * 1000
+    HOUR_MS = 3600 * 1000
+
+    HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+    ENTRY_SIZE = struct.calcsize(ENTRY_FORMAT)
+
+    def __init__(self, nvs=None, namespace=NAMESPACE, debounce_ms=DEBOUNCE_MS, max_delay_ms=MAX_DELAY_MS, clock=ticks_ms):
+        self.namespace = namespace
+        self.debounce_ms = debounce_ms
+        self.max_delay_ms = max_delay_ms
+        self.clock = clock
+        self._nvs = nvs  # opened on first use, then shared by every crossover
+        self._legacy_keys = []  # migrated records, erased after the next commit
+
+        self._buffer = bytearray(self.HEADER_SIZE + self.ENTRY_SIZE * self.MAX_ENTRIES)
+        self._entries = None  # name hash -> {head address: (low, high)}, read from NVS once
+        self._committed = b''
+        self._first_change_ms = None
+        self._last_change_ms = None
+
+        self.commits = 0
+        self.skipped = 0
+        self._hour_start_ms = self.clock()
+        self.commits_this_hour = 0
+        self.commits_last_hour = 0
+
+    # ==========================================
+    # NVS
+
+    @property
+    def nvs(self):
+        if self._nvs is None:
+            self._nvs = NVS(self.namespace)
+        return self._nvs
+
+    def _get_blob(self, key):
+        """Blob under key as a memoryview of the preallocated buffer, or None."""
+        try:
+            n_bytes = self.nvs.get_blob(key, self._buffer)
+        except OSError:  # missing key or too large
+            return None
+        return memoryview(self._buffer)[:n_bytes]
+
+    def _read(self):
+        self._entries = {}
+        blob = self._get_blob(self.KEY)
+        if blob is None:
+            return
+        try:
+            self._entries = self.decode(blob)
+            self._committed = bytes(blob)
+        except ValueError as e:
+            print("Ignoring crossover state:", e)
+
+    def _load_legacy(self, name):
+        """JSON record of older firmware, stored under the crossover name."""
+        blob = self._get_blob(name)
+        if blob is None:
+            return None
+        try:
+            frequencies = json.loads(bytes(blob)).get(name)
+        except ValueError:
+            return None
+        return {head: (low, high) for head, (low, high) in frequencies.items()} if frequencies else None
+
+    # ==========================================
+    # Record layout
+
+    @classmethod
+    def encode_into(cls, entries, buffer):
+        """Encode {name hash: frequencies} into buffer. Returns the number of bytes."""
+        assert len(entries) <= cls.MAX_ENTRIES, 'at most {} crossovers'.format(cls.MAX_ENTRIES)
+        offset = cls.HEADER_SIZE
+        for name_hash in sorted(entries):
+            values = [name_hash]
+            channels = sorted(entries[name_hash].items(), key=lambda item: int(item[0]))
+            assert len(channels) <= cls.MAX_CHANNELS, 'at most {} channels'.format(cls.MAX_CHANNELS)
+            for head, (low, high) in channels:
+                values += [int(head), int(low), int(high)]
+            values += [0] * (1 + 3 * cls.MAX_CHANNELS - len(values))
+            struct.pack_into(cls.ENTRY_FORMAT, buffer, offset, *values)
+            offset += cls.ENTRY_SIZE
+
+        crc = crc16_ccitt(memoryview(buffer)[cls.HEADER_SIZE:offset])
+        struct.pack_into(cls.HEADER_FORMAT, buffer, 0, cls.VERSION, len(entries), crc)
+        return offset
+
+    @classmethod
+    def decode(cls, blob):
+        """{name hash: frequencies} of an encoded record. Raises ValueError if it is not valid."""
+        if len(blob) < cls.HEADER_SIZE:
+            raise ValueError('record too short')
+        version, n_entries, crc = struct.unpack_from(cls.HEADER_FORMAT, blob, 0)
+        end = cls.HEADER_SIZE + n_entries * cls.ENTRY_SIZE
+        if version != cls.VERSION:
+            raise ValueError('record version {}'.format(version))
+        if len(blob) != end or crc16_ccitt(blob[cls.HEADER_SIZE:end]) != crc:
+            raise ValueError('corrupt record')
+
+        entries = {}
+        for offset in range(cls.HEADER_SIZE, end, cls.ENTRY_SIZE):
+            values = struct.unpack_from(cls.ENTRY_FORMAT, blob, offset)
+            frequencies = {}
+            for i in range(1, len(values), 3):
+                head, low, high = values[i: i + 3]
+                if low or high:
+                    frequencies[str(head)] = (low, high)
+            entries[values[0]] = frequencies
+        return entries
+
+    # ==========================================
+    # Public
+
+    def load(self, name):
+        """Saved frequencies {head address: (low, high)} of a crossover, or None."""
+        if self._entries is None:
+            self._read()
+        frequencies = self._entries.get(fnv1a32(name))
+        if frequencies is None:
+            frequencies = self._load_legacy(name)
+            if frequencies is not None:
+                self.save(name, frequencies)  # rewritten in the current layout
+                self._legacy_keys.append(name)
+        return dict(frequencies) if frequencies is not None else None
+
+    def save(self, name, frequencies):
+        """Record frequencies of a crossover; written to NVS later by poll() or flush()."""
+        if self._entries is None:
+            self._read()
+        self._entries[fnv1a32(name)] = dict(frequencies)
+        now = self.clock()
+        if self._first_change_ms is None:
+            self._first_change_ms = now
+        self._last_change_ms = now
+
+    @property
+    def pending(self):
+        return self._first_change_ms is not None
+
+    def poll(self):
+        """Commit pending changes once they settled. Returns True if it committed."""
+        if not self.pending:
+            return False
+        now = self.clock()
+        if (ticks_diff(now, self._last_change_ms) < self.debounce_ms and
+                ticks_diff(now, self._first_change_ms) < self.max_delay_ms):
+            return False
+        return self._commit(now)
+
+    def flush(self):
+        """Commit pending changes now. Returns True if it committed."""
+        if not self.pending:
+            return False
+        return self._commit(self.clock())
+
+    def _commit(self, now):
+        n_bytes = self.encode_into(self._entries, self._buffer)
+        record = memoryview(self._buffer)[:n_bytes]
+        if bytes(record) == self._committed:
+            self._first_change_ms = self._last_change_ms = None
+            self.skipped += 1
+            return False
+
+        try:
+            self.nvs.set_blob(self.KEY, record)
+            self.nvs.commit()
+        except OSError as e:
+            print("Error saving to NVS:", e)
+            return False  # still pending: the next poll() retries
+        self._first_change_ms = self._last_change_ms = None
+        self._committed = bytes(record)
+        self._count_commit(now)
+        self._erase_legacy()
+        return True
+
+    def _erase_legacy(self):
+        """Erase the migrated records, now that the current one holds their frequencies."""
+        if not self._legacy_keys:
+            return
+        try:
+            for key in self._legacy_keys:
+                self.nvs.erase_key(key)
+            self.nvs.commit()
+        except OSError as e:
+            print("Error erasing legacy crossover state:", e)
+            return
+        self._legacy_keys = []
+
+    def _count_commit(self, now):
+        elapsed_ms = ticks_diff(now, self._hour_start_ms)
+        if elapsed_ms >= self.HOUR_MS:
+            self.commits_last_hour = self.commits_this_hour if elapsed_ms < 2 * self.HOUR_MS else 0
+            self.commits_this_hour = 0
+            self._hour_start_ms = now
+        self.commits += 1
+        self.commits_this_hour += 1
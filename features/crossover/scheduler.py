@@ -0,0 +1,92 @@
+from utils.ticks import ticks_ms, ticks_diff
+
+
+class UpdateScheduler:
+    """
+    Rate-limited, latest-wins queue of DSP coefficient updates.
+
+    Each pending update is a callback that stages coefficients for one filter; a newer
+    update for the same key replaces the older one. At most max_writes_per_second times
+    a second, poll() stages every pending update and commits them with a single flush.
+
+    A writer task need not poll: submit() sets the wake event, delay_ms tells how long to
+    sleep until the next rate-limit slot, and the idle event is set while nothing is pending.
+    """
+    MAX_WRITES_PER_SECOND = 20
+
+    def __init__(self, commit, max_writes_per_second=MAX_WRITES_PER_SECOND, clock=ticks_ms,
+                 wake=None, idle=None):
+        self.commit = commit
+        self.min_interval_ms = 1000 // max_writes_per_second
+        self.clock = clock
+        self.wake = wake  # Event set on submit()
+        self.idle = idle  # Event set while no update is pending
+        if idle is not None:
+            idle.set()
+        self._pending = {}
+        self._last_commit_ms = None
+        self.submitted = 0
+        self.dropped = 0
+        self.commits = 0
+
+    def submit(self, key, update):
+        """Queue update (a callable staging the coefficients) for key, replacing a stale one."""
+        if key in self._pending:
+            self.dropped += 1
+        self._pending[key] = update
+        self.submitted += 1
+        if self.idle is not None:
+            self.idle.clear()
+        if self.wake is not None:
+            self.wake.set()
+
+    def cancel(self, key):
+        """Drop the pending update for key, if any. Returns True if one was dropped."""
+        dropped = self._pending.pop(key, None) is not None
+        self._set_idle()
+        return dropped
+
+    def _set_idle(self):
+        if not self._pending and self.idle is not None:
+            self.idle.set()
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    @property
+    def due(self):
+        """True if poll() would write now: updates are pending and the rate limit allows it."""
+        if not self._pending:
+            return False
+        return self._last_commit_ms is None or ticks_diff(self.clock(), self._last_commit_ms) >= self.min_interval_ms
+
+    @property
+    def delay_ms(self):
+        """Milliseconds until poll() may write: None if nothing is pending, 0 if it is due now."""
+        if not self._pending:
+            return None
+        if self._last_commit_ms is None:
+            return 0
+        return max(0, self.min_interval_ms - ticks_diff(self.clock(), self._last_commit_ms))
+
+    def poll(self):
+        """Commit the pending updates if the rate limit allows it. Returns True if it wrote."""
+        if not self.due:
+            return False
+        self._commit(self.clock())
+        return True
+
+    def flush(self):
+        """Commit the pending updates now, regardless of the rate limit."""
+        if self._pending:
+            self._commit(self.clock())
+
+    def _commit(self, now):
+        pending, self._pending = self._pending, {}
+        for update in pending.values():
+            update()
+        self.commit()
+        self.commits += 1
+        self._last_commit_ms = now
+        self._set_idle()
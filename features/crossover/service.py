@@ -1,69 +1,330 @@
-import json
 import math
-import esp32
+import struct
+from collections import OrderedDict
 
 from external.sigma.sigma_dsp.adau.adau import SAMPLING_FREQ_DEFAULT
+from features.crossover.design import (BiquadDesigner, section_coefficients, n_sections,
+                                       N_COEFFICIENTS_PER_BIQUAD, N_BYTES_PER_BIQUAD, FILTER_TYPES)
+from features.crossover.persistence import CrossoverStore
+from utils.ticks import ticks_ms, ticks_diff
+
+COEFFICIENTS_ORDER = ('B0', 'B1', 'A1', 'B2', 'A2')  # parameter RAM layout of a biquad
+
+# Alignment of the crossover filters (see design.ALIGNMENTS). The 2-way cell, as TwoWayCrossover drives
+# it, holds one biquad per filter: a 4th-order alignment doesn't fit.
+ALIGNMENT = 'LR2'
+
+# Cutoffs reachable with the encoder: (start, stop, step), matching TwoWayCrossover.adjust_frequency
+FREQUENCY_GRID = ((20, 1000, 10), (1000, 20001, 100))
+
+
+class CoefficientCache:
+    """
+    Bounded LRU of encoded biquad blocks keyed by (filter type, cutoff, gain, fs).
+
+    An entry (20-byte block, key tuple and dict slot) takes roughly 120 bytes of heap,
+    so the default size stays under 8 KB on the ESP32.
+    """
+    MAX_ENTRIES = 64
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        block = self._entries.pop(key, None)
+        if block is None:
+            self.misses += 1
+            return None
+        self._entries[key] = block  # most recently used goes last
+        self.hits += 1
+        return block
+
+    def put(self, key, block):
+        self._entries.pop(key, None)
+        if len(self._entries) >= self.max_entries:
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = block
+
+    def clear(self):
+        self._entries = OrderedDict()
+
+    @property
+    def hit_rate(self):
+        n_lookups = self.hits + self.misses
+        return self.hits / n_lookups if n_lookups else 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CoefficientTable:
+    """
+    Encoded biquad blocks for every cutoff of the frequency grid, read from a file built
+    offline by utils/build_coefficient_table.py. Blocks are read from flash on demand.
+
+    Layout: header, grid segments, then one block per cutoff for each of FILTER_TYPES.
+    """
+    MAGIC = b'XCT'
+    VERSION = 2
+    # magic, version, bytes per block, fs, gain, number of grid segments, alignment
+    HEADER_FORMAT = '<3sBBIfB3s'
+    SEGMENT_FORMAT = '<HHH'  # start, stop, step
+
+    def __init__(self, file, fs, gain, segments, block_size, data_offset, alignment=ALIGNMENT):
+        self._file = file
+        self.fs = fs
+        self.gain = gain
+        self.alignment = alignment
+        self.segments = segments
+        self.block_size = block_size
+        self._data_offset = data_offset
+        self.n_cutoffs = sum(len(range(*segment)) for segment in segments)
+        self.reads = 0
+
+    @classmethod
+    def load(cls, path):
+        file = open(path, 'rb')
+        header = file.read(struct.calcsize(cls.HEADER_FORMAT))
+        magic, version, block_size, fs, gain, n_segments, alignment = struct.unpack(cls.HEADER_FORMAT, header)
+        assert magic == cls.MAGIC and version == cls.VERSION, 'Not a coefficient table: {}'.format(path)
+
+        segment_size = struct.calcsize(cls.SEGMENT_FORMAT)
+        segments = tuple(struct.unpack(cls.SEGMENT_FORMAT, file.read(segment_size)) for _ in range(n_segments))
+
+        return cls(file, fs, gain, segments, block_size, len(header) + n_segments * segment_size,
+                   alignment.decode())
+
+    @classmethod
+    def build(cls, path, fs=SAMPLING_FREQ_DEFAULT, gain=1, segments=FREQUENCY_GRID, alignment=ALIGNMENT):
+        block_size = n_sections(alignment) * N_BYTES_PER_BIQUAD
+        designer = BiquadDesigner(fs)
+
+        with open(path, 'wb') as file:
+            file.write(struct.pack(cls.HEADER_FORMAT, cls.MAGIC, cls.VERSION, block_size, fs, gain, len(segments),
+                                   alignment.encode()))
+            for segment in segments:
+                file.write(struct.pack(cls.SEGMENT_FORMAT, *segment))
+
+            for filter_type in FILTER_TYPES:
+                for start, stop, step in segments:
+                    for cutoff in range(start, stop, step):
+                        file.write(designer.design([(filter_type, alignment, cutoff, gain)]))
+
+    def index(self, cutoff):
+        """Position of cutoff in the grid, None if it is not on it."""
+        offset = 0
+        for start, stop, step in self.segments:
+            if start <= cutoff < stop:
+                return offset + (cutoff - start) // step if (cutoff - start) % step == 0 else None
+            offset += len(range(start, stop, step))
+        return None
+
+    def lookup(self, filter_type, cutoff, gain, fs, alignment=ALIGNMENT):
+        if gain != self.gain or fs != self.fs or alignment != self.alignment or cutoff != int(cutoff):
+            return None
+        idx = self.index(int(cutoff))
+        if idx is None:
+            return None
+
+        idx += FILTER_TYPES.index(filter_type) * self.n_cutoffs
+        self._file.seek(self._data_offset + idx * self.block_size)
+        block = bytearray(self.block_size)
+        self._file.readinto(block)
+        self.reads += 1
+        return bytes(block)
+
+    def close(self):
+        self._file.close()
+
 
 class CrossoverService:
     crossover_memory_namespace = "crossover"
+    N_COEFFICIENTS_PER_BIQUAD = N_COEFFICIENTS_PER_BIQUAD
+
+    # shared by every crossover: both channels walk the same frequency grid
+    alignment = ALIGNMENT
+    designer = BiquadDesigner()
+    coefficient_cache = CoefficientCache()
+    coefficient_table = None
+    n_computed = 0
+
+    # shared by every crossover: one NVS handle and one record for all of them
+    store = CrossoverStore(namespace=crossover_memory_namespace)
 
     def __init__(self, dsp):
         self.dsp = dsp
 
+    @classmethod
+    def load_coefficient_table(cls, path):
+        """
+        Use a precomputed coefficient table (see CoefficientTable) for cutoffs on the grid.
+        """
+        try:
+            cls.coefficient_table = CoefficientTable.load(path)
+        except OSError as e:
+            print("No coefficient table loaded:", e)
+            cls.coefficient_table = None
+        return cls.coefficient_table
+
+    @classmethod
+    def cache_stats(cls):
+        """Lookups served by the LRU, read from the table and computed on the MCU."""
+        table = cls.coefficient_table
+        return {
+            'hits': cls.coefficient_cache.hits,
+            'misses': cls.coefficient_cache.misses,
+            'hit_rate': cls.coefficient_cache.hit_rate,
+            'table_reads': table.reads if table else 0,
+            'computed': cls.n_computed,
+        }
+
+    @classmethod
+    def _designer(cls, fs):
+        if cls.designer.fs != fs:
+            cls.designer = BiquadDesigner(fs)
+        return cls.designer
+
+    @classmethod
+    def encode_filter_coefficients(cls, filter_type, cutoff_freq, gain=1, fs=SAMPLING_FREQ_DEFAULT):
+        """
+        Design a filter of the service's alignment and encode its sections as 5-word biquad blocks.
+        """
+        return bytes(cls._designer(fs).design([(filter_type, cls.alignment, cutoff_freq, gain)]))
+
+    @classmethod
+    def get_filter_blocks(cls, filters, gain=1, fs=SAMPLING_FREQ_DEFAULT):
+        """
+        Encoded biquad blocks of filters, (filter type, cutoff) pairs: LRU cache, then table, then
+        design. The filters found in neither are designed together, in one pass.
+        """
+        blocks = [None] * len(filters)
+        missing = []
+        for i, (filter_type, cutoff_freq) in enumerate(filters):
+            key = (filter_type, cutoff_freq, gain, fs, cls.alignment)
+            block = cls.coefficient_cache.get(key)
+            if block is None and cls.coefficient_table is not None:
+                block = cls.coefficient_table.lookup(filter_type, cutoff_freq, gain, fs, cls.alignment)
+                if block is not None:
+                    cls.coefficient_cache.put(key, block)
+            if block is None:
+                missing.append(i)
+            blocks[i] = block
+
+        if missing:
+            batch = [(filters[i][0], cls.alignment, filters[i][1], gain) for i in missing]
+            designed = cls._designer(fs).design(batch)
+            block_size = n_sections(cls.alignment) * N_BYTES_PER_BIQUAD
+            for j, i in enumerate(missing):
+                block = bytes(designed[j * block_size: (j + 1) * block_size])
+                cls.coefficient_cache.put((filters[i][0], filters[i][1], gain, fs, cls.alignment), block)
+                blocks[i] = block
+            cls.n_computed += len(missing)
+        return blocks
+
+    @classmethod
+    def get_filter_block(cls, filter_type, cutoff_freq, gain=1, fs=SAMPLING_FREQ_DEFAULT):
+        """
+        Encoded biquad block(s) of a filter, see get_filter_blocks().
+        """
+        return cls.get_filter_blocks(((filter_type, cutoff_freq),), gain, fs)[0]
+
     def calculate_lowpass_filter_coefficients(self, cutoff_freq, gain, fs=SAMPLING_FREQ_DEFAULT):
-        return self.calculate_first_order_butterworth_lowpass_coefficients(cutoff_freq, gain, fs)
+        return self._section_dicts('lowpass', cutoff_freq, gain, fs)
 
     def calculate_highpass_filter_coefficients(self, cutoff_freq, gain, fs=SAMPLING_FREQ_DEFAULT):
-        return self.calculate_first_order_butterworth_highpass_coefficients(cutoff_freq, gain, fs)
+        return self._section_dicts('highpass', cutoff_freq, gain, fs)
+
+    def _section_dicts(self, filter_type, cutoff_freq, gain, fs):
+        """Coefficients of each section of a filter of the service's alignment, as dicts."""
+        sections = self._designer(fs).coefficients([(filter_type, self.alignment, cutoff_freq, gain)])
+        return [dict(zip(COEFFICIENTS_ORDER, section)) for section in sections]
 
     @classmethod
     def save_state(cls, cutoffs, filter_id):
         """
-        Save cutoff frequencies to NVS.
+        Save cutoff frequencies to NVS. Write-behind: the store commits them once edits settle.
         """
-        try:
-            nvs = esp32.NVS(cls.crossover_memory_namespace)
-            # Convert cutoffs to bytes
-            data = json.dumps({filter_id: cutoffs}).encode('utf-8')
-            nvs.set_blob(filter_id, data)  # Store under the filter_id key
-            nvs.commit()  # Save changes
-        except Exception as e:
-            print("Error saving to NVS:", e)
+        cls.store.save(filter_id, cutoffs)
 
     @classmethod
     def load_state(cls, filter_id):
-        try:
-            nvs = esp32.NVS("crossover")
-            
-            # Step 1: Get the size of the blob
-            size = nvs.get_blob(filter_id, bytearray(0))  # Pass empty buffer to get size
-            if size is None:
-                return None  # Key does not exist
-            
-            # Step 2: Allocate a buffer of the exact size
-            data = bytearray(size)
-            
-            # Step 3: Read the blob into the buffer
-            nvs.get_blob(filter_id, data)
-            
-            # Step 4: Decode and parse JSON
-            decoded_data = json.loads(data.decode('utf-8'))
-            return decoded_data.get(filter_id)
-        except Exception as e:
-            print("Error loading from NVS:", e)
-            return None
+        return cls.store.load(filter_id)
 
-    
-    def set_bandpass_cutoff_frequencies(self, low_cutoff, high_cutoff, address):
+    def set_bandpass_cutoff_frequencies(self, low_cutoff, high_cutoff, address, flush=True):
         """
         Set the cutoff frequencies for a bandpass filter.
+
+        The coefficients are staged in the DSP parameter RAM shadow and safeloaded one biquad
+        per IST cycle; with flush=False the caller is expected to call flush() once all the
+        changes of a UI action are staged.
+        """
+        highpass_block, lowpass_block = self.get_filter_blocks((('highpass', high_cutoff), ('lowpass', low_cutoff)))
+        parameter_ram = self.dsp.parameter_ram
+        parameter_ram.stage(highpass_block, address=address, group_words=self.N_COEFFICIENTS_PER_BIQUAD)
+        parameter_ram.stage(lowpass_block, address=address + len(highpass_block) // parameter_ram.ADDR_INCREMENT,
+                            group_words=self.N_COEFFICIENTS_PER_BIQUAD)
+        if flush:
+            self.flush()
+
+    def stage_channel_block(self, block, address):
+        """
+        Stage the encoded biquads of a channel (e.g. from a preset) as they are, from its head address;
+        a safeload flush keeps each biquad in one IST cycle.
         """
-        highpass_coeffs, lowpass_coeffs = self.calculate_bandpass_coefficients(low_cutoff, high_cutoff)
-        highpass_coeffs = [highpass_coeffs['B0'], highpass_coeffs['B1'], highpass_coeffs['A1'], highpass_coeffs['B2'], highpass_coeffs['A2']]
-        lowpass_coeffs = [lowpass_coeffs['B0'], lowpass_coeffs['B1'], lowpass_coeffs['A1'], lowpass_coeffs['B2'], lowpass_coeffs['A2']]
-        coefficients = highpass_coeffs + lowpass_coeffs # 10 coefficients
-        bytes_array = b''.join([self.dsp.DspNumber(v).bytes for v in coefficients])
-        self.dsp.parameter_ram.write(bytes_array = bytes_array, address=address)
+        return self.dsp.parameter_ram.stage(block, address=address, group_words=self.N_COEFFICIENTS_PER_BIQUAD)
+
+    def flush(self, safeload=True):
+        """
+        Send the staged coefficients to the DSP.
+
+        With safeload every biquad is swapped in atomically; without it the words go out in
+        merged bursts, which is quicker when the filters are not live yet (e.g. at boot).
+        Returns the number of bus transactions.
+        """
+        return self.dsp.parameter_ram.flush(safeload=safeload)
+
+    @staticmethod
+    def flush_all(dsps, safeload=True):
+        """
+        Send the staged coefficients of several DSPs as one dispatch, grouped per device. With safeload
+        their IST cycles go round robin, so each DSP's transfer runs while the next one is written
+        instead of being polled. Returns the number of bus transactions.
+        """
+        n_transactions = 0
+        if not safeload or len(dsps) == 1:
+            for dsp in dsps:
+                n_transactions += dsp.parameter_ram.flush(safeload=safeload)
+            return n_transactions
+
+        cycles = [dsp.parameter_ram.flush_cycles() for dsp in dsps if dsp.parameter_ram.n_dirty_words]
+        while cycles:
+            for dsp_cycles in list(cycles):
+                try:
+                    n_transactions += next(dsp_cycles)
+                except StopIteration:
+                    cycles.remove(dsp_cycles)
+        return n_transactions
+
+    def reconcile(self):
+        """
+        Boot: read back the span of the staged coefficients and write only the words the DSP doesn't
+        already hold (self-booted from EEPROM or kept powered), in merged bursts.
+        Returns the snapshot time, words read, words written and bus transactions.
+        """
+        parameter_ram = self.dsp.parameter_ram
+        start = ticks_ms()
+        n_words_read = parameter_ram.reconcile()
+        snapshot_ms = ticks_diff(ticks_ms(), start)
+        n_words_changed = parameter_ram.n_dirty_words
+        return {
+            'snapshot_ms': snapshot_ms,
+            'words_read': n_words_read,
+            'words_changed': n_words_changed,
+            'writes': parameter_ram.flush(safeload=False),
+        }
 
     @staticmethod
     def split_bytes_into_chunks(data, chunk_size=4):
@@ -77,8 +338,7 @@ class CrossoverService:
         Get the coefficients for a crossover filter.
         """
         coefficients = self.dsp.parameter_ram.read(byte_size * n_coefficients, address)
-        coefficients_blocks = self.split_bytes_into_chunks(coefficients, byte_size)
-        return [self.dsp.DspNumber.from_bytes(v).value for v in coefficients_blocks]
+        return self.dsp.DspNumber.decode(coefficients, n_values=n_coefficients)
 
     @staticmethod
     def calculate_first_order_butterworth_lowpass_coefficients(cutoff_freq, gain, fs=SAMPLING_FREQ_DEFAULT):
@@ -91,13 +351,10 @@ class CrossoverService:
         - fs (float): Sampling frequency.
 
         Returns:
-        - dict: Coefficients for the lowpass filter (B0, B1, A1).
+        - dict: Coefficients for the lowpass filter (B0, B1, A1; B2 = A2 = 0).
         """
-        A1 = math.pow(2.7, (-2 * math.pi * cutoff_freq / fs))
-        B0 = gain * (1.0 - A1)
-        B1 = 0
-
-        return {'B0': B0, 'B1': B1, 'B2': 0, 'A1': A1, 'A2': 0}
+        w0 = 2 * math.pi * cutoff_freq / fs
+        return dict(zip(COEFFICIENTS_ORDER, section_coefficients('lowpass', None, math.cos(w0), math.sin(w0), gain)))
 
     @staticmethod
     def calculate_first_order_butterworth_highpass_coefficients(cutoff_freq, gain, fs=SAMPLING_FREQ_DEFAULT):
@@ -110,13 +367,10 @@ class CrossoverService:
         - fs (float): Sampling frequency.
 
         Returns:
-        - dict: Coefficients for the highpass filter (B0, B1, A1).
+        - dict: Coefficients for the highpass filter (B0, B1, A1; B2 = A2 = 0).
         """
-        A1 = math.pow(2.7, (-2 * math.pi * cutoff_freq / fs))
-        B1 = (1.0 + A1) * 0.5 * gain
-        B0 = -B1
-
-        return {'B0': B0, 'B1': B1, 'B2':0, 'A1': A1, 'A2': 0}
+        w0 = 2 * math.pi * cutoff_freq / fs
+        return dict(zip(COEFFICIENTS_ORDER, section_coefficients('highpass', None, math.cos(w0), math.sin(w0), gain)))
 
     
     def calculate_bandpass_coefficients(self, low_cut, high_cut, gain=1, fs=SAMPLING_FREQ_DEFAULT):
@@ -130,8 +384,8 @@ class CrossoverService:
         - fs (float): Sampling frequency.
 
         Returns:
-        - highpass_coeffs (dict): Coefficients for the highpass filter.
-        - lowpass_coeffs (dict): Coefficients for the lowpass filter.
+        - highpass_coeffs (list of dict): Coefficients of each section of the highpass filter.
+        - lowpass_coeffs (list of dict): Coefficients of each section of the lowpass filter.
         """
         highpass_coeffs = self.calculate_highpass_filter_coefficients(high_cut, gain, fs)
         lowpass_coeffs = self.calculate_lowpass_filter_coefficients(low_cut, gain, fs)
@@ -1,20 +1,26 @@
+from features.display.oled_renderer import DirtyPageRenderer
+
+
 class Display:
     
     def __init__(self, lcd=None, oled=None, device='lcd'):
         self.lcd = lcd
         self.oled = oled
         self.device = device
+        self.oled_renderer = DirtyPageRenderer(oled) if oled is not None else None
 
     def show_lcd(self, content):
-        self.lcd.clear()
-        self.lcd.putstr(display_text)
+        self.lcd.show(content)  # only the changed characters go over I2C
 
     def show_oled(self, content):
+        self.draw_oled(content)
+        self.oled_renderer.show()  # only the changed pages and columns go over I2C
+
+    def draw_oled(self, content):
         self.oled.fill(0)
         lines = content.split('\n')
         for i, line in enumerate(lines):
             self.oled.text(line, 0, i * 10)
-        self.oled.show()
 
 
     def show(self, content):
@@ -22,3 +28,25 @@ class Display:
             self.show_oled(content)
         else:
             self.show_lcd(content)
+
+    def show_steps(self, content):
+        """ show() as a generator yielding between bus transactions, for a BusManager job """
+        if self.device == 'oled':
+            self.draw_oled(content)
+            yield from self.oled_renderer.show_steps()
+        else:
+            self.show_lcd(content)
+            yield
+
+
+class QueuedDisplay:
+    """
+    Stands in for the Display on the navigator side: frames are put on a queue and
+    rendered by the display task, so a slow flush never runs inside an event handler.
+    """
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def show(self, content):
+        self.queue.put_nowait(content)
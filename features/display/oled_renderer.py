@@ -0,0 +1,153 @@
+class DirtyPageRenderer:
+    """
+    Sends an SSD1306 framebuffer to the display, transmitting only what changed since
+    the previous frame.
+
+    The frame is compared with the last one sent, page (8 pixel rows) by page. Changed
+    columns of a page are grouped into spans, bridging gaps cheaper to resend than to
+    address separately. Spans of consecutive pages are merged into one rectangle when
+    that costs fewer bytes. Each rectangle is one command transaction (column and page
+    window) and data transactions of at most MAX_CHUNK_BYTES, streamed in the horizontal
+    addressing mode set by SSD1306.init_display. show_steps() yields after each of them, so
+    a shared bus can serve other devices in between.
+    """
+    SET_COL_ADDR = 0x21
+    SET_PAGE_ADDR = 0x22
+    N_WINDOW_BYTES = 8  # command control byte + 6 command bytes + data control byte
+    MERGE_GAP_COLUMNS = N_WINDOW_BYTES  # unchanged columns worth resending to save a window
+    MAX_CHUNK_BYTES = 128  # one page row, about 3 ms at 400 kHz
+
+    def __init__(self, oled):
+        self.oled = oled
+        self.width = oled.width
+        self.pages = oled.pages
+        self.column_offset = 32 if oled.width == 64 else 0  # as in SSD1306.show
+        self.is_i2c = hasattr(oled, 'i2c')
+
+        self._previous = bytearray(len(oled.buffer))
+        self._valid = False  # the first frame is always sent in full
+        self._window = bytearray(b'\x00' + bytes(6))  # Co=0, D/C#=0: a run of command bytes
+        self._window[1] = self.SET_COL_ADDR
+        self._window[4] = self.SET_PAGE_ADDR
+
+        self.frames = 0
+        self.last_frame_bytes = 0
+        self.last_frame_rects = 0
+        self.total_bytes = 0
+
+    def invalidate(self):
+        """Forget the last frame, e.g. after the display lost its RAM; the next show() sends it all."""
+        self._valid = False
+
+    def show(self):
+        """Send the changed regions of oled.buffer. Returns the number of bytes written."""
+        for _ in self.show_steps():
+            pass
+        return self.last_frame_bytes
+
+    def show_steps(self):
+        """show() as a generator, yielding after every bus transaction chunk."""
+        if self._valid:
+            rects = self.dirty_rects()
+        else:
+            rects = [(0, self.width - 1, 0, self.pages - 1)]
+
+        n_bytes = 0
+        for rect in rects:
+            for n in self._send_rect(*rect):
+                n_bytes += n
+                yield
+
+        self._previous[:] = self.oled.buffer
+        self._valid = True
+
+        self.frames += 1
+        self.last_frame_bytes = n_bytes
+        self.last_frame_rects = len(rects)
+        self.total_bytes += n_bytes
+
+    def _page_spans(self, page):
+        """Column spans (x0, x1) of a page that differ from the previous frame."""
+        buffer = self.oled.buffer
+        previous = self._previous
+        start = page * self.width
+        end = start + self.width
+        if buffer[start:end] == previous[start:end]:
+            return []
+
+        spans = []
+        x0 = x1 = -1
+        for i in range(start, end):
+            if buffer[i] != previous[i]:
+                x = i - start
+                if x0 < 0:
+                    x0 = x
+                elif x - x1 - 1 > self.MERGE_GAP_COLUMNS:
+                    spans.append((x0, x1))
+                    x0 = x
+                x1 = x
+        spans.append((x0, x1))
+        return spans
+
+    @classmethod
+    def _cost(cls, x0, x1, p0, p1):
+        return cls.N_WINDOW_BYTES + (x1 - x0 + 1) * (p1 - p0 + 1)
+
+    def dirty_rects(self):
+        """Rectangles (x0, x1, p0, p1) covering every change since the previous frame."""
+        rects = []
+        open_rects = []  # indices in rects of the rectangles ending on the previous page
+        for page in range(self.pages):
+            ending_here = []
+            for x0, x1 in self._page_spans(page):
+                merged = False
+                for idx in open_rects + ending_here:
+                    r_x0, r_x1, r_p0, r_p1 = rects[idx]
+                    u_x0, u_x1 = min(x0, r_x0), max(x1, r_x1)
+                    if self._cost(u_x0, u_x1, r_p0, page) <= self._cost(*rects[idx]) + self._cost(x0, x1, page, page):
+                        rects[idx] = (u_x0, u_x1, r_p0, page)
+                        if idx not in ending_here:
+                            ending_here.append(idx)
+                        merged = True
+                        break
+                if not merged:
+                    rects.append((x0, x1, page, page))
+                    ending_here.append(len(rects) - 1)
+            open_rects = ending_here
+        return rects
+
+    def _send_rect(self, x0, x1, p0, p1):
+        """Generator: sends a rectangle chunk by chunk, yielding the bytes of each."""
+        window = self._window
+        window[2] = x0 + self.column_offset
+        window[3] = x1 + self.column_offset
+        window[5] = p0
+        window[6] = p1
+
+        buffer = memoryview(self.oled.buffer)
+        rows = [buffer[page * self.width + x0: page * self.width + x1 + 1] for page in range(p0, p1 + 1)]
+
+        if not self.is_i2c:
+            for cmd in window[1:]:
+                self.oled.write_cmd(cmd)
+            for row in rows:
+                self.oled.write_data(row)
+            yield self.N_WINDOW_BYTES + (x1 - x0 + 1) * (p1 - p0 + 1)
+            return
+
+        # the RAM pointer stays in the window between transactions: each chunk continues the previous one
+        self.oled.i2c.writeto(self.oled.addr, window)
+        n_bytes = self.N_WINDOW_BYTES - 1
+        chunk = [b'\x40']  # Co=0, D/C#=1
+        chunk_bytes = 0
+        for row in rows:
+            if chunk_bytes and chunk_bytes + len(row) > self.MAX_CHUNK_BYTES:
+                self.oled.i2c.writevto(self.oled.addr, chunk)
+                yield n_bytes + 1 + chunk_bytes
+                n_bytes = 0
+                chunk = [b'\x40']
+                chunk_bytes = 0
+            chunk.append(row)
+            chunk_bytes += len(row)
+        self.oled.i2c.writevto(self.oled.addr, chunk)
+        yield n_bytes + 1 + chunk_bytes
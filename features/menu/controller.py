@@ -1,16 +1,28 @@
 class Menu:
     CURSOR_SYMBOL = '>'
+    N_LINES = 2  # Lines of the display; the list scrolls to keep the cursor on them
     
     def __init__(self, items, name='Menu'):
         self.name = name
         self.items = items
         self.cursor_position = 0
         self.max_cursor_position = len(items) - 1
+        self.top = 0  # First item on the display
+
+    def item_label(self, index):
+        return self.items[index].name
 
     def display(self):
-        line1 = f"{self.CURSOR_SYMBOL if self.cursor_position == 0 else ' '} {self.items[0].name}"
-        line2 = f"{self.CURSOR_SYMBOL if self.cursor_position == 1 else ' '} {self.items[1].name}"
-        return f"{line1}\n{line2}"
+        # Scroll just enough to bring the cursor back on the display
+        if self.cursor_position < self.top:
+            self.top = self.cursor_position
+        elif self.cursor_position >= self.top + self.N_LINES:
+            self.top = self.cursor_position - self.N_LINES + 1
+
+        lines = []
+        for i in range(self.top, min(self.top + self.N_LINES, len(self.items))):
+            lines.append(f"{self.CURSOR_SYMBOL if i == self.cursor_position else ' '} {self.item_label(i)}")
+        return "\n".join(lines)
 
     def on_click(self, navigator=None):
         if navigator:
@@ -21,8 +33,8 @@ class Menu:
         # As the root page, back does nothing
         return True  # Prevent exiting the menu
 
-    def on_right(self):
+    def on_right(self, data=None):
         self.cursor_position = min(self.cursor_position + 1, self.max_cursor_position)
 
-    def on_left(self):
-        self.cursor_position = max(self.cursor_position - 1, 0)
\ No newline at end of file
+    def on_left(self, data=None):
+        self.cursor_position = max(self.cursor_position - 1, 0)
@@ -33,9 +33,9 @@ class Navigator:
             self.go_back()
 
     def on_right(self, data=None):
-        self.current_page.on_right()
+        self.current_page.on_right(data)
         self.display_current_page()
 
     def on_left(self, data=None):
-        self.current_page.on_left()
+        self.current_page.on_left(data)
         self.display_current_page()
\ No newline at end of file
@@ -0,0 +1,24 @@
+from features.menu.controller import Menu
+
+
+class PresetsPage(Menu):
+    """
+    Menu page of the crossover presets: click recalls the preset under the cursor, marked with '*'
+    while the crossovers hold its cutoffs.
+    """
+    ACTIVE_SYMBOL = '*'
+
+    def __init__(self, bank, crossovers, name='Presets'):
+        super().__init__(items=bank.names, name=name)
+        self.bank = bank
+        self.crossovers = crossovers
+
+    def item_label(self, index):
+        name = self.items[index]
+        return f"{name} {self.ACTIVE_SYMBOL}" if self.bank.matches(index, self.crossovers) else name
+
+    def on_click(self, navigator=None):
+        self.bank.recall(self.cursor_position, self.crossovers)
+
+    def on_back(self):
+        return False  # Allow Navigator to go back
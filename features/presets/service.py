@@ -0,0 +1,138 @@
+import struct
+
+from external.sigma.sigma_dsp.adau.adau import SAMPLING_FREQ_DEFAULT
+from features.crossover.service import CrossoverService
+from utils.hashing import fnv1a32
+
+
+class PresetBank:
+    """
+    Named crossover presets, each the encoded parameter RAM image of every crossover channel it sets
+    (highpass then lowpass biquads from the channel head), flagged with the cutoffs it came from.
+    Built on the host by utils/build_presets.py; recalling one stages the blocks as they are.
+
+    Layout: header, then per preset its name and channel count, then per channel the FNV-1a hash of its
+    crossover's name, its head address, cutoffs and encoded block.
+    """
+    MAGIC = b'XPR'
+    VERSION = 2
+    # magic, version, number of presets, bytes per channel block, fs, alignment
+    HEADER_FORMAT = '<3sBBHI3s'
+    PRESET_FORMAT = '<16sB'  # name, number of channels
+    CHANNEL_FORMAT = '<IHHH'  # crossover name hash, head address, low cutoff, high cutoff
+    HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+    PRESET_SIZE = struct.calcsize(PRESET_FORMAT)
+    CHANNEL_SIZE = struct.calcsize(CHANNEL_FORMAT)
+    NAME_SIZE = 16
+
+    def __init__(self, image, fs, alignment, block_size, presets):
+        self._image = memoryview(image)
+        self.fs = fs
+        self.alignment = alignment
+        self.block_size = block_size
+        self._presets = presets  # [(name, offset of its first channel, number of channels)]
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as file:
+            image = file.read()
+        magic, version, n_presets, block_size, fs, alignment = struct.unpack_from(cls.HEADER_FORMAT, image, 0)
+        assert magic == cls.MAGIC and version == cls.VERSION, 'Not a preset bank: {}'.format(path)
+
+        presets = []
+        offset = cls.HEADER_SIZE
+        for _ in range(n_presets):
+            name, n_channels = struct.unpack_from(cls.PRESET_FORMAT, image, offset)
+            offset += cls.PRESET_SIZE
+            presets.append((name.rstrip(b'\x00').decode(), offset, n_channels))
+            offset += n_channels * (cls.CHANNEL_SIZE + block_size)
+        return cls(image, fs, alignment.decode(), block_size, presets)
+
+    @classmethod
+    def build(cls, path, presets, fs=SAMPLING_FREQ_DEFAULT):
+        """
+        presets: [(name, [(crossover name, head address, low cutoff, high cutoff), ...]), ...]; the blocks
+        are encoded as CrossoverService writes them, in its alignment.
+        """
+        alignment = CrossoverService.alignment
+        block_size = 0
+        body = []
+        for name, channels in presets:
+            assert len(name.encode()) <= cls.NAME_SIZE, 'Preset name too long: {}'.format(name)
+            body.append(struct.pack(cls.PRESET_FORMAT, name.encode(), len(channels)))
+            for crossover_name, head_address, low_cutoff, high_cutoff in channels:
+                block = cls.encode_channel(low_cutoff, high_cutoff, fs)
+                block_size = len(block)
+                body.append(struct.pack(cls.CHANNEL_FORMAT, fnv1a32(crossover_name), head_address, low_cutoff,
+                                        high_cutoff))
+                body.append(block)
+
+        with open(path, 'wb') as file:
+            file.write(struct.pack(cls.HEADER_FORMAT, cls.MAGIC, cls.VERSION, len(presets), block_size, fs,
+                                   alignment.encode()))
+            for chunk in body:
+                file.write(chunk)
+
+    @staticmethod
+    def encode_channel(low_cutoff, high_cutoff, fs=SAMPLING_FREQ_DEFAULT):
+        """Parameter RAM image of a channel from its head: highpass then lowpass, see set_bandpass_cutoff_frequencies()."""
+        highpass_block, lowpass_block = CrossoverService.get_filter_blocks(
+            (('highpass', high_cutoff), ('lowpass', low_cutoff)), fs=fs)
+        return highpass_block + lowpass_block
+
+    @property
+    def names(self):
+        return [name for name, _, _ in self._presets]
+
+    def __len__(self):
+        return len(self._presets)
+
+    @property
+    def is_current(self):
+        """False if the blocks were encoded for another alignment or sampling rate than the service's."""
+        return self.alignment == CrossoverService.alignment and self.fs == SAMPLING_FREQ_DEFAULT
+
+    def channels(self, index):
+        """
+        {(crossover name hash, head address): (low cutoff, high cutoff, block)} of a preset; block is a
+        memoryview of the image, or None if the bank isn't current and the channel has to be computed
+        from its cutoffs.
+        """
+        _, offset, n_channels = self._presets[index]
+        is_current = self.is_current
+        channels = {}
+        for _ in range(n_channels):
+            name_hash, head_address, low_cutoff, high_cutoff = struct.unpack_from(self.CHANNEL_FORMAT, self._image,
+                                                                                  offset)
+            offset += self.CHANNEL_SIZE
+            block = self._image[offset: offset + self.block_size] if is_current else None
+            channels[(name_hash, head_address)] = (low_cutoff, high_cutoff, block)
+            offset += self.block_size
+        return channels
+
+    def matches(self, index, crossovers):
+        """True if the crossovers hold the cutoffs of a preset."""
+        by_name = {fnv1a32(crossover.name): crossover for crossover in crossovers}
+        for (name_hash, head_address), (low_cutoff, high_cutoff, _) in self.channels(index).items():
+            crossover = by_name.get(name_hash)
+            frequencies = crossover.saved_frequencies.get(str(head_address)) if crossover else None
+            if frequencies is None or tuple(frequencies) != (low_cutoff, high_cutoff):
+                return False
+        return True
+
+    def recall(self, index, crossovers):
+        """
+        Apply a preset to the crossovers holding its channels: the encoded blocks are staged as they
+        are, no coefficient is computed, and land on the DSPs together, one safeload batch across
+        crossovers and devices (through their scheduler, or flushed here if they have none).
+        Returns the number of channels applied.
+        """
+        channels = self.channels(index)
+        n_applied = 0
+        unscheduled = {}  # id of the DSP: DSP
+        for crossover in crossovers:
+            n_applied += crossover.recall_preset(channels)
+            if crossover.scheduler is None:
+                unscheduled[id(crossover.service.dsp)] = crossover.service.dsp
+        CrossoverService.flush_all(list(unscheduled.values()))
+        return n_applied
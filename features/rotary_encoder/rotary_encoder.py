@@ -1,24 +1,75 @@
-import time
+from array import array
+
+from utils.ticks import ticks_ms, ticks_diff
+
+# Quadrature transition table indexed by (previous state << 2) | current state, where a
+# state is (clk << 1) | dt. +1 for a step to the right (DT follows CLK), -1 to the left,
+# 0 for no change or an invalid (bouncing / skipped) transition.
+QUADRATURE_TABLE = array('b', [
+    0, 1, -1, 0,
+    -1, 0, 0, 1,
+    1, 0, 0, -1,
+    0, -1, 1, 0,
+])
+
+# CLK and DT both high: the detent rest position, with the pull-ups
+REST_STATE = 0b11
+
 
 class RotaryEncoder:
-    def __init__(self, clk_pin, dt_pin, sw_pin, event_bus):
+    TRANSITIONS_PER_DETENT = 4  # full quadrature cycle per click, as on the KY-040
+    BUFFER_SIZE = 32
+
+    # Velocity acceleration: (detents per second, step multiplier), checked in order
+    VELOCITY_WINDOW_MS = 200
+    ACCELERATION = ((40, 10), (20, 5), (10, 2))
+
+    def __init__(self, clk_pin, dt_pin, sw_pin, event_bus,
+                 transitions_per_detent=TRANSITIONS_PER_DETENT, clock=ticks_ms, wake=None):
         """
         Initialize the RotaryEncoder.
 
+        Both CLK and DT raise interrupts; the handler decodes the quadrature state and
+        records signed detents with their timestamp in a preallocated ring buffer, which
+        read() drains from the main loop into right and left events.
+
         Args:
             clk_pin: A configured Pin instance for the CLK pin.
             dt_pin: A configured Pin instance for the DT pin.
             sw_pin: A configured Pin instance for the SW (switch) pin.
             event_bus: The event bus to emit events to.
-            irq_trigger: The trigger value for the IRQ (e.g., IRQ_FALLING).
+            transitions_per_detent: Quadrature transitions between two clicks of the knob.
+            clock: Millisecond tick source, replaceable when replaying edges on a host.
+            wake: Optional ThreadSafeFlag set by the interrupt handlers when there is something to read().
         """
         self.clk = clk_pin
         self.dt = dt_pin
         self.sw = sw_pin
         self.event_bus = event_bus
+        self.transitions_per_detent = transitions_per_detent
+        self.clock = clock
+        self.wake = wake
 
-        # Monitors state changes
-        self.last_clk = self.clk.value()
+        # Decoder state, only touched by the interrupt handler
+        self._state = (self.clk.value() << 1) | self.dt.value()
+        self._transitions = 0
+
+        # Ring buffer of detents: written by the interrupt handler, read by read()
+        self._deltas = array('b', bytes(self.BUFFER_SIZE))
+        self._timestamps = array('L', [0] * self.BUFFER_SIZE)
+        self._head = 0  # next slot to write
+        self._tail = 0  # next slot to read
+
+        # Timestamps of the latest detents, for the velocity
+        self._history = array('L', [0] * self.BUFFER_SIZE)
+        self._history_head = 0
+        self._history_count = 0
+
+        # Bound once, so registering the handlers is the only allocation
+        edge_handler = self.handle_edge
+        trigger = self.clk.IRQ_FALLING | self.clk.IRQ_RISING
+        self.clk.irq(trigger=trigger, handler=edge_handler)
+        self.dt.irq(trigger=trigger, handler=edge_handler)
 
         # Triggers self.handle_click if switch button is clicked
         self.sw.irq(trigger=self.sw.IRQ_FALLING, handler=self.handle_click)
@@ -26,27 +77,104 @@ class RotaryEncoder:
         # Variables for debouncing
         self.last_click_time = 0  # Track the last click time
         self.debounce_time = 10
+        self._clicks = 0  # Debounced clicks not yet emitted by read()
 
     def handle_click(self, pin):
         """
-        Handle the switch click event with debouncing.
+        Handle the switch click event with debouncing. Runs in interrupt context: the click
+        is only counted, read() emits it.
         """
-        current_time = time.ticks_ms()
-        if current_time - self.last_click_time > self.debounce_time:  # Debounce check
+        current_time = self.clock()
+        if ticks_diff(current_time, self.last_click_time) > self.debounce_time:  # Debounce check
             self.last_click_time = current_time
-            self.event_bus.emit("click")
+            self._clicks += 1
+            if self.wake is not None:
+                self.wake.set()
+
+    def handle_edge(self, pin):
+        """
+        Decode a CLK or DT edge. Runs in interrupt context: no heap allocation.
+        """
+        state = (self.clk.value() << 1) | self.dt.value()
+        step = QUADRATURE_TABLE[(self._state << 2) | state]
+        self._state = state
+        if step:
+            self._transitions += step
+            if self._transitions >= self.transitions_per_detent:
+                self._transitions = 0
+                self._push(1)
+            elif self._transitions <= -self.transitions_per_detent:
+                self._transitions = 0
+                self._push(-1)
+
+        if state == REST_STATE and self._transitions:
+            # Back at a detent with a partial count: at least half a click means an edge was
+            # missed on the way, less is bounce. Neither may carry over to the next detent.
+            if self._transitions >= self.transitions_per_detent // 2:
+                self._push(1)
+            elif self._transitions <= -(self.transitions_per_detent // 2):
+                self._push(-1)
+            self._transitions = 0
+
+    def _push(self, delta):
+        head = self._head
+        next_head = (head + 1) % self.BUFFER_SIZE
+        if next_head == self._tail:
+            # Buffer full: fold the detent into the newest entry instead of losing it
+            last = (head - 1) % self.BUFFER_SIZE
+            self._deltas[last] = max(-127, min(127, self._deltas[last] + delta))
+            return
+        self._deltas[head] = delta
+        self._timestamps[head] = self.clock()
+        self._head = next_head
+        if self.wake is not None:
+            self.wake.set()
+
+    @property
+    def pending(self):
+        """Number of buffered entries not yet read."""
+        return (self._head - self._tail) % self.BUFFER_SIZE
+
+    def _record_detent(self, timestamp):
+        self._history[self._history_head] = timestamp
+        self._history_head = (self._history_head + 1) % self.BUFFER_SIZE
+        self._history_count = min(self._history_count + 1, self.BUFFER_SIZE)
+
+    def velocity(self, now=None):
+        """Detents per second over the last VELOCITY_WINDOW_MS."""
+        now = self.clock() if now is None else now
+        n_detents = 0
+        for i in range(self._history_count):
+            timestamp = self._history[(self._history_head - 1 - i) % self.BUFFER_SIZE]
+            if ticks_diff(now, timestamp) >= self.VELOCITY_WINDOW_MS:
+                break
+            n_detents += 1
+        return n_detents * 1000 / self.VELOCITY_WINDOW_MS
+
+    def acceleration(self, now=None):
+        """Step multiplier for the current spin speed."""
+        velocity = self.velocity(now)
+        for min_velocity, multiplier in self.ACCELERATION:
+            if velocity >= min_velocity:
+                return multiplier
+        return 1
 
     def read(self):
-        """Verify the direction of encoder rotation and emits right and left events"""
-        current_clk = self.clk.value()
-        current_dt = self.dt.value()
-
-        if current_clk != self.last_clk:  # Detects change in the clock
-            # If DT value is equal to clock, it's moving right
-            if current_dt == current_clk:
-                self.event_bus.emit("right")
-            else:
-                self.event_bus.emit("left")
-
-        # Updates last clock value
-        self.last_clk = current_clk
\ No newline at end of file
+        """Drain the detents and clicks recorded by the interrupt handlers and emit right, left and click events.
+
+        The event data of right and left is the acceleration multiplier for the spin speed at that detent.
+        """
+        while self._tail != self._head:
+            tail = self._tail
+            delta = self._deltas[tail]
+            timestamp = self._timestamps[tail]
+            self._tail = (tail + 1) % self.BUFFER_SIZE
+
+            event = "right" if delta > 0 else "left"
+            for _ in range(abs(delta)):
+                self._record_detent(timestamp)
+                self.event_bus.emit(event, self.acceleration(timestamp))
+
+        while self._clicks:
+            self._clicks -= 1
+            self.event_bus.emit("click")
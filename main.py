@@ -1,38 +1,64 @@
-from machine import SoftI2C, Pin
-import time
+try:
+    from machine import I2C, SoftI2C, Pin
+    from external.oled.ssd1306 import SSD1306_I2C
+except ImportError:  # CPython: run against the stand-ins in simulation/
+    from simulation.machine import I2C, SoftI2C, Pin
+    from simulation.oled import SSD1306_I2C
 
 from external.sigma.sigma_dsp.adau.adau1401.adau1401 import ADAU1401 as ADAU
 from external.sigma.bus.adapters import I2C as SigmaI2C
-from external.lcd.i2c_lcd import I2cLcd
-from external.oled.ssd1306 import SSD1306_I2C
+from external.sigma.bus.trace import BusTracer
 
 from config import (
     DSP_SCL_PIN, DSP_SDA_PIN,
     ROTARY_ENCODER_CLK_PIN, ROTARY_ENCODER_DT_PIN, ROTARY_ENCODER_SW_PIN,
-    BACK_BUTTON_PIN, LCD_SCL_PIN, LCD_SDA_PIN, I2C_FREQ, OLED_SCL_PIN, OLED_SDA_PIN
+    BACK_BUTTON_PIN, LCD_SCL_PIN, LCD_SDA_PIN, I2C_FREQ, OLED_SCL_PIN, OLED_SDA_PIN,
+    COEFFICIENT_TABLE_PATH, TRACE_BUS, TRACE_PATH, PRESETS_PATH, DSP_ADDRESSES, CROSSOVERS
 )
 
 from features.events.event_bus import EventBus
 from features.navigator.controller import Navigator
 from features.rotary_encoder import RotaryEncoder
 from features.back_button import BackButton
-from features.display.controller import Display
+from features.display.controller import Display, QueuedDisplay
 from features.crossover.controller import TwoWayCrossover
+from features.crossover.service import CrossoverService
+from features.crossover.scheduler import UpdateScheduler
 from features.menu.controller import Menu
+from features.presets.controller import PresetsPage
+from features.presets.service import PresetBank
 from utils.get_params import get_params
+from utils.aio import asyncio, sleep_ms, BoundedQueue, ThreadSafeFlag
+from utils.bus_manager import BusManager, PRIORITY_DSP, PRIORITY_DISPLAY
 
 class App:
+    DISPLAY_MAX_FPS = 20
+    DISPLAY_QUEUE_SIZE = 1  # Only the latest frame is worth drawing
+    PERSISTENCE_INTERVAL_MS = 100
+    HARDWARE_I2C_IDS = (0, 1)  # ESP32 I2C controllers, routable to any pins
+
     def __init__(self):
         """Initialize the application."""
+        self.frame_queue = BoundedQueue(self.DISPLAY_QUEUE_SIZE)
+        self.input_flag = ThreadSafeFlag()  # set by the encoder and back button interrupt handlers
+        self.dsp_wake = asyncio.Event()  # set when a coefficient update is submitted
+        self.dsp_idle = asyncio.Event()  # set while no coefficient update is pending
+        self.buses = {}  # (scl, sda): BusManager
+        self.tracer = BusTracer() if TRACE_BUS else None  # from the REPL: app.tracer.print()
         self.event_bus = self._initialize_event_bus()
-        self.dsp = self._initialize_dsp()
+        self.dsps = self._initialize_dsps()
+        self.dsp = self.dsps[0]
         #self.lcd = self._initialize_lcd()
         self.oled = self._initialize_oled()
         self.display = self._initialize_display()
         self.params = self._load_params()
         self.encoder = self._initialize_rotary_encoder()
         self.back_button = self._initialize_back_button()
+        self.coefficient_table = self._load_coefficient_table()
+        self.scheduler = self._initialize_scheduler()
         self.two_way_crossovers = self._initialize_crossovers()
+        self.boot_report = self._reconcile_dsp()
+        self.presets = self._load_presets()
         self.menu = self._initialize_menu()
         self.navigator = self._initialize_navigator()
         self._register_event_listeners()
@@ -41,66 +67,126 @@ class App:
         """Initialize and return the EventBus."""
         return EventBus()
 
-    def _initialize_dsp(self):
-        """Initialize and return the DSP."""
-        dsp_i2c = SoftI2C(scl=Pin(DSP_SCL_PIN), sda=Pin(DSP_SDA_PIN), freq=I2C_FREQ)
-        bus = SigmaI2C(dsp_i2c)
-        return ADAU(bus)
+    def _initialize_dsps(self):
+        """Initialize and return the DSPs of DSP_ADDRESSES, sharing the DSP bus."""
+        self.dsp_bus = self._bus(DSP_SCL_PIN, DSP_SDA_PIN)
+        bus = SigmaI2C(self.dsp_bus.handle('dsp', PRIORITY_DSP))
+        if self.tracer:
+            self.tracer.attach(bus)
+        return [ADAU(bus, i2c_address=address) for address in DSP_ADDRESSES]
 
     def _initialize_menu(self):
-        return Menu(items=self.two_way_crossovers)
+        items = list(self.two_way_crossovers)
+        if self.presets:
+            items.append(PresetsPage(self.presets, self.two_way_crossovers))
+        return Menu(items=items)
 
     def _initialize_lcd(self):
         """Initialize and return the LCD."""
-        lcd_i2c = SoftI2C(scl=Pin(LCD_SCL_PIN), sda=Pin(LCD_SDA_PIN), freq=I2C_FREQ)
+        from external.lcd.i2c_lcd import I2cLcd
+        self.display_bus = self._bus(LCD_SCL_PIN, LCD_SDA_PIN)
+        lcd_i2c = self.display_bus.handle('lcd', PRIORITY_DISPLAY)
+        if self.tracer:
+            self.tracer.attach_i2c(lcd_i2c)
+            self.tracer.set_action('display init')
         return I2cLcd(lcd_i2c, 0x27, 2, 16)
 
     def _initialize_oled(self):
         """Initialize and return the oled."""
-        oled_i2c = SoftI2C(scl=Pin(OLED_SCL_PIN), sda=Pin(OLED_SDA_PIN), freq=I2C_FREQ)
+        self.display_bus = self._bus(OLED_SCL_PIN, OLED_SDA_PIN)
+        oled_i2c = self.display_bus.handle('oled', PRIORITY_DISPLAY)
+        if self.tracer:
+            self.tracer.attach_i2c(oled_i2c)
+            self.tracer.set_action('display init')
         return SSD1306_I2C(128, 64, oled_i2c, addr=0x3C, external_vcc=False)
 
+    def _bus(self, scl_pin, sda_pin):
+        """
+        The BusManager of a pin pair, shared by the devices on it: a hardware I2C controller while
+        one is free, SoftI2C otherwise.
+        """
+        key = (scl_pin, sda_pin)
+        if key not in self.buses:
+            i2c = None
+            for i2c_id in self.HARDWARE_I2C_IDS[len(self.buses):]:
+                try:
+                    i2c = I2C(i2c_id, scl=Pin(scl_pin), sda=Pin(sda_pin), freq=I2C_FREQ)
+                    break
+                except (ValueError, OSError):  # controller missing or taken on this port
+                    pass
+            if i2c is None:
+                i2c = SoftI2C(scl=Pin(scl_pin), sda=Pin(sda_pin), freq=I2C_FREQ)
+            self.buses[key] = BusManager(i2c, tracer=self.tracer)
+        return self.buses[key]
+
 
     def _load_params(self):
         """Load and return the parameters."""
         return get_params()
 
+    def _load_coefficient_table(self):
+        """Load the precomputed crossover coefficients, if the table was built."""
+        return CrossoverService.load_coefficient_table(COEFFICIENT_TABLE_PATH)
+
+    def _load_presets(self):
+        """Load the pre-encoded crossover presets, if the bank was built."""
+        try:
+            return PresetBank.load(PRESETS_PATH)
+        except OSError as e:
+            print("No presets loaded:", e)
+            return None
+
+    def _initialize_scheduler(self):
+        """Initialize and return the rate-limited scheduler of live preview DSP writes."""
+        return UpdateScheduler(commit=lambda: CrossoverService.flush_all(self.dsps),
+                               wake=self.dsp_wake, idle=self.dsp_idle)
+
     def _initialize_rotary_encoder(self):
         """Initialize and return the RotaryEncoder."""
         return RotaryEncoder(
             clk_pin=Pin(ROTARY_ENCODER_CLK_PIN, Pin.IN, Pin.PULL_UP),
             dt_pin=Pin(ROTARY_ENCODER_DT_PIN, Pin.IN, Pin.PULL_UP),
             sw_pin=Pin(ROTARY_ENCODER_SW_PIN, Pin.IN, Pin.PULL_UP),
-            event_bus=self.event_bus
+            event_bus=self.event_bus,
+            wake=self.input_flag
         )
 
     def _initialize_back_button(self):
         """Initialize and return the BackButton."""
-        return BackButton(back_button_pin=Pin(BACK_BUTTON_PIN, Pin.IN, Pin.PULL_UP), event_bus=self.event_bus)
+        return BackButton(back_button_pin=Pin(BACK_BUTTON_PIN, Pin.IN, Pin.PULL_UP), event_bus=self.event_bus,
+                          wake=self.input_flag)
 
     def _initialize_crossovers(self):
-        """Initialize and return the TwoWayCrossover."""
+        """Initialize and return a TwoWayCrossover per entry of CROSSOVERS, on its cell and DSP."""
         return [
             TwoWayCrossover(
-                self.dsp,
-                self.params['Crossover1'],
-                name='Xover-R',
-                channel_names=['A', 'B']
-                ),
-            TwoWayCrossover(
-                self.dsp,
-                self.params['Crossover1_2'],
-                name='Xover-L',
-                channel_names=['C', 'D']
+                self.dsps[dsp_index],
+                self.params[cell_name],
+                name=name,
+                channel_names=list(channel_names),
+                scheduler=self.scheduler,
+                flush=False
                 )
+            for name, cell_name, channel_names, dsp_index in CROSSOVERS
         ]
+
+    def _reconcile_dsp(self):
+        """Write the coefficients staged by the crossovers, skipping the words each DSP already holds."""
+        report = {'snapshot_ms': 0, 'words_read': 0, 'words_changed': 0, 'writes': 0}
+        for dsp in self.dsps:
+            for key, value in CrossoverService(dsp).reconcile().items():
+                report[key] += value
+        print("DSP reconciled ({n_dsps}): {snapshot_ms} ms snapshot of {words_read} words, "
+              "{words_changed} changed, {writes} writes".format(n_dsps=len(self.dsps), **report))
+        return report
+
     def _initialize_display(self):
         return Display(oled=self.oled, device='oled')
 
     def _initialize_navigator(self):
         """Initialize and return the Navigator."""
         return Navigator(
-            display=self.display,
+            display=QueuedDisplay(self.frame_queue),
             initial_page=self.menu
         )
 
@@ -111,11 +197,67 @@ class App:
         self.event_bus.subscribe("click", self.navigator.on_click)
         self.event_bus.subscribe("back", self.navigator.on_back)
 
-    def run(self):
-        """Main loop to continuously read the encoder state."""
+    async def input_task(self):
+        """Emit the encoder and back button events once their interrupt handlers signal some; handlers only queue work for the other tasks."""
+        while True:
+            await self.input_flag.wait()
+            self.encoder.read()  # Emits the buffered encoder rotations and clicks
+            self.back_button.read()
+
+    async def dsp_task(self):
+        """Land queued coefficient updates, at most MAX_WRITES_PER_SECOND, ahead of any display traffic."""
+        while True:
+            await self.dsp_wake.wait()
+            self.dsp_wake.clear()
+            delay_ms = self.scheduler.delay_ms
+            if delay_ms is None:  # committed or cancelled meanwhile
+                continue
+            if delay_ms:
+                await sleep_ms(delay_ms)  # until the next rate-limit slot
+            await self.dsp_bus.transact(PRIORITY_DSP, self.scheduler.poll, action='crossover update')
+            if self.scheduler.pending:  # woke a tick early: poll() left them for the next slot
+                self.dsp_wake.set()
+
+    async def wait_dsp_idle(self):
+        """Wait until no coefficient write is pending, so it never waits behind a display flush or NVS commit."""
+        await self.dsp_idle.wait()
+
+    async def display_task(self):
+        """Render the latest frame, at most DISPLAY_MAX_FPS times a second."""
+        frame_interval_ms = 1000 // self.DISPLAY_MAX_FPS
+        while True:
+            content = await self.frame_queue.get()
+            # sent in chunks: a coefficient update due meanwhile goes out between two of them
+            await self.display_bus.transact(PRIORITY_DISPLAY, self.display.show_steps(content),
+                                            action='display flush')
+            await sleep_ms(frame_interval_ms)
+
+    async def persistence_task(self):
+        """Commit confirmed crossover frequencies to NVS once the edits settled."""
         while True:
-            self.encoder.read()  # Checks for encoder rotation
-            time.sleep(0.01)  # Small delay to reduce CPU usage
+            await sleep_ms(self.PERSISTENCE_INTERVAL_MS)
+            if CrossoverService.store.pending:
+                await self.wait_dsp_idle()
+                CrossoverService.store.poll()
+
+    async def main(self):
+        """Run the bus, input, DSP writer, display and persistence tasks."""
+        await asyncio.gather(
+            *[bus.run() for bus in self.buses.values()],
+            self.input_task(),
+            self.dsp_task(),
+            self.display_task(),
+            self.persistence_task()
+        )
+
+    def run(self):
+        """Run the application until interrupted; pending frequencies and the bus trace are saved on the way out."""
+        try:
+            asyncio.run(self.main())
+        finally:
+            CrossoverService.store.flush()
+            if self.tracer:
+                self.tracer.dump(TRACE_PATH)
 
 # Create and run the app
 if __name__ == "__main__":
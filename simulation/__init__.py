@@ -0,0 +1 @@
+# Host-side stand-ins for the board hardware, used to run and measure the firmware on CPython.
@@ -0,0 +1,188 @@
+# ADAU1401/1701 and its self-boot EEPROM as I2C device models, for running the DSP drivers on CPython.
+from external.sigma.sigma_dsp.adau.adau1401.registers_table import REGISTER_ADDRESSES, REGISTER_N_BYTES
+
+PARAMETER_RAM_START = 0x0000
+PROGRAM_RAM_START = 0x0400
+REGISTERS_START = 0x0800
+REGISTERS_STOP = 0x0828
+N_PARAMETER_WORDS = 1024
+N_PROGRAM_WORDS = 1024
+PARAMETER_WORD_BYTES = 4
+PROGRAM_WORD_BYTES = 5
+PARAMETER_WORD_MASK = (1 << 28) - 1  # 5.23 words, the top nibble of the 4 bytes isn't stored
+
+SAFELOAD_DATA_START = 0x0810
+SAFELOAD_ADDRESS_START = 0x0815
+N_SAFELOAD_SLOTS = 5
+CORE_CONTROL = 0x081C
+IST_BIT = 1 << 5
+
+REGISTER_WIDTHS = dict(zip(REGISTER_ADDRESSES, REGISTER_N_BYTES))
+RESERVED_REGISTER_BYTES = 2
+
+
+class SimulatedADAU1401:
+    """
+    I2C device model of the ADAU1401/1701 memories: parameter RAM (28-bit words in 4 bytes), program
+    RAM (5 bytes a word) and the control registers, with the auto-increment of bursts across words
+    and registers of different widths.
+
+    Safeload: writing IST in the core control register transfers the safeload slots written since
+    the previous transfer to the parameter RAM at the next audio frame boundary, then clears IST.
+    Time is the bus time of the MemoryI2C the device is attached to, so a burst or a poll lasts as
+    long as it would on the wire. Attach with MemoryI2C.attach(0x34, SimulatedADAU1401(i2c.now_us)).
+    """
+
+    def __init__(self, clock, sample_rate=48000):
+        self.clock = clock
+        self.sample_rate = sample_rate
+        self.parameter_ram = bytearray(N_PARAMETER_WORDS * PARAMETER_WORD_BYTES)
+        self.program_ram = bytearray(N_PROGRAM_WORDS * PROGRAM_WORD_BYTES)
+        self.registers = {address: 0 for address in REGISTER_WIDTHS}
+        self._address = 0
+        self._register_buffer = []  # bytes of the register being written by a burst
+        self._safeload_slots = set()
+        self._transfer_us = None
+        self.n_safeload_transfers = 0
+        self.n_words_safeloaded = 0
+
+    @staticmethod
+    def word_bytes(address):
+        if address < PROGRAM_RAM_START:
+            return PARAMETER_WORD_BYTES
+        if address < REGISTERS_START:
+            return PROGRAM_WORD_BYTES
+        return REGISTER_WIDTHS.get(address, RESERVED_REGISTER_BYTES)
+
+    def sync(self):
+        """Catch up with the bus clock: a safeload due by now has happened."""
+        self._run_until(self.clock())
+
+    def parameter(self, address):
+        """A parameter RAM word as an int."""
+        self.sync()
+        idx = address * PARAMETER_WORD_BYTES
+        return int.from_bytes(self.parameter_ram[idx: idx + PARAMETER_WORD_BYTES], 'big')
+
+    # bus side ====================================
+
+    def writeto(self, buf, stop=True):
+        self.sync()
+        if len(buf) < 2:
+            return
+        self._address = (buf[0] << 8) | buf[1]
+        self._register_buffer = []
+        for byte in buf[2:]:
+            self._write_byte(byte)
+
+    def readfrom(self, n_bytes):
+        self.sync()
+        data = bytearray()
+        while len(data) < n_bytes:
+            data += self._read_word(self._address)
+            self._address += 1
+        return bytes(data[:n_bytes])
+
+    def _write_byte(self, byte):
+        # a word is committed once its last byte arrived, then the address moves to the next one
+        self._register_buffer.append(byte)
+        if len(self._register_buffer) == self.word_bytes(self._address):
+            self._write_word(self._address, int.from_bytes(bytes(self._register_buffer), 'big'))
+            self._register_buffer = []
+            self._address += 1
+
+    def _write_word(self, address, value):
+        if address < PROGRAM_RAM_START:
+            idx = address * PARAMETER_WORD_BYTES
+            self.parameter_ram[idx: idx + PARAMETER_WORD_BYTES] = (value & PARAMETER_WORD_MASK).to_bytes(
+                PARAMETER_WORD_BYTES, 'big')
+        elif address < REGISTERS_START:
+            idx = (address - PROGRAM_RAM_START) * PROGRAM_WORD_BYTES
+            self.program_ram[idx: idx + PROGRAM_WORD_BYTES] = value.to_bytes(PROGRAM_WORD_BYTES, 'big')
+        elif address in self.registers:
+            self.registers[address] = value
+            if SAFELOAD_ADDRESS_START <= address < SAFELOAD_ADDRESS_START + N_SAFELOAD_SLOTS:
+                self._safeload_slots.add(address - SAFELOAD_ADDRESS_START)
+            if address == CORE_CONTROL and value & IST_BIT and self._transfer_us is None:
+                self._transfer_us = self._next_frame_us(self.clock())
+
+    def _read_word(self, address):
+        n_bytes = self.word_bytes(address)
+        if address < PROGRAM_RAM_START:
+            idx = address * PARAMETER_WORD_BYTES
+            return self.parameter_ram[idx: idx + n_bytes]
+        if address < REGISTERS_START:
+            idx = (address - PROGRAM_RAM_START) * PROGRAM_WORD_BYTES
+            return self.program_ram[idx: idx + n_bytes]
+        return self.registers.get(address, 0).to_bytes(n_bytes, 'big')
+
+    # audio frames ================================
+
+    def _next_frame_us(self, now_us):
+        frame = int(now_us * self.sample_rate / 1e6) + 1
+        return frame * 1e6 / self.sample_rate
+
+    def _run_until(self, now_us):
+        if self._transfer_us is not None and now_us >= self._transfer_us:
+            self._safeload_transfer()
+
+    def _safeload_transfer(self):
+        for slot in sorted(self._safeload_slots):
+            address = self.registers[SAFELOAD_ADDRESS_START + slot]
+            if address < PROGRAM_RAM_START:
+                self._write_word(address, self.registers[SAFELOAD_DATA_START + slot])
+                self.n_words_safeloaded += 1
+        self._safeload_slots.clear()
+        self.registers[CORE_CONTROL] &= ~IST_BIT
+        self._transfer_us = None
+        self.n_safeload_transfers += 1
+
+
+class Simulated24C:
+    """
+    I2C device model of a 24C-series EEPROM (24C128 by default): two address bytes, page writes
+    wrapping within their page, and a write cycle after each page during which the device NACKs
+    (OSError), as ACK polling expects. Sequential reads wrap at the end of the memory.
+    """
+    NACK_ERRNO = 19  # ENODEV, as raised by machine.I2C
+
+    def __init__(self, clock, size=0x4000, page_size=32, write_cycle_us=5000):
+        self.clock = clock
+        self.memory = bytearray(b'\xff' * size)
+        self.page_size = page_size
+        self.write_cycle_us = write_cycle_us
+        self._address = 0
+        self._busy_until_us = 0
+        self.n_page_writes = 0
+        self.n_nacks = 0
+
+    def writeto(self, buf, stop=True):
+        if self.clock() < self._busy_until_us:
+            self.n_nacks += 1
+            raise OSError(self.NACK_ERRNO)
+        if len(buf) < 2:
+            return
+        self._address = ((buf[0] << 8) | buf[1]) % len(self.memory)
+        data = buf[2:]
+        if not data:
+            return
+
+        page_start = self._address - self._address % self.page_size
+        offset = self._address - page_start
+        for byte in data:
+            self.memory[page_start + offset] = byte
+            offset = (offset + 1) % self.page_size
+        self._address = page_start + offset
+        self.n_page_writes += 1
+        self._busy_until_us = self.clock() + self.write_cycle_us
+
+    def readfrom(self, n_bytes):
+        if self.clock() < self._busy_until_us:
+            self.n_nacks += 1
+            raise OSError(self.NACK_ERRNO)
+        data = bytearray(n_bytes)
+        size = len(self.memory)
+        for i in range(n_bytes):
+            data[i] = self.memory[self._address]
+            self._address = (self._address + 1) % size
+        return bytes(data)
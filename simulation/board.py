@@ -0,0 +1,26 @@
+# The I2C devices of the board, modelled, so main.App runs on CPython against something that answers.
+from config import DSP_ADDRESSES
+from simulation.adau import SimulatedADAU1401, Simulated24C
+from simulation.i2c import MemoryI2C
+from simulation.oled import SimulatedSSD1306
+
+EEPROM_ADDRESS = 0x50
+OLED_ADDRESS = 0x3C
+
+
+class BoardI2C(MemoryI2C):
+    """
+    MemoryI2C with the rig's ADAU1401s (one per address of DSP_ADDRESSES, or of dsp_addresses), the
+    self-boot EEPROM and the SSD1306 attached. dsp is the first ADAU1401, dsps all of them by address.
+    """
+
+    def __init__(self, *args, dsp_addresses=DSP_ADDRESSES, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dsps = {address: SimulatedADAU1401(self.now_us) for address in dsp_addresses}
+        self.dsp = self.dsps[dsp_addresses[0]]
+        self.eeprom = Simulated24C(self.now_us)
+        self.oled = SimulatedSSD1306()
+        for address, dsp in self.dsps.items():
+            self.attach(address, dsp)
+        self.attach(EEPROM_ADDRESS, self.eeprom)
+        self.attach(OLED_ADDRESS, self.oled)
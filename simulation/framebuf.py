@@ -0,0 +1,72 @@
+# Pure-Python subset of the MicroPython framebuf module (MONO_VLSB only), so the
+# display drivers run unchanged on CPython.
+#
+# Glyphs are generated from the character code, not the petme128 font of the board:
+# every printable character is a distinct 7x8 pattern, which is what frame diffs and
+# transfer sizes depend on, but the pixels do not spell the text.
+
+MONO_VLSB = 0
+
+FONT_WIDTH = 8
+
+
+def _glyph(char):
+    code = ord(char)
+    if code <= 32 or code > 126:
+        return bytes(FONT_WIDTH)
+    columns = bytearray(FONT_WIDTH)
+    seed = code * 2654435761
+    for i in range(FONT_WIDTH - 1):  # last column blank, as the spacing between characters
+        columns[i] = ((seed >> (3 * i)) & 0x7E) | 0x01
+    return bytes(columns)
+
+
+class FrameBuffer:
+    def __init__(self, buffer, width, height, format, stride=None):
+        assert format == MONO_VLSB, 'only MONO_VLSB is simulated'
+        self._buffer = buffer
+        self._width = width
+        self._height = height
+
+    def fill(self, c):
+        self._buffer[:] = (b'\xff' if c else b'\x00') * len(self._buffer)
+
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            return None
+        index = (y >> 3) * self._width + x
+        bit = 1 << (y & 7)
+        if c is None:
+            return 1 if self._buffer[index] & bit else 0
+        if c:
+            self._buffer[index] |= bit
+        else:
+            self._buffer[index] &= ~bit & 0xFF
+
+    def fill_rect(self, x, y, w, h, c):
+        for yy in range(max(y, 0), min(y + h, self._height)):
+            for xx in range(max(x, 0), min(x + w, self._width)):
+                self.pixel(xx, yy, c)
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.hline(x, y, w, c)
+        self.hline(x, y + h - 1, w, c)
+        self.vline(x, y, h, c)
+        self.vline(x + w - 1, y, h, c)
+
+    def text(self, s, x, y, c=1):
+        for char in s:
+            for i, column in enumerate(_glyph(char)):
+                for row in range(8):
+                    if column >> row & 1:
+                        self.pixel(x + i, y + row, c)
+            x += FONT_WIDTH
@@ -0,0 +1,100 @@
+class MemoryI2C:
+    """
+    machine.I2C / SoftI2C stand-in. Transactions go to the device registered at the
+    address, if any (an object with writeto(buf, stop) and readfrom(n_bytes)); reads
+    from an absent device return zeros. A device NACKs by raising OSError from writeto,
+    as machine.I2C does. Counts transactions and bytes on the bus.
+
+    Also keeps the time the transactions take on the wire at freq: a start (or repeated
+    start), the address byte and every data byte with their ACK bit, and the stop if
+    any. now_us() is that clock, the time base of the device models.
+    """
+    N_BITS_PER_BYTE = 9  # 8 data bits and the ACK
+
+    def __init__(self, id=-1, scl=None, sda=None, freq=400000, timeout=50000, devices=None):
+        self.freq = freq
+        self.devices = {} if devices is None else devices
+        self.n_writes = 0
+        self.n_reads = 0
+        self.n_bytes_written = 0
+        self.n_bytes_read = 0
+        self.n_nacks = 0
+        self.time_us = 0.0  # since creation, never reset: devices run on it
+        self.bus_us = 0.0  # since the last reset_counters()
+
+    def attach(self, address, device):
+        self.devices[address] = device
+
+    def scan(self):
+        return sorted(self.devices)
+
+    def now_us(self):
+        return self.time_us
+
+    def idle(self, us):
+        """Let time pass with the bus free, e.g. the wait of a task between two transactions."""
+        self.time_us += us
+
+    def _clock(self, n_bytes, stop):
+        """Let the transaction time pass; the device then sees the time at the end of the transaction."""
+        n_bits = 1 + self.N_BITS_PER_BYTE * (1 + n_bytes) + (1 if stop else 0)
+        us = n_bits * 1e6 / self.freq
+        self.time_us += us
+        self.bus_us += us
+        return us
+
+    def _nack(self, us):
+        # only the address byte went out before the master gave up and sent a stop
+        self.time_us -= us
+        self.bus_us -= us
+        self._clock(0, True)
+        self.n_nacks += 1
+
+    def writeto(self, addr, buf, stop=True):
+        us = self._clock(len(buf), stop)
+        device = self.devices.get(addr)
+        if device is not None:
+            try:
+                device.writeto(bytes(buf), stop)
+            except OSError:
+                self._nack(us)
+                raise
+        self.n_writes += 1
+        self.n_bytes_written += len(buf)
+        return len(buf)
+
+    def writevto(self, addr, vector, stop=True):
+        return self.writeto(addr, b''.join(bytes(buf) for buf in vector), stop)
+
+    def readfrom(self, addr, nbytes, stop=True):
+        us = self._clock(nbytes, stop)
+        device = self.devices.get(addr)
+        data = bytes(nbytes)
+        if device is not None:
+            try:
+                data = bytes(device.readfrom(nbytes))
+            except OSError:
+                self._nack(us)
+                raise
+        self.n_reads += 1
+        self.n_bytes_read += nbytes
+        return data
+
+    def readfrom_into(self, addr, buf, stop=True):
+        buf[:] = self.readfrom(addr, len(buf), stop)
+
+    def writeto_mem(self, addr, memaddr, buf, addrsize=8):
+        self.writeto(addr, memaddr.to_bytes(addrsize // 8, 'big') + bytes(buf))
+
+    def readfrom_mem(self, addr, memaddr, nbytes, addrsize=8):
+        buf = bytearray(nbytes)
+        self.readfrom_mem_into(addr, memaddr, buf, addrsize)
+        return bytes(buf)
+
+    def readfrom_mem_into(self, addr, memaddr, buf, addrsize=8):
+        self.writeto(addr, memaddr.to_bytes(addrsize // 8, 'big'), False)
+        self.readfrom_into(addr, buf)
+
+    def reset_counters(self):
+        self.n_writes = self.n_reads = self.n_bytes_written = self.n_bytes_read = self.n_nacks = 0
+        self.bus_us = 0.0
@@ -0,0 +1,8 @@
+# The I2C LCD driver of the board, run on CPython with the simulated machine module.
+import sys
+
+from simulation import machine
+
+sys.modules.setdefault('machine', machine)
+
+from external.lcd.i2c_lcd import I2cLcd  # noqa: E402
@@ -0,0 +1,4 @@
+# The subset of the machine module the app uses, for running it on CPython.
+from simulation.board import BoardI2C as I2C
+from simulation.board import BoardI2C as SoftI2C
+from simulation.pins import FakePin as Pin
@@ -0,0 +1,5 @@
+# The subset of the micropython module the drivers use, for CPython.
+
+
+def const(value):
+    return value
@@ -0,0 +1,30 @@
+class MemoryNVS:
+    """esp32.NVS stand-in keeping blobs in a dict; committed blobs survive reopening with the same storage."""
+
+    def __init__(self, namespace, storage=None):
+        self.namespace = namespace
+        self.storage = {} if storage is None else storage
+        self._pending = {}
+        self.n_commits = 0
+
+    def set_blob(self, key, value):
+        self._pending[key] = bytes(value)
+
+    def get_blob(self, key, buffer):
+        value = self._pending.get(key, self.storage.get((self.namespace, key)))
+        if value is None:
+            raise OSError(-4354)  # ESP_ERR_NVS_NOT_FOUND
+        if len(buffer) < len(value):
+            raise OSError(-4364)  # ESP_ERR_NVS_INVALID_LENGTH
+        buffer[:len(value)] = value
+        return len(value)
+
+    def erase_key(self, key):
+        self._pending.pop(key, None)
+        self.storage.pop((self.namespace, key), None)
+
+    def commit(self):
+        for key, value in self._pending.items():
+            self.storage[(self.namespace, key)] = value
+        self._pending = {}
+        self.n_commits += 1
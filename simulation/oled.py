@@ -0,0 +1,66 @@
+# The SSD1306 driver of the board, run on CPython with the simulated framebuf module.
+import sys
+
+from simulation import framebuf, micropython
+
+sys.modules.setdefault('framebuf', framebuf)
+sys.modules.setdefault('micropython', micropython)
+
+from external.oled.ssd1306 import SSD1306_I2C  # noqa: E402
+
+
+class SimulatedSSD1306:
+    """
+    I2C device model of the SSD1306 display RAM, in horizontal addressing mode, for
+    checking what the drivers actually put on the screen. Attach with
+    MemoryI2C.attach(0x3C, SimulatedSSD1306()).
+    """
+
+    def __init__(self, width=128, height=64):
+        self.width = width
+        self.pages = height // 8
+        self.ram = bytearray(self.pages * width)
+        self._window = [0, width - 1, 0, self.pages - 1]
+        self._column = 0
+        self._page = 0
+        self._command = []
+
+    def writeto(self, buf, stop=True):
+        control = buf[0]
+        if control & 0x40:  # data
+            for byte in buf[1:]:
+                self._write_data(byte)
+        elif control & 0x80:  # single command
+            self._write_command(buf[1])
+        else:  # run of commands
+            for byte in buf[1:]:
+                self._write_command(byte)
+
+    def readfrom(self, n_bytes):
+        return bytes(n_bytes)
+
+    def _write_command(self, byte):
+        self._command.append(byte)
+        opcode = self._command[0]
+        if opcode in (0x21, 0x22):  # column / page window: opcode, start, end
+            if len(self._command) < 3:
+                return
+            start, end = self._command[1], self._command[2]
+            if opcode == 0x21:
+                self._window[0:2] = [start, end]
+                self._column = start
+            else:
+                self._window[2:4] = [start, end]
+                self._page = start
+        elif opcode in (0x20, 0x81, 0xA8, 0xD3, 0xDA, 0xD5, 0xD9, 0xDB, 0x8D):  # one argument
+            if len(self._command) < 2:
+                return
+        self._command = []
+
+    def _write_data(self, byte):
+        self.ram[self._page * self.width + self._column] = byte
+        if self._column < self._window[1]:
+            self._column += 1
+            return
+        self._column = self._window[0]
+        self._page = self._page + 1 if self._page < self._window[3] else self._window[2]
@@ -0,0 +1,98 @@
+class FakeClock:
+    """Millisecond tick source advanced by hand, in place of time.ticks_ms."""
+
+    def __init__(self, start_ms=0):
+        self.now_ms = start_ms
+
+    def __call__(self):
+        return self.now_ms
+
+    def advance(self, ms):
+        self.now_ms += ms
+
+
+class FakePin:
+    """machine.Pin stand-in: value() drives the level and fires the registered irq handler on edges."""
+    IN = 1
+    OUT = 2
+    OPEN_DRAIN = 7
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 1
+    IRQ_RISING = 2
+
+    def __init__(self, id=None, mode=-1, pull=-1, value=None):
+        self.id = id
+        self.mode = mode
+        self.pull = pull
+        self._value = (1 if pull == self.PULL_UP else 0) if value is None else value
+        self._trigger = 0
+        self._handler = None
+        self.n_irqs = 0
+
+    def init(self, mode=-1, pull=-1, value=None):
+        self.mode = mode
+        self.pull = pull
+        if value is not None:
+            self._value = value
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING):
+        self._handler = handler
+        self._trigger = trigger
+
+    def value(self, level=None):
+        if level is None:
+            return self._value
+
+        level = 1 if level else 0
+        previous, self._value = self._value, level
+        if self._handler is None or previous == level:
+            return None
+
+        edge = self.IRQ_RISING if level else self.IRQ_FALLING
+        if self._trigger & edge:
+            self.n_irqs += 1
+            self._handler(self)
+
+    __call__ = value
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+
+class QuadratureReplayer:
+    """
+    Replays the CLK/DT edge sequence of a rotary encoder on two FakePins.
+
+    States are (clk, dt) after each edge, starting from the detent rest position (1, 1)
+    of an encoder with pull-ups.
+    """
+    RIGHT = ((1, 0), (0, 0), (0, 1), (1, 1))
+    LEFT = ((0, 1), (0, 0), (1, 0), (1, 1))
+
+    def __init__(self, clk_pin, dt_pin, clock=None):
+        self.clk = clk_pin
+        self.dt = dt_pin
+        self.clock = clock
+
+    def replay(self, states, interval_ms=0):
+        """Drive the pins through states, one pin change at a time."""
+        for clk_level, dt_level in states:
+            if self.clock is not None:
+                self.clock.advance(interval_ms)
+            if self.clk.value() != clk_level:
+                self.clk.value(clk_level)
+            if self.dt.value() != dt_level:
+                self.dt.value(dt_level)
+
+    def turn(self, detents, interval_ms=0, bounce=False):
+        """Turn right (detents > 0) or left; bounce adds a contact chatter edge on every step."""
+        sequence = self.RIGHT if detents > 0 else self.LEFT
+        for _ in range(abs(detents)):
+            for i, state in enumerate(sequence):
+                if bounce:
+                    self.replay((state, sequence[i - 1]), interval_ms=0)
+                self.replay((state,), interval_ms=interval_ms // len(sequence))
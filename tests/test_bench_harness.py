@@ -0,0 +1,32 @@
+from benchmarks.harness import Case, measure, regressions, slowdowns, load_baselines, save_baselines
+from simulation.i2c import MemoryI2C
+
+BASELINES = {'case': {'wall_us': 100.0, 'alloc_peak_bytes': 1000, 'bus_bytes': 64, 'bus_transactions': 2}}
+
+
+def test_wall_times_only_reported():
+    results = {'case': {'wall_us': 300.0, 'alloc_peak_bytes': 1000, 'bus_bytes': 64, 'bus_transactions': 2}}
+    assert regressions(results, BASELINES, exact_tolerance=0.05) == []
+    assert slowdowns(results, BASELINES, tolerance=0.25) == [('case', 'wall_us', 100.0, 300.0)]
+
+
+def test_deterministic_metrics_fail():
+    results = {'case': {'wall_us': 50.0, 'alloc_peak_bytes': 1040, 'bus_bytes': 70, 'bus_transactions': 2},
+               'new case': {'wall_us': 1.0, 'alloc_peak_bytes': 1}}
+    assert regressions(results, BASELINES, exact_tolerance=0.05) == [('case', 'bus_bytes', 64, 70)]
+    assert slowdowns(results, BASELINES, tolerance=0.25) == []
+
+
+def test_measure_counts_one_round_of_bus_traffic():
+    i2c = MemoryI2C()
+    case = Case('writes', lambda state: i2c.writeto(0x34, b'\x00\x10\x01\x02'), bus=lambda state: i2c, n_rounds=3)
+    result = measure(case)
+    assert (result['bus_bytes'], result['bus_transactions']) == (4, 1)
+    assert result['wall_us'] >= 0 and result['alloc_peak_bytes'] >= 0
+
+
+def test_baselines_round_trip(tmp_path):
+    path = str(tmp_path / 'baselines.json')
+    assert load_baselines(path) == {}
+    save_baselines(path, BASELINES)
+    assert load_baselines(path) == BASELINES
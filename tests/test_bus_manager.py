@@ -0,0 +1,77 @@
+import pytest
+
+from simulation.i2c import MemoryI2C
+from utils.aio import asyncio, sleep_ms
+from utils.bus_manager import BusManager, PRIORITY_DSP, PRIORITY_DISPLAY
+
+OLED_ADDRESS = 0x3C
+DISPLAY_OFF = b'\x00\xae'
+
+
+def test_urgent_job_runs_between_chunks():
+    manager = BusManager(MemoryI2C())
+    order = []
+
+    def frame():
+        for chunk in range(3):
+            order.append('display {}'.format(chunk))
+            yield
+
+    manager.submit(PRIORITY_DISPLAY, frame())
+    manager.step()
+    manager.submit(PRIORITY_DSP, lambda: order.append('dsp'))
+    while manager.step():
+        pass
+    assert order == ['display 0', 'dsp', 'display 1', 'display 2']
+    assert manager.stats()['max_depth'] == 2
+
+
+def test_direct_access_before_run():
+    manager = BusManager(MemoryI2C())
+    handle = manager.handle('oled', PRIORITY_DISPLAY)
+    handle.writeto(OLED_ADDRESS, DISPLAY_OFF)  # e.g. the driver set up at boot
+    assert handle.transactions == 1
+
+
+def test_access_only_within_a_job_once_running():
+    manager = BusManager(MemoryI2C())
+    handle = manager.handle('oled', PRIORITY_DISPLAY)
+
+    async def main():
+        bus_task = asyncio.create_task(manager.run())
+        await sleep_ms(0)
+        with pytest.raises(AssertionError):
+            handle.writeto(OLED_ADDRESS, DISPLAY_OFF)
+
+        await manager.transact(PRIORITY_DISPLAY, lambda: handle.writeto(OLED_ADDRESS, DISPLAY_OFF))
+
+        def chunks():
+            for _ in range(3):
+                handle.writeto(OLED_ADDRESS, DISPLAY_OFF)
+                yield
+
+        await manager.transact(PRIORITY_DISPLAY, chunks())
+        bus_task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await bus_task
+
+    asyncio.run(main())
+    assert handle.transactions == 4
+    assert not manager.running
+    handle.writeto(OLED_ADDRESS, DISPLAY_OFF)  # the bus task is gone: direct access again
+
+
+def test_job_errors_reach_the_caller():
+    manager = BusManager(MemoryI2C())
+
+    def failing():
+        raise OSError(19)  # ENODEV
+
+    async def main():
+        bus_task = asyncio.create_task(manager.run())
+        with pytest.raises(OSError):
+            await manager.transact(PRIORITY_DSP, failing)
+        assert not manager.in_step
+        bus_task.cancel()
+
+    asyncio.run(main())
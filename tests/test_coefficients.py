@@ -0,0 +1,52 @@
+from features.crossover.service import CoefficientCache, CoefficientTable, CrossoverService
+
+SEGMENTS = ((20, 100, 10), (100, 1001, 100))
+
+
+def test_cache_evicts_least_recently_used():
+    cache = CoefficientCache(max_entries=2)
+    cache.put('a', b'A')
+    cache.put('b', b'B')
+    assert cache.get('a') == b'A'  # 'b' is now the least recently used
+    cache.put('c', b'C')
+
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert cache.get('a') == b'A' and cache.get('c') == b'C'
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_table_blocks_match_design(tmp_path):
+    path = str(tmp_path / 'coefficients.bin')
+    CoefficientTable.build(path, fs=48000, segments=SEGMENTS)
+    table = CoefficientTable.load(path)
+    try:
+        assert table.n_cutoffs == 8 + 10
+        assert table.index(30) == 1 and table.index(300) == 10
+        assert table.index(35) is None and table.index(2000) is None
+
+        block = table.lookup('highpass', 300, 1, 48000)
+        assert block == CrossoverService.encode_filter_coefficients('highpass', 300, fs=48000)
+        assert table.lookup('highpass', 350, 1, 48000) is None  # off the grid
+        assert table.lookup('highpass', 300, 0.5, 48000) is None  # other gain
+        assert table.reads == 1
+    finally:
+        table.close()
+
+
+def test_blocks_from_cache_then_table_then_design(tmp_path, monkeypatch):
+    path = str(tmp_path / 'coefficients.bin')
+    CoefficientTable.build(path, fs=48000, segments=SEGMENTS)
+    monkeypatch.setattr(CrossoverService, 'coefficient_cache', CoefficientCache())
+    monkeypatch.setattr(CrossoverService, 'n_computed', 0)
+    monkeypatch.setattr(CrossoverService, 'coefficient_table', CoefficientTable.load(path))
+    try:
+        table_block = CrossoverService.get_filter_block('lowpass', 500, fs=48000)
+        designed_block = CrossoverService.get_filter_block('lowpass', 550, fs=48000)
+        assert CrossoverService.get_filter_block('lowpass', 500, fs=48000) == table_block
+        assert CrossoverService.get_filter_block('lowpass', 550, fs=48000) == designed_block
+
+        stats = CrossoverService.cache_stats()
+        assert (stats['hits'], stats['misses'], stats['table_reads'], stats['computed']) == (2, 2, 1, 1)
+    finally:
+        CrossoverService.coefficient_table.close()
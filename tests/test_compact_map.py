@@ -0,0 +1,44 @@
+from external.sigma.sigma_dsp.adau.adau1401.compact_map import CompactRegistersMap
+from external.sigma.sigma_dsp.adau.adau1401.register import RegistersMap
+from external.sigma.sigma_dsp.adau.adau1401.registers_map import _get_all_registers
+
+
+def full_map():
+    return RegistersMap(name='ADAU1401', description='ADAU1401 registers.', registers=_get_all_registers())
+
+
+def test_same_registers_and_defaults():
+    full, compact = full_map(), CompactRegistersMap()
+    assert compact.address_name_values == full.address_name_values
+    assert sorted(compact.registers.keys()) == sorted(full.registers.keys())
+    assert sorted(compact.elements.keys()) == sorted(full.elements.keys())
+    for name, register in full.registers.items():
+        view = compact.registers[name]
+        assert (view.address, view.n_bytes, view.default_value) == \
+               (register.address, register.n_bytes, register.default_value)
+
+
+def test_same_values_after_writes():
+    full, compact = full_map(), CompactRegistersMap()
+    for name in sorted(full.elements.keys()):
+        if name in full.duplicated_element_names:
+            continue
+        value = (1 << full.elements[name]['element'].n_bits) - 1
+        assert full.register_address_of_element(name) == compact.register_address_of_element(name)
+        full.set_element_value(name, value)
+        compact.set_element_value(name, value)
+        assert compact.value_of_element(name) == full.value_of_element(name), name
+    assert compact.addressed_values == full.addressed_values
+
+
+def test_load_and_reset_keep_read_only_elements():
+    full, compact = full_map(), CompactRegistersMap()
+    loaded = [(address, (1 << (8 * full.registers_by_address[address].n_bytes)) - 1)
+              for address, _ in full.addressed_values]
+    full.load_values(loaded)
+    compact.load_values(loaded)
+    assert compact.addressed_values == full.addressed_values
+
+    full.reset()
+    compact.reset()
+    assert compact.addressed_values == full.addressed_values
@@ -0,0 +1,35 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from external.sigma.sigma_dsp.dsp_processor import DspNumber  # noqa: E402
+from features.crossover.service import CrossoverService  # noqa: E402
+from utils import crossover_response  # noqa: E402
+
+FS = 48000
+
+
+def test_decoded_blocks_match_quantized_design():
+    block = CrossoverService.encode_filter_coefficients('lowpass', 1000, fs=FS)
+    designed = crossover_response.design_grid(CrossoverService.alignment, [1000], FS)[0, 0]
+    assert np.array_equal(crossover_response.decode_blocks(block), crossover_response.quantize(designed))
+
+
+def test_quantize_saturates_like_encode():
+    values = [0.1234567, -3.3, 20, -20]
+    encoded = crossover_response.decode_blocks(DspNumber.encode(values + [0]))
+    assert np.array_equal(encoded.ravel()[:4], crossover_response.quantize(values))
+
+
+def test_sections_response():
+    sections = crossover_response.as_sections(CrossoverService.get_filter_block('highpass', 2000, fs=FS))
+    report = crossover_response.verify_sections(sections, n_points=256, fs=FS)
+    assert report['ok'] and report['pole_radius'] < 1
+    assert report['magnitude_db'][0] < -40  # 10 Hz
+    assert abs(report['magnitude_db'][-1]) < 0.01  # Nyquist
+
+
+def test_grid_passes():
+    report = crossover_response.verify_grid(n_points=256, fs=FS)
+    assert report['ok'], report
+    assert report['n_cutoffs'] == len(crossover_response.grid_cutoffs())
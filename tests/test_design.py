@@ -0,0 +1,79 @@
+import cmath
+import math
+
+import pytest
+
+from benchmarks.bench_design import BUDGET_US, best_us, crossover
+from features.crossover.design import ALIGNMENTS, BiquadDesigner, section_coefficients
+from features.crossover.service import FREQUENCY_GRID
+
+FS = 48000
+CUTOFFS = (30, 80, 500, 2000, 16000)
+CUTOFF_GAIN_DB = {'BW1': -3.0103, 'BW2': -3.0103, 'BW4': -3.0103, 'LR2': -6.0206, 'LR4': -6.0206}
+
+
+def response(sections, w):
+    """Complex gain at w (radians per sample) of the chain of sections, in the DSP sign convention."""
+    z1 = cmath.exp(-1j * w)
+    h = 1
+    for b0, b1, a1, b2, a2 in sections:
+        h *= (b0 + b1 * z1 + b2 * z1 * z1) / (1 - a1 * z1 - a2 * z1 * z1)
+    return h
+
+
+def sections(filter_type, alignment, cutoff, gain=1):
+    return BiquadDesigner(FS).coefficients(((filter_type, alignment, cutoff, gain),))
+
+
+def db(h):
+    return 20 * math.log10(abs(h))
+
+
+@pytest.mark.parametrize('alignment', sorted(ALIGNMENTS))
+@pytest.mark.parametrize('cutoff', CUTOFFS)
+def test_lowpass_gains(alignment, cutoff):
+    lowpass = sections('lowpass', alignment, cutoff)
+    assert abs(response(lowpass, 0)) == pytest.approx(1, abs=1e-9)
+    assert abs(response(lowpass, math.pi)) == pytest.approx(0, abs=1e-9)
+    assert db(response(lowpass, 2 * math.pi * cutoff / FS)) == pytest.approx(CUTOFF_GAIN_DB[alignment], abs=0.01)
+
+
+@pytest.mark.parametrize('alignment', sorted(ALIGNMENTS))
+@pytest.mark.parametrize('cutoff', CUTOFFS)
+def test_highpass_gains(alignment, cutoff):
+    highpass = sections('highpass', alignment, cutoff)
+    assert abs(response(highpass, 0)) == pytest.approx(0, abs=1e-9)
+    assert abs(response(highpass, math.pi)) == pytest.approx(1, abs=1e-9)
+    assert db(response(highpass, 2 * math.pi * cutoff / FS)) == pytest.approx(CUTOFF_GAIN_DB[alignment], abs=0.01)
+
+
+@pytest.mark.parametrize('q', (None, 0.5, 0.7071067811865476))
+def test_gain_scales_the_numerator_only(q):
+    w0 = 2 * math.pi * 1000 / FS
+    unity = section_coefficients('lowpass', q, math.cos(w0), math.sin(w0))
+    scaled = section_coefficients('lowpass', q, math.cos(w0), math.sin(w0), gain=0.5)
+    b0, b1, a1, b2, a2 = unity
+    assert scaled == pytest.approx((b0 / 2, b1 / 2, a1, b2 / 2, a2))
+    assert abs(response([scaled], 0)) == pytest.approx(0.5)
+
+
+def test_first_order_section_has_no_second_order_terms():
+    w0 = 2 * math.pi * 1000 / FS
+    for filter_type in ('lowpass', 'highpass'):
+        _, _, _, b2, a2 = section_coefficients(filter_type, None, math.cos(w0), math.sin(w0))
+        assert (b2, a2) == (0, 0)
+
+
+def test_lr4_update_within_budget():
+    # BUDGET_US is per crossover point, for CPython on a host and scaled for MicroPython on the ESP32
+    cutoffs = [cutoff for start, stop, step in FREQUENCY_GRID for cutoff in range(start, stop, step)]
+    designer = BiquadDesigner(FS)
+    buffer = bytearray(designer.n_bytes(crossover('LR4', cutoffs[0])))
+    assert best_us(designer, 'LR4', cutoffs, buffer) < BUDGET_US
+
+
+def test_lr4_update_designs_each_section_once():
+    designer = BiquadDesigner(FS)
+    designer.design(crossover('LR4', 2000))
+    assert designer.n_trig == 1
+    assert designer.n_sections == 2  # the second half of each LR4 is a copy
@@ -0,0 +1,122 @@
+from external.sigma.bus.adapters import I2C as SigmaI2C
+from external.sigma.sigma_dsp.adau.adau1401.adau1401 import ADAU1401
+from external.sigma.sigma_dsp.messages import Message, MessageWrite, Messages
+from simulation.i2c import MemoryI2C
+
+EEPROM_ADDRESS = 0x50
+PAGE = 32
+PARAMS = bytes(range(1, 21))
+
+
+class Eeprom24:
+    """24xx EEPROM model: 2-byte address pointer, page writes, NACKs for a few polls after each."""
+    BUSY_POLLS = 2
+
+    def __init__(self, n_bytes=0x4000):
+        self.memory = bytearray(b'\xff' * n_bytes)
+        self.pointer = 0
+        self.busy = 0
+        self.page_writes = []
+        self.n_bytes_read = 0
+
+    def writeto(self, buf, stop=True):
+        if self.busy:
+            self.busy -= 1
+            raise OSError(19)  # ENODEV: no ACK during the write cycle
+        if len(buf) < 2:
+            return
+        self.pointer = (buf[0] << 8) | buf[1]
+        data = buf[2:]
+        if data:
+            self.memory[self.pointer: self.pointer + len(data)] = data
+            self.page_writes.append(self.pointer)
+            self.busy = self.BUSY_POLLS
+
+    def readfrom(self, n_bytes):
+        data = self.memory[self.pointer: self.pointer + n_bytes]
+        self.pointer += n_bytes
+        self.n_bytes_read += n_bytes
+        return data
+
+
+def make_dsp(eeprom=None):
+    i2c = MemoryI2C()
+    if eeprom is not None:
+        i2c.attach(EEPROM_ADDRESS, eeprom)
+    return ADAU1401(SigmaI2C(i2c), i2c_address=0x34)
+
+
+def boot_image():
+    return Messages([
+        MessageWrite(subaddress=0x081C, data=b'\x00\x1c'),
+        MessageWrite(subaddress=0x0400, data=b'\x00' + PARAMS),  # program words holding the same bytes
+        MessageWrite(subaddress=0x0000, data=PARAMS),
+        Message(message_type='End'),
+    ])
+
+
+def test_params_start_from_messages():
+    messages = boot_image()
+    start = make_dsp().eeprom.find_params_start_address(messages)
+    assert messages.bytes[start: start + len(PARAMS)] == PARAMS
+    assert start == len(messages[0].bytes) + len(messages[1].bytes) + 6
+
+
+def test_params_start_from_parsed_messages():
+    messages = Messages([message for _, message in Message.iter_messages(boot_image().bytes)])
+    assert isinstance(messages[2].data, memoryview)
+    assert make_dsp().eeprom.find_params_start_address(messages) == \
+           make_dsp().eeprom.find_params_start_address(boot_image())
+
+
+def test_params_start_missing():
+    messages = Messages([MessageWrite(subaddress=0x081C, data=b'\x00\x1c'), Message(message_type='End')])
+    assert make_dsp().eeprom.find_params_start_address(messages) == -1
+
+
+def test_stream_stops_at_end():
+    image = boot_image().bytes
+    model = Eeprom24()
+    model.memory[:len(image)] = image
+    eeprom = make_dsp(model).eeprom
+
+    streamed = [(offset, message.message_type, bytes(message.data) if message.message_type == 'Write' else None)
+                for offset, message in eeprom.iter_messages(chunk_size=16)]
+    parsed = [(offset, message.message_type, bytes(message.data) if message.message_type == 'Write' else None)
+              for offset, message in Message.iter_messages(image)]
+    assert streamed == parsed
+    assert model.n_bytes_read < 2 * len(image)  # not the whole 16 KB
+
+
+# differential page writes ==================================
+
+def test_only_changed_pages_programmed():
+    model = Eeprom24()
+    eeprom = make_dsp(model).eeprom
+    image = bytes(range(256)) * 4
+    eeprom.write(image)
+    assert model.page_writes == list(range(0, len(image), PAGE))
+    assert eeprom.n_ack_polls == len(image) // PAGE * Eeprom24.BUSY_POLLS
+
+    model.page_writes = []
+    changed = bytearray(image)
+    changed[100] ^= 0xFF  # page 3
+    changed[700:704] = b'\x00\x01\x02\x03'  # page 21
+    eeprom.write(changed)
+    assert model.page_writes == [3 * PAGE, 21 * PAGE]
+    assert eeprom.last_pages_written == 2
+    assert bytes(model.memory[:len(image)]) == bytes(changed)
+
+
+def test_identical_image_programs_nothing():
+    model = Eeprom24()
+    eeprom = make_dsp(model).eeprom
+    image = bytes(range(200))
+    eeprom.write(image, address=0x10)
+    model.page_writes = []
+    skipped = eeprom.pages_skipped
+
+    eeprom.write(image, address=0x10)
+    assert model.page_writes == []
+    assert eeprom.last_pages_written == 0
+    assert eeprom.pages_skipped - skipped == 7  # partial first page, 5 full pages, partial last page
@@ -0,0 +1,76 @@
+from external.sigma.bus.adapters import I2C as SigmaI2C
+
+ADDRESS = 0x34
+
+
+class MemBus:
+    """machine.I2C with the memory-addressed calls, recording the buffers it is handed."""
+
+    def __init__(self):
+        self.calls = []
+
+    def writeto(self, addr, buf, stop=True):
+        self.calls.append(('writeto', bytes(buf)))
+
+    def readfrom(self, addr, nbytes, stop=True):
+        return bytes(nbytes)
+
+    def writeto_mem(self, addr, memaddr, buf, addrsize=8):
+        self.calls.append(('writeto_mem', memaddr, buf, addrsize))
+
+    def readfrom_mem_into(self, addr, memaddr, buf, addrsize=8):
+        buf[:] = bytes(range(len(buf)))
+        self.calls.append(('readfrom_mem_into', memaddr, buf, addrsize))
+
+
+class VectorBus:
+    """SoftI2C without the memory-addressed calls: writevto and readfrom_into only."""
+
+    def __init__(self):
+        self.calls = []
+
+    def writeto(self, addr, buf, stop=True):
+        self.calls.append(('writeto', bytes(buf)))
+
+    def readfrom(self, addr, nbytes, stop=True):
+        return bytes(nbytes)
+
+    def writevto(self, addr, vector, stop=True):
+        self.calls.append(('writevto', [bytes(buf) for buf in vector], vector[1]))
+
+    def readfrom_into(self, addr, buf, stop=True):
+        buf[:] = b'\xaa' * len(buf)
+        self.calls.append(('readfrom_into', buf))
+
+
+def test_payload_passed_through_writeto_mem():
+    bus = MemBus()
+    payload = memoryview(bytearray(b'\x01\x02\x03\x04'))
+    SigmaI2C(bus).write_addressed_bytes(ADDRESS, 0x0010, payload)
+    [(name, memaddr, buf, addrsize)] = bus.calls
+    assert (name, memaddr, addrsize) == ('writeto_mem', 0x0010, 16)
+    assert buf is payload
+
+
+def test_read_fills_callers_buffer():
+    bus = MemBus()
+    buffer = bytearray(8)
+    view = memoryview(buffer)[2:6]
+    assert SigmaI2C(bus).read_addressed_into(ADDRESS, 0x0010, view) is view
+    assert bus.calls[0][2] is view
+    assert bytes(buffer) == b'\x00\x00\x00\x01\x02\x03\x00\x00'
+
+
+def test_header_and_payload_as_a_vector():
+    bus = VectorBus()
+    adapter = SigmaI2C(bus)
+    payload = b'\x01\x02\x03\x04'
+    adapter.write_addressed_bytes(ADDRESS, 0x081C, payload)
+    [(name, vector, sent)] = bus.calls
+    assert (name, vector) == ('writevto', [b'\x08\x1c', payload])
+    assert sent is payload
+
+    buffer = bytearray(2)
+    adapter.read_addressed_into(ADDRESS, 0x081C, buffer)
+    assert bus.calls[1] == ('writeto', b'\x08\x1c')
+    assert bus.calls[2][1] is buffer and buffer == b'\xaa\xaa'
@@ -0,0 +1,42 @@
+from simulation.i2c import MemoryI2C
+from simulation.lcd import I2cLcd
+
+ADDRESS = 0x27
+
+
+def make_lcd():
+    i2c = MemoryI2C()
+    lcd = I2cLcd(i2c, ADDRESS, 2, 16)
+    lcd.clear()
+    i2c.reset_counters()
+    return lcd, i2c
+
+
+def test_unchanged_text_not_sent():
+    lcd, i2c = make_lcd()
+    n_bytes = lcd.show('Crossover\n500 Hz')
+    assert n_bytes == i2c.n_bytes_written
+    assert i2c.n_writes == 2  # one run per line
+
+    i2c.reset_counters()
+    assert lcd.show('Crossover\n500 Hz') == 0
+    assert i2c.n_writes == 0
+
+
+def test_only_changed_run_sent():
+    lcd, i2c = make_lcd()
+    lcd.show('Crossover\n500 Hz')
+    i2c.reset_counters()
+
+    # the DDRAM address command, then one character
+    assert lcd.show('Crossover\n510 Hz') == 2 * I2cLcd.N_BYTES_PER_TRANSFER
+    assert i2c.n_writes == 1
+    assert bytes(lcd._shadow[16:22]) == b'510 Hz'
+
+
+def test_clear_resets_shadow():
+    lcd, i2c = make_lcd()
+    lcd.show('Crossover')
+    lcd.clear()
+    i2c.reset_counters()
+    assert lcd.show('Crossover') > 0
@@ -0,0 +1,27 @@
+import pytest
+
+from external.sigma.sigma_dsp.dsp_processor import DspNumber
+
+VALUES = (0, 1, -1, 0.5, -0.25, 1.2345678, -3.75, 15.999999, -16)
+
+
+def test_encode_matches_to_bytes():
+    encoded = DspNumber.encode(VALUES)
+    assert bytes(encoded) == b''.join(DspNumber.to_bytes(value) for value in VALUES)
+
+
+def test_round_trip():
+    buffer = bytearray(2 + len(VALUES) * DspNumber.N_BYTES)
+    assert DspNumber.encode_into(VALUES, buffer, offset=2) == len(VALUES) * DspNumber.N_BYTES
+    decoded = DspNumber.decode(buffer, offset=2)
+    resolution = 1 / (1 << DspNumber.N_BITS_B)
+    assert list(decoded) == pytest.approx(VALUES, abs=resolution)
+
+
+def test_saturation():
+    resolution = 1 / (1 << DspNumber.N_BITS_B)
+    decoded = DspNumber.decode(DspNumber.encode((16, 100, -16.5, -100)))
+    assert list(decoded) == pytest.approx([16 - resolution, 16 - resolution, -16, -16], abs=1e-6)
+
+    with pytest.raises(AssertionError):
+        DspNumber.encode((16,), saturate=False)
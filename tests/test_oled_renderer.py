@@ -0,0 +1,55 @@
+from features.display.oled_renderer import DirtyPageRenderer
+from simulation.i2c import MemoryI2C
+from simulation.oled import SSD1306_I2C, SimulatedSSD1306
+
+ADDRESS = 0x3C
+
+
+def make_renderer():
+    i2c = MemoryI2C()
+    screen = SimulatedSSD1306()
+    i2c.attach(ADDRESS, screen)
+    oled = SSD1306_I2C(128, 64, i2c, addr=ADDRESS)
+    return DirtyPageRenderer(oled), oled, screen, i2c
+
+
+def test_first_frame_sent_in_full():
+    renderer, oled, screen, _ = make_renderer()
+    oled.text('Crossover', 0, 0)
+    renderer.show()
+    assert renderer.last_frame_rects == 1
+    assert renderer.last_frame_bytes >= len(oled.buffer)
+    assert screen.ram == oled.buffer
+
+
+def test_only_changed_pages_sent():
+    renderer, oled, screen, i2c = make_renderer()
+    oled.text('Crossover', 0, 0)
+    oled.text('500 Hz', 0, 24)
+    renderer.show()
+
+    i2c.reset_counters()
+    assert renderer.show() == 0  # unchanged frame
+    assert i2c.n_writes == 0
+
+    oled.fill_rect(0, 24, 128, 8, 0)
+    oled.text('510 Hz', 0, 24)
+    [(x0, x1, p0, p1)] = renderer.dirty_rects()
+    assert (p0, p1) == (3, 3) and 8 <= x0 <= x1 < 16  # the columns of the digit that changed
+
+    renderer.show()
+    assert renderer.last_frame_bytes == DirtyPageRenderer.N_WINDOW_BYTES + x1 - x0 + 1
+    assert renderer.dirty_rects() == []
+    assert i2c.n_bytes_written == renderer.last_frame_bytes
+    assert screen.ram == oled.buffer
+
+
+def test_invalidate_resends_everything():
+    renderer, oled, screen, _ = make_renderer()
+    renderer.show()
+    screen.ram[:] = bytes(len(screen.ram))
+    oled.pixel(5, 5, 1)
+    renderer.invalidate()
+    renderer.show()
+    assert renderer.last_frame_bytes >= len(oled.buffer)
+    assert screen.ram == oled.buffer
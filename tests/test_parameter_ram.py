@@ -0,0 +1,309 @@
+import pytest
+
+from external.sigma.bus.adapters import I2C as SigmaI2C
+from external.sigma.sigma_dsp.adau.adau1401.adau1401 import ADAU1401
+from features.crossover.service import CrossoverService
+
+ADDRESS = 0x34
+BIQUAD_WORDS = 5
+N_BYTES_PER_WORD = 4
+
+
+class FakeDspBus:
+    """
+    I2C bus with an ADAU1401 memory map behind ADDRESS: parameter RAM words of 4 bytes, burst writes
+    auto-incrementing word by word, and safeloads applied as soon as IST is written.
+    """
+    SAFELOAD_DATA = 0x0810
+    SAFELOAD_ADDRESS = 0x0815
+    CORE_CONTROL = 0x081C
+    IST = 1 << 5
+
+    def __init__(self, safeload_log=None):
+        self.safeload_log = [] if safeload_log is None else safeload_log  # shared by several buses: their order
+        self.parameter_ram = bytearray(1024 * N_BYTES_PER_WORD)
+        self.registers = {}
+        self.pointer = 0
+        self.n_writes = 0
+        self.n_parameter_writes = 0
+        self.n_safeloads = 0
+        self.n_words_read = 0
+
+    @classmethod
+    def word_bytes(cls, address):
+        if address < 0x0400:
+            return N_BYTES_PER_WORD
+        if address < 0x0800 or cls.SAFELOAD_DATA <= address < cls.SAFELOAD_ADDRESS:
+            return 5
+        return 2
+
+    def writeto(self, addr, buf, stop=True):
+        self.n_writes += 1
+        if addr != ADDRESS or len(buf) < 2:
+            return
+        address = (buf[0] << 8) | buf[1]
+        self.pointer = address
+        data = bytes(buf[2:])
+        if data and address < 0x0400:
+            self.n_parameter_writes += 1
+        while data:
+            n_bytes = self.word_bytes(address)
+            self._write_word(address, data[:n_bytes])
+            data = data[n_bytes:]
+            address += 1
+
+    def _write_word(self, address, data):
+        if address < 0x0400:
+            self.parameter_ram[address * N_BYTES_PER_WORD: (address + 1) * N_BYTES_PER_WORD] = data
+        elif address >= 0x0800:
+            self.registers[address] = data
+            if address == self.CORE_CONTROL and int.from_bytes(data, 'big') & self.IST:
+                self._safeload()
+
+    def _safeload(self):
+        for slot in range(5):
+            target = self.registers.get(self.SAFELOAD_ADDRESS + slot)
+            if target is not None:
+                self._write_word(int.from_bytes(target, 'big'), self.registers[self.SAFELOAD_DATA + slot][1:])
+        self.registers[self.CORE_CONTROL] = bytes(2)
+        self.n_safeloads += 1
+        self.safeload_log.append(self)
+
+    def readfrom(self, addr, nbytes, stop=True):
+        if self.pointer >= 0x0400:
+            return self.registers.get(self.pointer, bytes(nbytes))[:nbytes].rjust(nbytes, b'\x00')
+        start = self.pointer * N_BYTES_PER_WORD
+        self.n_words_read += nbytes // N_BYTES_PER_WORD
+        return bytes(self.parameter_ram[start: start + nbytes])
+
+    def held(self, address, n_bytes):
+        start = address * N_BYTES_PER_WORD
+        return bytes(self.parameter_ram[start: start + n_bytes])
+
+
+def make_dsp(safeload_log=None):
+    bus = FakeDspBus(safeload_log)
+    dsp = ADAU1401(SigmaI2C(bus), i2c_address=ADDRESS)
+    return dsp, bus
+
+
+def words(n_words, fill):
+    return bytes((0x00, fill, fill, fill)) * n_words
+
+
+def biquads(n_biquads, fill):
+    return words(n_biquads * BIQUAD_WORDS, fill)
+
+
+# shadow and merged bursts ==================================
+
+def test_stage_marks_only_changed_words():
+    dsp, bus = make_dsp()
+    ram = dsp.parameter_ram
+    data = words(20, 0x11)
+    assert ram.stage(data, 0x10) == 20
+    assert ram.flush() == 1
+    assert bus.held(0x10, len(data)) == data
+
+    assert ram.stage(data, 0x10) == 0
+    assert ram.flush() == 0
+
+
+def test_flush_bridges_small_gaps_of_known_words():
+    dsp, bus = make_dsp()
+    ram = dsp.parameter_ram
+    ram.stage(words(20, 0x11), 0x10)
+    ram.flush()
+
+    bus.n_parameter_writes = 0
+    ram.stage(words(1, 0x22), 0x10)
+    ram.stage(words(1, 0x22), 0x13)  # two known words in between: one burst
+    ram.stage(words(1, 0x22), 0x1F)  # too far: a burst of its own
+    assert ram.n_dirty_words == 3
+    assert ram.flush() == 2
+    assert bus.n_parameter_writes == 2
+    assert bus.held(0x11, 2 * N_BYTES_PER_WORD) == words(2, 0x11)
+    assert bus.held(0x1F, N_BYTES_PER_WORD) == words(1, 0x22)
+
+
+def test_unknown_words_not_bridged():
+    dsp, bus = make_dsp()
+    ram = dsp.parameter_ram
+    ram.stage(words(1, 0x11), 0x10)
+    ram.stage(words(1, 0x11), 0x12)  # 0x11 never written: resending it could overwrite the DSP's value
+    assert ram.flush() == 2
+
+
+# safeload ==================================================
+
+def pairs(address, data):
+    return [(address + i, data[i * N_BYTES_PER_WORD: (i + 1) * N_BYTES_PER_WORD])
+            for i in range(len(data) // N_BYTES_PER_WORD)]
+
+
+def test_safe_load_batch_fills_every_slot():
+    dsp, bus = make_dsp()
+    data = words(12, 0x33)
+    dsp.parameter_ram.safe_load_batch([pairs(0x10, data)])
+    assert bus.n_safeloads == 3  # 5 + 5 + 2 words
+    assert bus.held(0x10, len(data)) == data
+
+
+def test_safeload_group_never_straddles_cycles():
+    dsp, bus = make_dsp()
+    first, second = words(2, 0x44), words(BIQUAD_WORDS, 0x55)
+    dsp.parameter_ram.safe_load_batch([pairs(0x10, first), pairs(0x20, second)])
+    assert bus.n_safeloads == 2
+    assert bus.held(0x10, len(first)) == first
+    assert bus.held(0x20, len(second)) == second
+
+    bus.n_safeloads = 0
+    dsp.parameter_ram.safe_load_batch([pairs(0x30, words(2, 0x66)), pairs(0x40, words(3, 0x66))])
+    assert bus.n_safeloads == 1
+
+
+def test_safeload_flush_keeps_biquads_whole():
+    dsp, bus = make_dsp()
+    ram = dsp.parameter_ram
+    data = biquads(3, 0x77)
+    ram.stage(data[N_BYTES_PER_WORD:], 0x11, group_words=BIQUAD_WORDS)  # starts one word into a biquad
+    ram.flush(safeload=True)
+    assert ram.n_dirty_words == 0
+    assert bus.n_safeloads == 3
+    assert bus.held(0x11, len(data) - N_BYTES_PER_WORD) == data[N_BYTES_PER_WORD:]
+
+
+def test_failed_safeload_keeps_unsent_words_dirty():
+    dsp, bus = make_dsp()
+    ram = dsp.parameter_ram
+    data = biquads(3, 0x88)
+    ram.stage(data, 0x10, group_words=BIQUAD_WORDS)
+
+    safeload = bus._safeload
+
+    def fail_second_cycle():
+        if bus.n_safeloads == 1:
+            raise OSError(5)
+        safeload()
+
+    bus._safeload = fail_second_cycle
+    with pytest.raises(OSError):
+        ram.flush(safeload=True)
+    assert ram.n_dirty_words == 2 * BIQUAD_WORDS  # the first cycle landed
+
+    bus._safeload = safeload
+    ram.flush(safeload=True)
+    assert ram.n_dirty_words == 0
+    assert bus.held(0x10, len(data)) == data
+
+
+# reconcile =================================================
+
+def test_reconcile_writes_only_what_the_dsp_lacks():
+    dsp, bus = make_dsp()
+    ram = dsp.parameter_ram
+    data = biquads(2, 0x11)
+    bus.parameter_ram[0x10 * N_BYTES_PER_WORD: 0x10 * N_BYTES_PER_WORD + len(data)] = data  # self-booted
+    bus.parameter_ram[0x13 * N_BYTES_PER_WORD: 0x14 * N_BYTES_PER_WORD] = bytes(N_BYTES_PER_WORD)
+
+    ram.stage(data, 0x10, group_words=BIQUAD_WORDS)
+    assert ram.reconcile() == 2 * BIQUAD_WORDS
+    assert bus.n_words_read == 2 * BIQUAD_WORDS  # one read of the span
+    assert ram.n_dirty_words == 1
+
+    bus.n_parameter_writes = 0
+    assert ram.flush() == 1
+    assert bus.held(0x10, len(data)) == data
+
+    ram.stage(data, 0x10, group_words=BIQUAD_WORDS)  # a second boot: nothing to write
+    assert ram.reconcile() == 0
+    assert ram.flush() == 0
+
+
+def test_reconcile_keeps_group_start_for_safeload():
+    dsp, bus = make_dsp()
+    ram = dsp.parameter_ram
+    data = biquads(1, 0x22)
+    bus.parameter_ram[0x10 * N_BYTES_PER_WORD: 0x12 * N_BYTES_PER_WORD] = data[:2 * N_BYTES_PER_WORD]
+
+    ram.stage(data, 0x10, group_words=BIQUAD_WORDS)
+    ram.reconcile()
+    assert ram.n_dirty_words == 3
+    ram.flush(safeload=True)
+    assert bus.n_safeloads == 1
+    assert bus.held(0x10, len(data)) == data
+
+
+# read_into =================================================
+
+def test_read_into_fills_the_callers_buffer():
+    dsp, bus = make_dsp()
+    data = words(300, 0x33)  # more than a read chunk
+    bus.parameter_ram[0x20 * N_BYTES_PER_WORD: 0x20 * N_BYTES_PER_WORD + len(data)] = data
+
+    buffer = bytearray(8 + len(data))
+    view = memoryview(buffer)[8:]
+    assert dsp.parameter_ram.read_into(view, 0x20) is view
+    assert bytes(buffer[8:]) == data and bytes(buffer[:8]) == bytes(8)
+    assert dsp.parameter_ram.read(len(data), 0x20) == data
+
+
+# flush cycles ==============================================
+
+def test_flush_cycles_sends_every_group():
+    dsp, bus = make_dsp()
+    ram = dsp.parameter_ram
+    data = biquads(3, 0x11)
+    ram.stage(data, 0x10, group_words=BIQUAD_WORDS)
+
+    assert sum(ram.flush_cycles()) > 0
+    assert ram.n_dirty_words == 0
+    assert bus.n_safeloads == 3
+    assert bus.held(0x10, len(data)) == data
+
+
+def test_dropped_flush_cycles_keep_unsent_words_dirty():
+    dsp, bus = make_dsp()
+    ram = dsp.parameter_ram
+    data = biquads(3, 0x22)
+    ram.stage(data, 0x10, group_words=BIQUAD_WORDS)
+
+    cycles = ram.flush_cycles()
+    next(cycles)
+    cycles.close()
+    assert ram.n_dirty_words == 2 * BIQUAD_WORDS
+
+    assert ram.flush(safeload=True) > 0
+    assert ram.n_dirty_words == 0
+    assert bus.held(0x10, len(data)) == data
+
+
+def test_words_staged_during_flush_cycles_stay_dirty():
+    dsp, bus = make_dsp()
+    ram = dsp.parameter_ram
+    ram.stage(biquads(2, 0x33), 0x10, group_words=BIQUAD_WORDS)
+
+    cycles = ram.flush_cycles()
+    next(cycles)
+    newer = biquads(1, 0x44)
+    ram.stage(newer, 0x10 + BIQUAD_WORDS, group_words=BIQUAD_WORDS)  # the group not sent yet
+    for _ in cycles:
+        pass
+    assert ram.n_dirty_words == BIQUAD_WORDS
+
+    ram.flush(safeload=True)
+    assert ram.n_dirty_words == 0
+    assert bus.held(0x10 + BIQUAD_WORDS, len(newer)) == newer
+
+
+def test_flush_all_interleaves_dsps():
+    log = []
+    (left, left_bus), (right, right_bus) = make_dsp(log), make_dsp(log)
+    left.parameter_ram.stage(biquads(3, 0x55), 0x10, group_words=BIQUAD_WORDS)
+    right.parameter_ram.stage(biquads(2, 0x66), 0x10, group_words=BIQUAD_WORDS)
+
+    assert CrossoverService.flush_all([left, right]) > 0
+    assert log == [left_bus, right_bus, left_bus, right_bus, left_bus]  # round robin, one IST cycle each
+    assert left.parameter_ram.n_dirty_words == right.parameter_ram.n_dirty_words == 0
+    assert left_bus.held(0x10, 3 * BIQUAD_WORDS * N_BYTES_PER_WORD) == biquads(3, 0x55)
+    assert right_bus.held(0x10, 2 * BIQUAD_WORDS * N_BYTES_PER_WORD) == biquads(2, 0x66)
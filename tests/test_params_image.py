@@ -0,0 +1,53 @@
+import pytest
+
+from config import PARAMS_IMAGE_PATH, PARAMS_SOURCE_PATH
+from utils.params_image import ParamsImage
+from utils.parse_params_file_as_json import parse_params_file
+
+CELLS = {
+    'Crossover1': [
+        ('CrossoverFilterAlgB0_1', 0x0011, b'\x00\x80\x00\x01'),
+        ('CrossoverFilterAlgB0_0', 0x0010, b'\x00\x80\x00\x00'),
+        ('CrossoverFilterAlgA1_0', 0x0012, b'\x00\x00\x00\x02'),
+    ],
+    'Invert1': [('EQ1940Invert1gain', 0x0020, b'\xff\x80\x00\x00')],
+}
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'params.bin')
+    ParamsImage.build(path, CELLS)
+    image = ParamsImage.load(path)
+    try:
+        assert (image.n_cells, image.n_parameters, image.n_bytes_per_parameter) == (2, 4, 4)
+        assert 'Crossover1' in image and 'Missing' not in image
+
+        cell = image['Crossover1']
+        assert len(cell) == 3
+        assert cell.address('CrossoverFilterAlgB0_1') == 0x0011
+        assert cell.address('B0_1') == 0x0011  # without the prefix shared by the cell
+        assert 'A2_0' not in cell
+        with pytest.raises(KeyError):
+            cell.address('A2_0')
+
+        assert cell.head_address == 0x0010 and cell.is_contiguous
+        assert cell.default_data() == b'\x00\x80\x00\x00\x00\x80\x00\x01\x00\x00\x00\x02'  # address order
+        assert image['Invert1'].address('EQ1940Invert1gain') == 0x0020
+        with pytest.raises(KeyError):
+            image['Missing']
+    finally:
+        image.close()
+
+
+def test_shipped_image_matches_source():
+    with open(PARAMS_SOURCE_PATH, 'r') as file:
+        parsed = parse_params_file(file.read())
+    image = ParamsImage.load(PARAMS_IMAGE_PATH)
+    try:
+        assert image.n_cells == len(parsed)
+        for cell_name, parameters in parsed.items():
+            cell = image[cell_name]
+            for parameter in parameters:
+                assert cell.address(parameter['Parameter Name']) == parameter['Parameter Address']
+    finally:
+        image.close()
@@ -0,0 +1,61 @@
+import json
+
+from features.crossover.persistence import CrossoverStore
+from simulation.nvs import MemoryNVS
+from simulation.pins import FakeClock
+
+LEGACY = {'Xover-R': {'1': [30, 500], '11': [500, 20000]}}
+
+
+def test_default_backend_on_cpython():
+    store = CrossoverStore(clock=FakeClock())
+    store.save('Xover-R', {'1': (30, 500)})
+    assert store.flush()
+    assert store.commits == 1
+    assert isinstance(store.nvs, MemoryNVS)
+
+
+def test_legacy_record_erased_after_migration():
+    storage = {}
+    legacy = MemoryNVS('crossover', storage)
+    legacy.set_blob('Xover-R', json.dumps(LEGACY).encode())
+    legacy.commit()
+
+    store = CrossoverStore(nvs=MemoryNVS('crossover', storage), clock=FakeClock())
+    assert store.load('Xover-R') == {'1': (30, 500), '11': (500, 20000)}
+    assert ('crossover', 'Xover-R') in storage  # kept until the new record is committed
+
+    assert store.flush()
+    assert ('crossover', 'Xover-R') not in storage
+    assert ('crossover', 'state') in storage
+
+    reopened = CrossoverStore(nvs=MemoryNVS('crossover', storage), clock=FakeClock())
+    assert reopened.load('Xover-R') == {'1': (30, 500), '11': (500, 20000)}
+
+
+class FailingOnceNVS(MemoryNVS):
+    def __init__(self, namespace, storage=None):
+        super().__init__(namespace, storage)
+        self.failures = 1
+
+    def commit(self):
+        if self.failures:
+            self.failures -= 1
+            raise OSError(-4363)  # ESP_ERR_NVS_NOT_ENOUGH_SPACE
+        super().commit()
+
+
+def test_failed_commit_retried_by_next_poll():
+    clock = FakeClock()
+    nvs = FailingOnceNVS('crossover')
+    store = CrossoverStore(nvs=nvs, clock=clock)
+    store.save('Xover-R', {'1': (30, 500)})
+
+    clock.advance(store.debounce_ms)
+    assert not store.poll()
+    assert store.pending and store.commits == 0
+
+    assert store.poll()
+    assert not store.pending and store.commits == 1
+    reopened = CrossoverStore(nvs=MemoryNVS('crossover', nvs.storage), clock=FakeClock())
+    assert reopened.load('Xover-R') == {'1': (30, 500)}
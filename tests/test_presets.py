@@ -0,0 +1,79 @@
+import pytest
+
+from config import PARAMS_IMAGE_PATH
+from external.sigma.bus.adapters import I2C as SigmaI2C
+from external.sigma.sigma_dsp.adau.adau1401.adau1401 import ADAU1401
+from features.crossover.controller import TwoWayCrossover
+from features.crossover.persistence import CrossoverStore
+from features.crossover.service import CrossoverService
+from features.presets.service import PresetBank
+from simulation.board import BoardI2C
+from simulation.nvs import MemoryNVS
+from simulation.pins import FakeClock
+from utils.params_image import ParamsImage
+
+FS = 48000
+
+
+@pytest.fixture
+def params():
+    image = ParamsImage.load(PARAMS_IMAGE_PATH)
+    yield image
+    image.close()
+
+
+@pytest.fixture(autouse=True)
+def store(monkeypatch):
+    store = CrossoverStore(nvs=MemoryNVS('crossover'), clock=FakeClock())
+    monkeypatch.setattr(CrossoverService, 'store', store)
+    return store
+
+
+def heads(params, cell_name):
+    cell = params[cell_name]
+    return [cell.address(name) for name in TwoWayCrossover.CHANNEL_HEAD_NAMES]
+
+
+def build(path, params, fs=FS):
+    right, left = heads(params, 'Crossover1'), heads(params, 'Crossover1_2')
+    PresetBank.build(path, [
+        ('Default', [('Xover-R', right[0], 30, 500), ('Xover-R', right[1], 500, 20000)]),
+        ('Sub 80 Hz', [('Xover-R', right[0], 30, 80), ('Xover-R', right[1], 80, 20000),
+                       ('Xover-L', left[0], 30, 80), ('Xover-L', left[1], 80, 20000)]),
+    ], fs=fs)
+    return PresetBank.load(path)
+
+
+def test_bank_round_trip(tmp_path, params):
+    bank = build(str(tmp_path / 'presets.bin'), params)
+    assert bank.names == ['Default', 'Sub 80 Hz'] and len(bank) == 2
+    assert bank.is_current
+
+    channels = bank.channels(1)
+    assert len(channels) == 4
+    for low_cutoff, high_cutoff, block in channels.values():
+        assert bytes(block) == PresetBank.encode_channel(low_cutoff, high_cutoff, FS)
+
+
+def test_bank_for_another_rate_not_current(tmp_path, params):
+    bank = build(str(tmp_path / 'presets.bin'), params, fs=44100)
+    assert not bank.is_current
+    assert all(block is None for _, _, block in bank.channels(0).values())
+
+
+def test_recall_stages_blocks_and_saves_cutoffs(tmp_path, params, store):
+    bank = build(str(tmp_path / 'presets.bin'), params)
+    i2c = BoardI2C()
+    dsp = ADAU1401(SigmaI2C(i2c), i2c_address=0x34)
+    crossovers = [TwoWayCrossover(dsp, params['Crossover1'], name='Xover-R'),
+                  TwoWayCrossover(dsp, params['Crossover1_2'], name='Xover-L')]
+    assert bank.matches(0, crossovers) and not bank.matches(1, crossovers)
+
+    i2c.reset_counters()
+    assert bank.recall(1, crossovers) == 4
+    assert bank.matches(1, crossovers)
+    assert store.pending
+
+    i2c.idle(1000)  # the last safeload's audio frame
+    for (_, head_address), (_, _, block) in bank.channels(1).items():
+        assert dsp.parameter_ram.read(len(block), head_address) == bytes(block)
@@ -0,0 +1,61 @@
+from external.sigma.bus.adapters import I2C as SigmaI2C
+from external.sigma.sigma_dsp.adau.adau1401.adau1401 import ADAU1401
+
+ADDRESS = 0x34
+SERIAL_OUTPUT_CONTROL = 0x081E
+SERIAL_INPUT_CONTROL = 0x081F
+
+
+class RecordingI2C:
+    """Bus recording the writes; reads return zeros."""
+
+    def __init__(self):
+        self.writes = []
+
+    def writeto(self, addr, buf, stop=True):
+        self.writes.append(bytes(buf))
+
+    def readfrom(self, addr, nbytes, stop=True):
+        return bytes(nbytes)
+
+
+def make_dsp():
+    i2c = RecordingI2C()
+    dsp = ADAU1401(SigmaI2C(i2c), i2c_address=ADDRESS)
+    i2c.writes = []
+    return dsp, i2c
+
+
+def test_batch_sends_latest_value_once_in_one_burst():
+    dsp, i2c = make_dsp()
+    saved = dsp.bus_writes_saved
+    with dsp.register_batch():
+        dsp._write_register_by_address(SERIAL_OUTPUT_CONTROL, 0x0001)
+        dsp._write_register_by_address(SERIAL_INPUT_CONTROL, 0x01)
+        dsp._write_register_by_address(SERIAL_OUTPUT_CONTROL, 0x0002)
+        assert i2c.writes == []
+
+    assert i2c.writes == [b'\x08\x1e\x00\x02\x01']  # consecutive registers, one transaction
+    assert dsp.bus_writes_saved - saved == 2  # the stale value and the second transaction
+
+
+def test_unchanged_register_not_rewritten():
+    dsp, i2c = make_dsp()
+    dsp._write_register_by_address(SERIAL_INPUT_CONTROL, 0x01)
+    saved = dsp.bus_writes_saved
+    dsp._write_register_by_address(SERIAL_INPUT_CONTROL, 0x01)
+    assert len(i2c.writes) == 1
+    assert dsp.bus_writes_saved == saved + 1
+
+    dsp.invalidate_register_cache()
+    dsp._write_register_by_address(SERIAL_INPUT_CONTROL, 0x01)
+    assert len(i2c.writes) == 2
+
+
+def test_cached_read_skips_bus():
+    dsp, i2c = make_dsp()
+    dsp._write_register_by_address(SERIAL_INPUT_CONTROL, 0x01)
+    saved = dsp.bus_reads_saved
+    assert dsp._read_register_by_address(SERIAL_INPUT_CONTROL).value == 0x01
+    assert dsp.bus_reads_saved == saved + 1
+    assert len(i2c.writes) == 1  # no sub address write for a read
@@ -0,0 +1,150 @@
+from features.rotary_encoder import RotaryEncoder
+from simulation.pins import FakeClock, FakePin, QuadratureReplayer
+
+
+class RecordingBus:
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event_type, data=None):
+        self.events.append((event_type, data))
+
+
+def make_encoder():
+    clock = FakeClock(start_ms=1000)
+    bus = RecordingBus()
+    encoder = RotaryEncoder(
+        clk_pin=FakePin(0, FakePin.IN, FakePin.PULL_UP),
+        dt_pin=FakePin(1, FakePin.IN, FakePin.PULL_UP),
+        sw_pin=FakePin(2, FakePin.IN, FakePin.PULL_UP),
+        event_bus=bus,
+        clock=clock
+    )
+    return encoder, QuadratureReplayer(encoder.clk, encoder.dt, clock=clock), bus
+
+
+def buffered_deltas(encoder):
+    """The detents in the ring buffer, oldest first, without draining it."""
+    return [encoder._deltas[(encoder._tail + i) % encoder.BUFFER_SIZE] for i in range(encoder.pending)]
+
+
+def test_clockwise_detents():
+    encoder, replayer, bus = make_encoder()
+    replayer.turn(3, interval_ms=400)
+    assert buffered_deltas(encoder) == [1, 1, 1]
+
+    encoder.read()
+    assert bus.events == [("right", 1)] * 3
+    assert encoder.pending == 0
+
+
+def test_counterclockwise_detents():
+    encoder, replayer, bus = make_encoder()
+    replayer.turn(-2, interval_ms=400)
+    assert buffered_deltas(encoder) == [-1, -1]
+
+    encoder.read()
+    assert bus.events == [("left", 1)] * 2
+
+
+def test_direction_change():
+    encoder, replayer, _ = make_encoder()
+    replayer.turn(2, interval_ms=400)
+    replayer.turn(-1, interval_ms=400)
+    assert buffered_deltas(encoder) == [1, 1, -1]
+
+
+def test_bouncing_contacts_count_once():
+    encoder, replayer, _ = make_encoder()
+    replayer.turn(2, interval_ms=400, bounce=True)
+    replayer.turn(-2, interval_ms=400, bounce=True)
+    assert buffered_deltas(encoder) == [1, 1, -1, -1]
+
+
+def test_half_turn_and_back_is_no_detent():
+    encoder, replayer, _ = make_encoder()
+    replayer.replay(QuadratureReplayer.RIGHT[:2])
+    replayer.replay(((1, 0), (1, 1)))
+    assert encoder.pending == 0
+    assert encoder._transitions == 0
+
+
+def test_skipped_edge_keeps_detent():
+    encoder, replayer, _ = make_encoder()
+    # Half a click to the right, then DT rises while interrupts are masked: the next
+    # handler sees CLK and DT change at once and drops the transition
+    replayer.replay(QuadratureReplayer.RIGHT[:2])
+    encoder.dt._value = 1
+    encoder.clk.value(1)
+    assert encoder._state == 0b11
+    assert buffered_deltas(encoder) == [1]
+
+    # The partial count is gone: the next click is a single detent
+    replayer.replay(QuadratureReplayer.RIGHT)
+    assert buffered_deltas(encoder) == [1, 1]
+
+
+def test_bounce_at_rest_dropped():
+    encoder, replayer, _ = make_encoder()
+    # One edge of the next click, then its bounce back to the detent
+    replayer.replay(QuadratureReplayer.RIGHT[:1])
+    replayer.replay(QuadratureReplayer.LEFT[-1:])
+    assert encoder._state == 0b11
+    assert encoder.pending == 0
+    replayer.replay(QuadratureReplayer.RIGHT)
+    assert buffered_deltas(encoder) == [1]
+
+
+def test_full_buffer_folds_detents():
+    encoder, replayer, _ = make_encoder()
+    replayer.turn(encoder.BUFFER_SIZE + 9, interval_ms=400)
+    deltas = buffered_deltas(encoder)
+    assert len(deltas) == encoder.BUFFER_SIZE - 1
+    assert sum(deltas) == encoder.BUFFER_SIZE + 9
+
+
+def test_slow_spin_has_no_acceleration():
+    encoder, replayer, bus = make_encoder()
+    replayer.turn(5, interval_ms=200)
+    encoder.read()
+    assert [multiplier for _, multiplier in bus.events] == [1] * 5
+
+
+def test_medium_spin_multiplier():
+    encoder, replayer, bus = make_encoder()
+    replayer.turn(6, interval_ms=60)  # 4 detents in the velocity window: 20 per second
+    encoder.read()
+    assert [multiplier for _, multiplier in bus.events] == [1, 2, 2, 5, 5, 5]
+
+
+def test_fast_spin_multiplier():
+    encoder, replayer, bus = make_encoder()
+    replayer.turn(-30, interval_ms=12)  # 17 detents in the velocity window: 85 per second
+    assert buffered_deltas(encoder) == [-1] * 30
+
+    encoder.read()
+    multipliers = [multiplier for _, multiplier in bus.events]
+    assert set(event for event, _ in bus.events) == {"left"}
+    assert multipliers[0] == 1
+    assert multipliers[-10:] == [10] * 10
+    assert multipliers == sorted(multipliers)
+
+
+def test_acceleration_decays_when_the_knob_stops():
+    encoder, replayer, bus = make_encoder()
+    replayer.turn(20, interval_ms=12)
+    encoder.read()
+    now = encoder.clock()
+    assert encoder.acceleration(now) == 10
+    assert encoder.acceleration(now + encoder.VELOCITY_WINDOW_MS) == 1
+
+
+def test_click_is_debounced():
+    encoder, _, bus = make_encoder()
+    encoder.clock.advance(100)
+    encoder.sw.value(0)
+    encoder.sw.value(1)
+    encoder.sw.value(0)  # chatter within the debounce time
+    encoder.sw.value(1)
+    encoder.read()
+    assert bus.events == [("click", None)]
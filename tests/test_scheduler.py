@@ -0,0 +1,96 @@
+from features.crossover.scheduler import UpdateScheduler
+
+
+class Clock:
+    def __init__(self):
+        self.now_ms = 0
+
+    def __call__(self):
+        return self.now_ms
+
+
+def make_scheduler(max_writes_per_second=20):
+    clock = Clock()
+    staged = []
+    flushes = []
+    scheduler = UpdateScheduler(lambda: flushes.append(list(staged)), max_writes_per_second, clock=clock)
+    return scheduler, clock, staged, flushes
+
+
+def test_latest_update_wins():
+    scheduler, _, staged, flushes = make_scheduler()
+    for cutoff in (100, 110, 120):
+        scheduler.submit(('Xover-R', 1), lambda cutoff=cutoff: staged.append(('low', cutoff)))
+    scheduler.submit(('Xover-R', 11), lambda: staged.append(('high', 500)))
+
+    assert scheduler.pending == 2
+    assert scheduler.poll()
+    assert flushes == [[('low', 120), ('high', 500)]]  # one flush for every pending filter
+    assert (scheduler.submitted, scheduler.dropped, scheduler.commits) == (4, 2, 1)
+    assert scheduler.pending == 0
+
+
+def test_rate_limit():
+    scheduler, clock, staged, flushes = make_scheduler(max_writes_per_second=20)
+    scheduler.submit('low', lambda: staged.append(100))
+    assert scheduler.poll()
+
+    clock.now_ms += scheduler.min_interval_ms - 1
+    scheduler.submit('low', lambda: staged.append(110))
+    assert not scheduler.poll()
+    assert scheduler.pending == 1
+
+    clock.now_ms += 1
+    assert scheduler.poll()
+    assert len(flushes) == 2 and staged == [100, 110]
+    assert not scheduler.poll()  # nothing pending
+
+
+def test_flush_ignores_rate_limit():
+    scheduler, _, staged, flushes = make_scheduler()
+    scheduler.submit('low', lambda: staged.append(100))
+    scheduler.poll()
+    scheduler.submit('low', lambda: staged.append(110))
+    assert not scheduler.poll()
+    scheduler.flush()
+    assert staged == [100, 110] and len(flushes) == 2
+
+
+def test_cancel_drops_pending_update():
+    scheduler, _, staged, flushes = make_scheduler()
+    scheduler.submit('low', lambda: staged.append(100))
+    assert scheduler.cancel('low')
+    assert not scheduler.cancel('low')
+    assert not scheduler.poll()
+    assert flushes == []
+
+
+class Event:
+    def __init__(self):
+        self.is_set = False
+
+    def set(self):
+        self.is_set = True
+
+    def clear(self):
+        self.is_set = False
+
+
+def test_wake_and_idle_events():
+    clock = Clock()
+    wake, idle = Event(), Event()
+    scheduler = UpdateScheduler(lambda: None, clock=clock, wake=wake, idle=idle)
+    assert idle.is_set and scheduler.delay_ms is None
+
+    scheduler.submit('low', lambda: None)
+    assert wake.is_set and not idle.is_set
+    assert scheduler.delay_ms == 0
+    assert scheduler.poll()
+    assert idle.is_set
+
+    clock.now_ms += 20
+    scheduler.submit('low', lambda: None)
+    assert not scheduler.due
+    assert scheduler.delay_ms == scheduler.min_interval_ms - 20
+    scheduler.cancel('low')
+    assert idle.is_set
@@ -0,0 +1,59 @@
+from external.sigma.bus.adapters import I2C as SigmaI2C
+from external.sigma.sigma_dsp.adau.adau1401.adau1401 import ADAU1401
+from simulation.board import BoardI2C
+
+DSP_ADDRESS = 0x34
+BIQUAD_WORDS = 5
+N_BYTES_PER_WORD = 4
+
+
+def make_dsp():
+    i2c = BoardI2C()
+    return ADAU1401(SigmaI2C(i2c), i2c_address=DSP_ADDRESS), i2c
+
+
+def biquad(fill):
+    """A biquad's words, within the 28 bits the DSP keeps of a parameter."""
+    return bytes((0x01, fill, fill, fill)) * BIQUAD_WORDS
+
+
+def test_safeload_lands_at_the_next_frame():
+    dsp, i2c = make_dsp()
+    data = biquad(0x11)
+    dsp.parameter_ram.stage(data, 0x10, group_words=BIQUAD_WORDS)
+    dsp.parameter_ram.flush(safeload=True)
+    assert i2c.dsp.parameter(0x10) == 0  # IST written, the frame isn't over yet
+
+    i2c.idle(1e6 / 48000)
+    assert i2c.dsp.parameter(0x10) == int.from_bytes(data[:N_BYTES_PER_WORD], 'big')
+    assert i2c.dsp.n_safeload_transfers == 1
+    assert i2c.dsp.n_words_safeloaded == BIQUAD_WORDS
+
+
+def test_words_keep_28_bits():
+    dsp, i2c = make_dsp()
+    dsp.parameter_ram.write(b'\xff\xff\xff\xff', 0x20)
+    assert dsp.parameter_ram.read(N_BYTES_PER_WORD, 0x20) == b'\x0f\xff\xff\xff'
+
+
+def test_reconcile_against_simulated_dsp():
+    dsp, i2c = make_dsp()
+    held, changed = biquad(0x22), biquad(0x33)
+    i2c.dsp.parameter_ram[0x10 * N_BYTES_PER_WORD: 0x10 * N_BYTES_PER_WORD + len(held)] = held  # self-booted
+
+    ram = dsp.parameter_ram
+    ram.stage(held + changed, 0x10, group_words=BIQUAD_WORDS)
+    i2c.reset_counters()
+    assert ram.reconcile() == 2 * BIQUAD_WORDS
+    assert (i2c.n_reads, ram.n_dirty_words) == (1, BIQUAD_WORDS)
+    assert ram.flush() == 1
+    assert i2c.dsp.parameter(0x10 + BIQUAD_WORDS) == int.from_bytes(changed[:N_BYTES_PER_WORD], 'big')
+
+
+def test_eeprom_write_cycle_polled():
+    dsp, i2c = make_dsp()
+    image = bytes(range(96))
+    dsp.eeprom.write(image)
+    assert i2c.eeprom.n_page_writes == 3
+    assert i2c.eeprom.n_nacks == dsp.eeprom.n_ack_polls > 0  # 5 ms write cycles at 400 kHz
+    assert bytes(i2c.eeprom.memory[:len(image)]) == image
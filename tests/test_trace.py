@@ -0,0 +1,21 @@
+from external.sigma.bus.trace import BusTracer, OP_WRITE
+from utils.ticks import ticks_us
+
+HOURS_US = 3 * 3600 * 1000000
+
+
+def test_total_latency_past_32_bits(tmp_path):
+    tracer = BusTracer()
+    tracer.set_action('display flush')
+    tracer.record(0x3C, OP_WRITE, 16, ticks_us())
+    cell = (0 * 3 + OP_WRITE) * tracer.N_ACTIONS + tracer.action
+    tracer.total_us[cell] += HOURS_US  # hours of display flushes
+    assert tracer.total_us[cell] > 0xFFFFFFFF
+
+    path = str(tmp_path / 'trace.bin')
+    tracer.dump(path)
+    loaded = BusTracer.load(path)
+    assert loaded.total_us[cell] == tracer.total_us[cell]
+    assert loaded.counts[cell] == 1
+    assert loaded.actions == tracer.actions
+    assert loaded.summary() == tracer.summary()
@@ -0,0 +1,75 @@
+# uasyncio on MicroPython, asyncio on CPython, plus the bits uasyncio is missing.
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+try:
+    sleep_ms = asyncio.sleep_ms
+except AttributeError:
+    def sleep_ms(ms):
+        return asyncio.sleep(ms / 1000)
+
+try:
+    ThreadSafeFlag = asyncio.ThreadSafeFlag
+except AttributeError:
+    class ThreadSafeFlag:
+        """
+        uasyncio.ThreadSafeFlag on CPython, where the simulated pins fire their handlers
+        from the event loop thread: set() wakes the waiting task, wait() clears the flag.
+        """
+
+        def __init__(self):
+            self._event = asyncio.Event()
+
+        def set(self):
+            self._event.set()
+
+        def clear(self):
+            self._event.clear()
+
+        async def wait(self):
+            await self._event.wait()
+            self._event.clear()
+
+
+class BoundedQueue:
+    """
+    FIFO of at most maxsize items between tasks (uasyncio has no Queue).
+
+    put_nowait() never blocks the producer: when the queue is full the oldest item is
+    dropped. Items put with a key replace the queued item with the same key in place.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._items = []
+        self._keys = []
+        self._event = asyncio.Event()
+        self.dropped = 0
+
+    def put_nowait(self, item, key=None):
+        if key is not None and key in self._keys:
+            self._items[self._keys.index(key)] = item
+            self.dropped += 1
+            return
+        if len(self._items) >= self.maxsize:
+            self._items.pop(0)
+            self._keys.pop(0)
+            self.dropped += 1
+        self._items.append(item)
+        self._keys.append(key)
+        self._event.set()
+
+    def get_nowait(self):
+        self._keys.pop(0)
+        return self._items.pop(0)
+
+    async def get(self):
+        while not self._items:
+            self._event.clear()
+            await self._event.wait()
+        return self.get_nowait()
+
+    def __len__(self):
+        return len(self._items)
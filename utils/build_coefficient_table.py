@@ -0,0 +1,18 @@
+# Host side: precompute the encoded crossover coefficients for every cutoff of the encoder grid.
+# Run from the repository root: python -m utils.build_coefficient_table
+import os
+
+from config import COEFFICIENT_TABLE_PATH
+from features.crossover.service import CoefficientTable, FREQUENCY_GRID
+
+
+def main():
+    CoefficientTable.build(COEFFICIENT_TABLE_PATH)
+    table = CoefficientTable.load(COEFFICIENT_TABLE_PATH)
+    print(f"{COEFFICIENT_TABLE_PATH}: {table.n_cutoffs} cutoffs {FREQUENCY_GRID}, "
+          f"{os.stat(COEFFICIENT_TABLE_PATH).st_size} bytes")
+    table.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+# Host side: compile the SigmaStudio parameters export into the binary image read by utils/params_image.py.
+# Run from the repository root: python -m utils.build_params_image
+import os
+
+from config import PARAMS_SOURCE_PATH, PARAMS_IMAGE_PATH
+from utils.parse_params_file_as_json import parse_params_file
+from utils.params_image import ParamsImage
+
+
+def main():
+    with open(PARAMS_SOURCE_PATH, 'r') as file:
+        parsed = parse_params_file(file.read())
+
+    cells = {
+        cell_name: [(p["Parameter Name"], p["Parameter Address"], bytes(p["Parameter Data"])) for p in parameters]
+        for cell_name, parameters in parsed.items()
+    }
+    ParamsImage.build(PARAMS_IMAGE_PATH, cells)
+
+    image = ParamsImage.load(PARAMS_IMAGE_PATH)
+    print(f"{PARAMS_IMAGE_PATH}: {image.n_cells} cells, {image.n_parameters} parameters, "
+          f"{os.stat(PARAMS_IMAGE_PATH).st_size} bytes")
+    image.close()
+
+
+if __name__ == "__main__":
+    main()
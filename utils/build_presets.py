@@ -0,0 +1,38 @@
+# Host side: encode the crossover presets of params/presets.json into the bank read by features/presets.
+# Source: {preset name: {crossover name: [[low cutoff, high cutoff] per channel]}}, crossovers of config.CROSSOVERS.
+# Run from the repository root: python -m utils.build_presets
+import json
+import os
+
+from config import PRESETS_SOURCE_PATH, PRESETS_PATH, COEFFICIENT_TABLE_PATH, CROSSOVERS
+from features.crossover.controller import TwoWayCrossover
+from features.crossover.service import CrossoverService
+from features.presets.service import PresetBank
+from utils.get_params import get_params
+
+
+def main():
+    with open(PRESETS_SOURCE_PATH, 'r') as file:
+        source = json.load(file)
+
+    params = get_params()
+    cells = {crossover_name: cell_name for crossover_name, cell_name, _, _ in CROSSOVERS}
+    CrossoverService.load_coefficient_table(COEFFICIENT_TABLE_PATH)
+    presets = []
+    for name, crossovers in source.items():
+        channels = []
+        for crossover_name, cutoffs in crossovers.items():
+            cell = params[cells[crossover_name]]
+            heads = [cell.address(head_name) for head_name in TwoWayCrossover.CHANNEL_HEAD_NAMES]
+            assert len(cutoffs) == len(heads), '{} {}: {} channels'.format(name, crossover_name, len(heads))
+            channels += [(crossover_name, head, low, high) for head, (low, high) in zip(heads, cutoffs)]
+        presets.append((name, channels))
+    PresetBank.build(PRESETS_PATH, presets)
+
+    bank = PresetBank.load(PRESETS_PATH)
+    print(f"{PRESETS_PATH}: {len(bank)} presets {bank.names}, {bank.alignment}, "
+          f"{os.stat(PRESETS_PATH).st_size} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# Host side: compile the ADAU1401 register map into the table behind CompactRegistersMap.
+# Run from the repository root: python -m utils.build_register_table
+from external.sigma.sigma_dsp.adau.adau1401.register import RegistersMap
+from external.sigma.sigma_dsp.adau.adau1401.registers_map import _get_all_registers
+
+TABLE_PATH = 'external/sigma/sigma_dsp/adau/adau1401/registers_table.py'
+
+
+def _array(type_code, values):
+    return "array('{}', {})".format(type_code, list(values))
+
+
+def generate(registers_map):
+    registers = registers_map._registers
+    elements = [(i, e) for i, reg in enumerate(registers) for e in reg._elements]
+
+    first_elements = [0]
+    for reg in registers:
+        first_elements.append(first_elements[-1] + len(reg._elements))
+
+    lines = [
+        '# Generated by utils/build_register_table.py from registers_map.py. Do not edit.',
+        'from array import array',
+        '',
+        'NAME = {!r}'.format(registers_map.name),
+        '',
+        '# registers; values wider than 32 bits (safeload data) need the 64-bit type codes',
+        'REGISTER_NAMES = {!r}'.format(tuple(reg.name for reg in registers)),
+        'REGISTER_ADDRESSES = ' + _array('H', (reg.address for reg in registers)),
+        'REGISTER_N_BYTES = ' + _array('B', (reg.n_bytes for reg in registers)),
+        'REGISTER_DEFAULTS = ' + _array('Q', (reg.default_value for reg in registers)),
+        'REGISTER_FIRST_ELEMENTS = ' + _array('H', first_elements) + '  # register i holds elements [first[i], first[i + 1])',
+        '',
+        '# elements',
+        'ELEMENT_NAMES = {!r}'.format(tuple(e.name for _, e in elements)),
+        'ELEMENT_SHIFTS = ' + _array('B', (e.idx_lowest_bit for _, e in elements)),
+        'ELEMENT_MASKS = ' + _array('Q', (e.mask for _, e in elements)),
+        'ELEMENT_READ_ONLY = {!r}'.format(bytes(int(e.read_only) for _, e in elements)),
+        '',
+        '# indexes',
+        'REGISTER_INDEX = {!r}'.format({reg.name: i for i, reg in enumerate(registers)}),
+        'REGISTER_ADDRESS_INDEX = {!r}'.format({reg.address: i for i, reg in enumerate(registers)}),
+        'ELEMENT_INDEX = {!r}  # last one wins for duplicated names, as in RegistersMap'.format(
+            {e.name: i for i, (_, e) in enumerate(elements)}),
+        'ELEMENT_REGISTERS = ' + _array('B', (i for i, _ in elements)),
+        'DUPLICATED_ELEMENT_NAMES = {!r}'.format(registers_map.duplicated_element_names),
+        '',
+    ]
+    return '\n'.join(lines)
+
+
+def main():
+    registers_map = RegistersMap(name = 'ADAU1401', registers = _get_all_registers())
+    source = generate(registers_map)
+    with open(TABLE_PATH, 'w') as f:
+        f.write(source)
+    print(f"{TABLE_PATH}: {len(registers_map._registers)} registers, {len(source)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+# Arbitration of a shared I2C bus between the tasks of the app.
+from utils.aio import asyncio, sleep_ms
+from utils.ticks import ticks_us, ticks_diff
+
+PRIORITY_DSP = 0  # coefficient updates: latency is audible
+PRIORITY_DISPLAY = 2  # frames: can wait a few milliseconds
+
+
+class BusHandle:
+    """
+    A device's view of a shared bus, with the machine.I2C methods the drivers use
+    (SigmaI2C, SSD1306_I2C, I2cLcd). Counts the transactions and bytes of the device.
+
+    Once the manager's run() task has started, the bus is only used from the step of a job
+    (BusManager.transact()): a call from anywhere else would jump the priority queue and split
+    a chunked job, so it fails. Before that, e.g. while the drivers are set up at boot, calls
+    go straight to the bus.
+    """
+
+    def __init__(self, manager, name, priority):
+        self.manager = manager
+        self.name = name
+        self.priority = priority
+        self._i2c = manager.i2c
+        self.transactions = 0
+        self.bytes = 0
+
+    def _check(self):
+        manager = self.manager
+        assert manager.in_step or not manager.running, \
+            '{}: bus used outside BusManager.transact()'.format(self.name)
+
+    def _count(self, n_bytes):
+        self._check()
+        self.transactions += 1
+        self.bytes += n_bytes
+
+    def scan(self):
+        self._check()
+        return self._i2c.scan()
+
+    def writeto(self, addr, buf, stop=True):
+        self._count(len(buf))
+        return self._i2c.writeto(addr, buf, stop)
+
+    def writevto(self, addr, vector, stop=True):
+        self._count(sum(len(buf) for buf in vector))
+        return self._i2c.writevto(addr, vector, stop)
+
+    def readfrom(self, addr, nbytes, stop=True):
+        self._count(nbytes)
+        return self._i2c.readfrom(addr, nbytes, stop)
+
+    def readfrom_into(self, addr, buf, stop=True):
+        self._count(len(buf))
+        return self._i2c.readfrom_into(addr, buf, stop)
+
+    def writeto_mem(self, addr, memaddr, buf, addrsize=8):
+        self._count(len(buf))
+        return self._i2c.writeto_mem(addr, memaddr, buf, addrsize=addrsize)
+
+    def readfrom_mem(self, addr, memaddr, nbytes, addrsize=8):
+        self._count(nbytes)
+        return self._i2c.readfrom_mem(addr, memaddr, nbytes, addrsize=addrsize)
+
+    def readfrom_mem_into(self, addr, memaddr, buf, addrsize=8):
+        self._count(len(buf))
+        return self._i2c.readfrom_mem_into(addr, memaddr, buf, addrsize=addrsize)
+
+
+class _Job:
+    __slots__ = ('priority', 'seq', 'submitted_us', 'started', 'work', 'action', 'done', 'error')
+
+    def __init__(self, priority, seq, submitted_us, work, action):
+        self.priority = priority
+        self.seq = seq
+        self.submitted_us = submitted_us
+        self.started = False
+        self.work = work
+        self.action = action
+        self.done = asyncio.Event()
+        self.error = None
+
+
+class BusManager:
+    """
+    Owns one physical I2C bus and serializes the work of the tasks sharing it.
+
+    Devices get a BusHandle each. Work is submitted as a job at a priority (lower runs first):
+    a callable is one step, a generator one step per next(), e.g. a display frame split into
+    chunks. run() executes one step at a time, always of the most urgent job, and yields to the
+    other tasks in between, so a coefficient update waits for at most one display chunk.
+
+    With a tracer (external.sigma.bus.trace.BusTracer), the transactions of a job's steps are
+    counted under the job's action, if it has one.
+    """
+
+    def __init__(self, i2c, clock=ticks_us, tracer=None):
+        self.i2c = i2c
+        self.clock = clock
+        self.tracer = tracer
+        self.handles = {}
+        self._queue = []  # sorted by (priority, seq)
+        self._seq = 0
+        self._event = asyncio.Event()
+        self.running = False  # run() started: the handles only work within a job's step
+        self.in_step = False
+        self.max_depth = 0
+        self._waits = {}  # priority: [jobs, total wait us, max wait us]
+
+    def handle(self, name, priority):
+        """The BusHandle of a device, created on first use."""
+        if name not in self.handles:
+            self.handles[name] = BusHandle(self, name, priority)
+        return self.handles[name]
+
+    @property
+    def depth(self):
+        return len(self._queue)
+
+    def submit(self, priority, work, action=None):
+        job = _Job(priority, self._seq, self.clock(), work, action)
+        self._seq += 1
+
+        idx = len(self._queue)
+        while idx > 0 and self._queue[idx - 1].priority > priority:
+            idx -= 1
+        self._queue.insert(idx, job)
+
+        self.max_depth = max(self.max_depth, len(self._queue))
+        self._event.set()
+        return job
+
+    async def transact(self, priority, work, action=None):
+        """Submit work and wait until it ran to completion; exceptions of the work are raised here."""
+        job = self.submit(priority, work, action)
+        await job.done.wait()
+        if job.error is not None:
+            raise job.error
+
+    def step(self):
+        """Run one step of the most urgent job. Returns False if there was nothing to run."""
+        if not self._queue:
+            return False
+
+        job = self._queue[0]
+        if not job.started:
+            job.started = True
+            self._record_wait(job.priority, ticks_diff(self.clock(), job.submitted_us))
+
+        tracer = self.tracer
+        if tracer is not None and job.action is not None:
+            previous_action = tracer.begin(job.action)
+
+        finished = True
+        self.in_step = True
+        try:
+            if callable(job.work):
+                job.work()
+            else:
+                next(job.work)
+                finished = False
+        except StopIteration:
+            pass
+        except Exception as e:
+            job.error = e
+        finally:
+            self.in_step = False
+
+        if tracer is not None and job.action is not None:
+            tracer.end(previous_action)
+
+        if finished:
+            self._queue.remove(job)
+            job.done.set()
+        return True
+
+    async def run(self):
+        """The task owning the bus: from now on, devices only reach the bus through transact()."""
+        self.running = True
+        try:
+            while True:
+                if not self._queue:
+                    self._event.clear()
+                    await self._event.wait()
+                self.step()
+                await sleep_ms(0)
+        finally:
+            self.running = False
+
+    def _record_wait(self, priority, wait_us):
+        waits = self._waits.get(priority)
+        if waits is None:
+            waits = self._waits[priority] = [0, 0, 0]
+        waits[0] += 1
+        waits[1] += wait_us
+        waits[2] = max(waits[2], wait_us)
+
+    def stats(self):
+        """Queue depth, wait before the first step per priority and traffic per device."""
+        return {
+            'depth': len(self._queue),
+            'max_depth': self.max_depth,
+            'waits_us': {priority: {'jobs': n, 'mean': total // n, 'max': longest}
+                         for priority, (n, total, longest) in self._waits.items()},
+            'devices': {name: {'transactions': h.transactions, 'bytes': h.bytes} for name, h in self.handles.items()},
+        }
@@ -0,0 +1,260 @@
+# Host side: frequency response of the crossover filters as the DSP runs them, after 5.23 quantization.
+# Checks every setting of the encoder grid: pole radius against a stability margin, deviation from the
+# unquantized design, and ripple of the summed outputs at each crossover point.
+# Run from the repository root: python -m utils.crossover_response  (needs NumPy)
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from external.sigma.sigma_dsp.adau.adau import SAMPLING_FREQ_DEFAULT
+from external.sigma.sigma_dsp.dsp_processor import DspNumber
+from features.crossover.design import ALIGNMENTS, BiquadDesigner, N_COEFFICIENTS_PER_BIQUAD
+from features.crossover.service import COEFFICIENTS_ORDER, CrossoverService, FREQUENCY_GRID
+
+N_POINTS = 2048
+F_MIN = 10
+STABILITY_MARGIN = 1e-4  # a pole radius above 1 - margin rings for seconds or, quantized, goes unstable
+# quantized vs designed, where the designed response is above DEVIATION_FLOOR_DB: the passband and the
+# crossover region, where the outputs sum. Lowpass sections at the bottom of the grid hold B0 in a few
+# dozen LSBs and poles within 1% of the unit circle: truncation moves their gain by tenths of a dB.
+MAX_DEVIATION_DB = 0.5
+DEVIATION_FLOOR_DB = -12
+MAX_RIPPLE_DB = 0.1  # added by quantization to the peak to peak magnitude of the summed outputs
+
+# Polarity of the highpass in the sum of a crossover point that makes it flat (or closest to it):
+# the outputs of the 2nd-order alignments are 180 degrees apart at the cutoff, the cell's LowInvert.
+SUM_POLARITY = {'BW1': 1, 'BW2': -1, 'LR2': -1, 'BW4': 1, 'LR4': 1}
+
+_SCALE = 1 << DspNumber.N_BITS_B
+_BITS_MAX = (1 << (DspNumber.N_BITS - 1)) - 1
+_WORD_MASK = (1 << DspNumber.N_BITS) - 1
+_SIGN_BIT = 1 << (DspNumber.N_BITS - 1)
+
+
+# coefficients ==============================================
+
+def quantize(coefficients):
+    """
+    The values the DSP holds for coefficients, as DspNumber.encode_into() writes them: truncated
+    towards zero to 23 fractional bits and saturated to the 5.23 range.
+    """
+    bits = np.trunc(np.asarray(coefficients, dtype=np.float64) * _SCALE)
+    return np.clip(bits, -_BITS_MAX - 1, _BITS_MAX) / _SCALE
+
+
+def decode_blocks(data):
+    """
+    Sections of encoded biquad blocks (CrossoverService.get_filter_blocks(), a coefficient table
+    block or the parameter RAM read back), as an (n sections, 5) array in COEFFICIENTS_ORDER.
+    Exact, unlike DspNumber.decode() which goes through float32.
+    """
+    words = np.frombuffer(bytes(data), dtype='>u4').astype(np.int64) & _WORD_MASK
+    words = np.where(words & _SIGN_BIT, words - (_WORD_MASK + 1), words)
+    return (words / _SCALE).reshape(-1, N_COEFFICIENTS_PER_BIQUAD)
+
+
+def as_sections(coefficients):
+    """
+    (n sections, 5) quantized array of coefficients in any of the forms CrossoverService deals with:
+    encoded bytes, dicts of calculate_*_coefficients(), sequences of (B0, B1, A1, B2, A2) or the flat
+    values of get_crossover_coefficients() (float32: re-quantized to the nearest lower 5.23 value).
+    """
+    if isinstance(coefficients, (bytes, bytearray, memoryview)):
+        return decode_blocks(coefficients)
+    if isinstance(coefficients, dict):
+        coefficients = [coefficients]
+    if len(coefficients) and isinstance(coefficients[0], dict):
+        coefficients = [[section[name] for name in COEFFICIENTS_ORDER] for section in coefficients]
+    return quantize(np.reshape(np.asarray(coefficients, dtype=np.float64), (-1, N_COEFFICIENTS_PER_BIQUAD)))
+
+
+def read_sections(dsp, address, n_sections=1):
+    """The sections at address in the parameter RAM of dsp, as it holds them."""
+    return decode_blocks(dsp.parameter_ram.read(n_sections * N_COEFFICIENTS_PER_BIQUAD * DspNumber.N_BYTES, address))
+
+
+# response ==================================================
+
+def frequency_grid(n_points=N_POINTS, f_min=F_MIN, fs=SAMPLING_FREQ_DEFAULT):
+    """Log-spaced frequencies from f_min to just below Nyquist."""
+    return np.geomspace(f_min, 0.499 * fs, n_points)
+
+
+def _polynomials(sections, freqs, fs):
+    # numerator and denominator of each section at z = e^jw, and their derivatives in e^-jw for the
+    # group delay; DSP sign convention: H = (B0 + B1 z^-1 + B2 z^-2) / (1 - A1 z^-1 - A2 z^-2)
+    sections = np.asarray(sections, dtype=np.float64)
+    b0, b1, a1, b2, a2 = (sections[..., i, np.newaxis] for i in range(N_COEFFICIENTS_PER_BIQUAD))
+    z1 = np.exp(-2j * np.pi * np.asarray(freqs, dtype=np.float64) / fs)
+    z2 = z1 * z1
+    numerator = b0 + b1 * z1 + b2 * z2
+    denominator = 1 - a1 * z1 - a2 * z2
+    return numerator, denominator, b1 * z1 + 2 * b2 * z2, -a1 * z1 - 2 * a2 * z2
+
+
+def section_responses(sections, freqs, fs=SAMPLING_FREQ_DEFAULT):
+    """Complex response of each section: sections (..., 5) gives (..., n freqs)."""
+    numerator, denominator, _, _ = _polynomials(sections, freqs, fs)
+    return numerator / denominator
+
+
+def response(sections, freqs, fs=SAMPLING_FREQ_DEFAULT):
+    """Complex response of cascaded sections: sections (..., n sections, 5) gives (..., n freqs)."""
+    return np.prod(section_responses(sections, freqs, fs), axis=-2)
+
+
+def magnitude_db(h):
+    return 20 * np.log10(np.maximum(np.abs(h), 1e-15))
+
+
+def phase_deg(h):
+    """Unwrapped phase along the frequency axis."""
+    return np.degrees(np.unwrap(np.angle(h), axis=-1))
+
+
+def group_delay(sections, freqs, fs=SAMPLING_FREQ_DEFAULT):
+    """
+    Group delay in seconds of cascaded sections (..., n sections, 5), (..., n freqs): the sum over the
+    sections of Re(z P'(z) / P(z)) of the numerator minus that of the denominator, no differentiation
+    of the unwrapped phase.
+    """
+    numerator, denominator, d_numerator, d_denominator = _polynomials(sections, freqs, fs)
+    samples = np.real(d_numerator / numerator) - np.real(d_denominator / denominator)
+    return np.sum(samples, axis=-2) / fs
+
+
+def pole_radii(sections):
+    """Largest pole radius of each section (..., 5): roots of z^2 - A1 z - A2."""
+    sections = np.asarray(sections, dtype=np.float64)
+    a1 = sections[..., COEFFICIENTS_ORDER.index('A1')]
+    a2 = sections[..., COEFFICIENTS_ORDER.index('A2')]
+    root = np.sqrt((a1 * a1 + 4 * a2).astype(np.complex128))
+    return np.maximum(np.abs((a1 + root) / 2), np.abs((a1 - root) / 2))
+
+
+# verification ==============================================
+
+def grid_cutoffs(segments=FREQUENCY_GRID):
+    return np.array([cutoff for start, stop, step in segments for cutoff in range(start, stop, step)], dtype=np.float64)
+
+
+def design_grid(alignment, cutoffs, fs=SAMPLING_FREQ_DEFAULT, gain=1):
+    """
+    Designed (unquantized) sections of the lowpass and highpass at every cutoff:
+    (2, n cutoffs, n sections, 5), in the order of ('lowpass', 'highpass').
+    """
+    designer = BiquadDesigner(fs)
+    n_sections = len(ALIGNMENTS[alignment])
+    sections = [designer.coefficients([(filter_type, alignment, float(cutoff), gain) for cutoff in cutoffs])
+                for filter_type in ('lowpass', 'highpass')]
+    return np.array(sections, dtype=np.float64).reshape(2, len(cutoffs), n_sections, N_COEFFICIENTS_PER_BIQUAD)
+
+
+def verify_grid(alignment=None, n_points=N_POINTS, fs=SAMPLING_FREQ_DEFAULT, segments=FREQUENCY_GRID,
+                margin=STABILITY_MARGIN, max_deviation_db=MAX_DEVIATION_DB, max_ripple_db=MAX_RIPPLE_DB):
+    """
+    Every reachable filter of the encoder grid, quantized as the DSP holds it, over a dense log grid:
+    - stability: largest pole radius of each section against 1 - margin,
+    - deviation: quantized vs designed magnitude, where the designed one is above DEVIATION_FLOOR_DB,
+    - ripple: peak to peak magnitude of lowpass + polarity * highpass at each crossover point, checked
+      for what quantization adds to the designed one (flat for LR, a bump at the cutoff for BW2/BW4),
+    - group delay of that sum (its peak), at the lowest and highest crossover points.
+    Returns a report dict, 'ok' False if a check failed; the worst cutoff of each check is reported.
+    """
+    alignment = CrossoverService.alignment if alignment is None else alignment
+    cutoffs = grid_cutoffs(segments)
+    freqs = frequency_grid(n_points, fs=fs)
+
+    designed = design_grid(alignment, cutoffs, fs)
+    quantized = quantize(designed)
+
+    radii = pole_radii(quantized).max(axis=(0, 2))  # per cutoff, worst of both filters and all sections
+    h_designed = response(designed, freqs, fs)
+    h_quantized = response(quantized, freqs, fs)
+
+    db_designed = magnitude_db(h_designed)
+    deviation = np.where(db_designed > DEVIATION_FLOOR_DB, np.abs(magnitude_db(h_quantized) - db_designed), 0)
+    deviation = deviation.max(axis=(0, 2))
+
+    polarity = SUM_POLARITY[alignment]
+    summed = h_quantized[0] + polarity * h_quantized[1]
+    db_summed = magnitude_db(summed)
+    ripple = db_summed.max(axis=-1) - db_summed.min(axis=-1)
+    db_summed_designed = magnitude_db(h_designed[0] + polarity * h_designed[1])
+    ripple_designed = db_summed_designed.max(axis=-1) - db_summed_designed.min(axis=-1)
+    # a sum isn't a cascade: its group delay from the slope of its phase
+    delay = -np.gradient(np.unwrap(np.angle(summed[[0, -1]]), axis=-1), 2 * np.pi * freqs, axis=-1)
+
+    def worst(values, limit):
+        idx = int(np.argmax(values))
+        return {'max': float(values[idx]), 'cutoff': float(cutoffs[idx]), 'limit': limit,
+                'ok': bool(values[idx] <= limit)}
+
+    report = {
+        'alignment': alignment,
+        'n_cutoffs': len(cutoffs),
+        'n_points': n_points,
+        'pole_radius': worst(radii, 1 - margin),
+        'deviation_db': worst(deviation, max_deviation_db),
+        'ripple_db': worst(ripple - ripple_designed, max_ripple_db),
+        'designed_ripple_db': float(ripple_designed.max()),
+        'group_delay_ms': {float(cutoffs[i]): float(delay[j].max() * 1000) for j, i in enumerate((0, -1))},
+    }
+    report['ok'] = all(report[check]['ok'] for check in ('pole_radius', 'deviation_db', 'ripple_db'))
+    return report
+
+
+def verify_sections(sections, n_points=N_POINTS, fs=SAMPLING_FREQ_DEFAULT, margin=STABILITY_MARGIN):
+    """
+    Response of one channel's cascaded sections as the DSP runs them (see as_sections() for the
+    accepted forms, read_sections() to read them back). Returns the response and its stability.
+    """
+    sections = as_sections(sections)
+    freqs = frequency_grid(n_points, fs=fs)
+    h = response(sections, freqs, fs)
+    radius = float(pole_radii(sections).max())
+    return {
+        'freqs': freqs,
+        'magnitude_db': magnitude_db(h),
+        'phase_deg': phase_deg(h),
+        'group_delay_s': group_delay(sections, freqs, fs),
+        'pole_radius': radius,
+        'ok': radius <= 1 - margin,
+    }
+
+
+def print_report(report):
+    print(f"{report['alignment']}: {report['n_cutoffs']} cutoffs x {report['n_points']} points")
+    for check, unit in (('pole_radius', ''), ('deviation_db', ' dB'), ('ripple_db', ' dB')):
+        result = report[check]
+        print(f"  {check:<14}{result['max']:>12.6g}{unit:<4} (limit {result['limit']:.6g}) "
+              f"at {result['cutoff']:g} Hz  {'ok' if result['ok'] else 'FAILED'}")
+    print(f"  designed ripple of the sum: {report['designed_ripple_db']:.6g} dB max")
+    for cutoff, delay_ms in report['group_delay_ms'].items():
+        print(f"  group delay of the sum, crossover at {cutoff:g} Hz: {delay_ms:.3f} ms peak")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Verify the quantized crossover coefficients of the encoder grid.')
+    parser.add_argument('alignments', nargs='*', help=f"of {tuple(ALIGNMENTS)}, the app's by default")
+    parser.add_argument('--points', type=int, default=N_POINTS)
+    parser.add_argument('--margin', type=float, default=STABILITY_MARGIN)
+    parser.add_argument('--max-deviation', type=float, default=MAX_DEVIATION_DB)
+    parser.add_argument('--max-ripple', type=float, default=MAX_RIPPLE_DB)
+    args = parser.parse_args(argv)
+
+    ok = True
+    for alignment in args.alignments or [CrossoverService.alignment]:
+        start = time.perf_counter()
+        report = verify_grid(alignment, args.points, margin=args.margin, max_deviation_db=args.max_deviation,
+                             max_ripple_db=args.max_ripple)
+        print_report(report)
+        print(f"  {time.perf_counter() - start:.2f} s")
+        ok = ok and report['ok']
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,16 @@
-import json
+from config import PARAMS_IMAGE_PATH
+from utils.params_image import ParamsImage
 
 
 def get_params():
-    params_path = 'params/params.json'
+    """Open the compiled parameters image; cells are read from it when looked up by name."""
+    params = None
     try:
-        with open(params_path, "r") as file:
-            params = json.load(file)
-    except FileNotFoundError:
-        print(f"Error: The file {params_path} does not exist.")
-    except json.JSONDecodeError:
-        print(f"Error: The file {params_path} contains invalid JSON.")
+        params = ParamsImage.load(PARAMS_IMAGE_PATH)
+    except OSError:
+        print(f"Error: The file {PARAMS_IMAGE_PATH} does not exist, run python -m utils.build_params_image.")
+    except AssertionError as e:
+        print(f"Error: {e}")
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
-    return params
\ No newline at end of file
+    return params
@@ -0,0 +1,24 @@
+# Small, allocation-free hashes and checksums for on-flash records.
+
+FNV_OFFSET_BASIS = 0x811C9DC5
+FNV_PRIME = 0x01000193
+
+
+def fnv1a32(data):
+    """32-bit FNV-1a of bytes or str."""
+    if isinstance(data, str):
+        data = data.encode()
+    h = FNV_OFFSET_BASIS
+    for byte in data:
+        h = ((h ^ byte) * FNV_PRIME) & 0xFFFFFFFF
+    return h
+
+
+def crc16_ccitt(data, crc=0xFFFF):
+    """CRC-16/CCITT-FALSE (polynomial 0x1021) of bytes."""
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        crc &= 0xFFFF
+    return crc
@@ -0,0 +1,172 @@
+# Compact binary image of a SigmaStudio parameters export, built on the host by utils/build_params_image.py.
+import struct
+
+from utils.hashing import fnv1a32
+
+
+class ParamsCell:
+    """
+    Parameters of one SigmaStudio cell. Only this cell's index entries are held in RAM; the default
+    data is read from the image when asked for.
+
+    A parameter is found by its full name or by its name without the prefix shared by the whole cell,
+    e.g. 'B0_2' for 'CrossoverFilter2WayAlgSP1B0_2'.
+    """
+    def __init__(self, image, name, first, count):
+        self._image = image
+        self.name = name
+        self.first = first
+        self.count = count
+        self._entries = bytearray(count * image.PARAMETER_SIZE)
+        image.read_into(image.parameters_offset + first * image.PARAMETER_SIZE, self._entries)
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, parameter_name):
+        return self._find(parameter_name) is not None
+
+    def _find(self, parameter_name):
+        name_hash = fnv1a32(parameter_name)
+        entries = memoryview(self._entries)
+        for i in range(self.count):
+            full_hash, local_hash, address = struct.unpack_from(ParamsImage.PARAMETER_FORMAT, entries,
+                                                                i * ParamsImage.PARAMETER_SIZE)
+            if name_hash == full_hash or name_hash == local_hash:
+                return address
+        return None
+
+    def address(self, parameter_name):
+        """Parameter RAM address of a parameter of the cell; KeyError if there is none by that name."""
+        address = self._find(parameter_name)
+        if address is None:
+            raise KeyError('{}: no parameter {}'.format(self.name, parameter_name))
+        return address
+
+    @property
+    def addresses(self):
+        return [struct.unpack_from(ParamsImage.PARAMETER_FORMAT, self._entries, i * ParamsImage.PARAMETER_SIZE)[2]
+                for i in range(self.count)]
+
+    @property
+    def head_address(self):
+        return struct.unpack_from(ParamsImage.PARAMETER_FORMAT, self._entries, 0)[2]
+
+    @property
+    def is_contiguous(self):
+        """True if the parameters fill consecutive addresses, so default_data() is a single burst from head_address."""
+        addresses = self.addresses
+        return addresses == list(range(addresses[0], addresses[0] + self.count))
+
+    def default_data(self):
+        """Default words of the cell in address order, as exported by SigmaStudio."""
+        image = self._image
+        data = bytearray(self.count * image.n_bytes_per_parameter)
+        image.read_into(image.data_offset + self.first * image.n_bytes_per_parameter, data)
+        return data
+
+
+class ParamsImage:
+    """
+    Cells of a SigmaStudio project, read lazily from a binary image.
+
+    Layout: header, cell index sorted by cell name hash, parameter entries grouped by cell in address
+    order, then the default data of every parameter in the same order.
+    """
+    MAGIC = b'SPI'
+    VERSION = 1
+    HEADER_FORMAT = '<3sBBHH'  # magic, version, bytes per parameter, number of cells, number of parameters
+    CELL_FORMAT = '<IHH'  # cell name hash, first parameter, number of parameters
+    PARAMETER_FORMAT = '<IIH'  # name hash, hash of the name without the cell prefix, address
+    HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+    CELL_SIZE = struct.calcsize(CELL_FORMAT)
+    PARAMETER_SIZE = struct.calcsize(PARAMETER_FORMAT)
+
+    def __init__(self, file, n_bytes_per_parameter, n_cells, n_parameters, cells_index):
+        self._file = file
+        self.n_bytes_per_parameter = n_bytes_per_parameter
+        self.n_cells = n_cells
+        self.n_parameters = n_parameters
+        self._cells_index = cells_index
+        self.parameters_offset = self.HEADER_SIZE + n_cells * self.CELL_SIZE
+        self.data_offset = self.parameters_offset + n_parameters * self.PARAMETER_SIZE
+        self._cells = {}
+        self.reads = 0
+
+    @classmethod
+    def load(cls, path):
+        file = open(path, 'rb')
+        header = file.read(cls.HEADER_SIZE)
+        magic, version, n_bytes_per_parameter, n_cells, n_parameters = struct.unpack(cls.HEADER_FORMAT, header)
+        assert magic == cls.MAGIC and version == cls.VERSION, 'Not a parameters image: {}'.format(path)
+
+        cells_index = bytearray(n_cells * cls.CELL_SIZE)
+        file.readinto(cells_index)
+        return cls(file, n_bytes_per_parameter, n_cells, n_parameters, cells_index)
+
+    @staticmethod
+    def common_prefix(names):
+        prefix = names[0]
+        for name in names[1:]:
+            while not name.startswith(prefix):
+                prefix = prefix[:-1]
+        return prefix
+
+    @classmethod
+    def build(cls, path, cells):
+        """
+        cells: {cell name: [(parameter name, address, data bytes), ...]}, e.g. from
+        utils.parse_params_file_as_json.parse_params_file.
+        """
+        cells = [(fnv1a32(name), sorted(parameters, key=lambda p: p[1])) for name, parameters in cells.items()]
+        cells.sort(key=lambda cell: cell[0])
+        n_bytes_per_parameter = len(cells[0][1][0][2])
+
+        index, entries, data = [], [], []
+        for name_hash, parameters in cells:
+            index.append(struct.pack(cls.CELL_FORMAT, name_hash, len(entries), len(parameters)))
+            prefix = cls.common_prefix([p[0] for p in parameters]) if len(parameters) > 1 else ''
+            for parameter_name, address, parameter_data in parameters:
+                assert len(parameter_data) == n_bytes_per_parameter, 'Parameters of different sizes.'
+                entries.append(struct.pack(cls.PARAMETER_FORMAT, fnv1a32(parameter_name),
+                                           fnv1a32(parameter_name[len(prefix):]), address))
+                data.append(bytes(parameter_data))
+
+        with open(path, 'wb') as file:
+            file.write(struct.pack(cls.HEADER_FORMAT, cls.MAGIC, cls.VERSION, n_bytes_per_parameter,
+                                   len(index), len(entries)))
+            for chunk in index + entries + data:
+                file.write(chunk)
+
+    def read_into(self, offset, buffer):
+        self._file.seek(offset)
+        self._file.readinto(buffer)
+        self.reads += 1
+
+    def _find_cell(self, name_hash):
+        lo, hi = 0, self.n_cells
+        while lo < hi:
+            mid = (lo + hi) // 2
+            cell_hash, first, count = struct.unpack_from(self.CELL_FORMAT, self._cells_index, mid * self.CELL_SIZE)
+            if cell_hash == name_hash:
+                return first, count
+            if cell_hash < name_hash:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def __contains__(self, cell_name):
+        return self._find_cell(fnv1a32(cell_name)) is not None
+
+    def __getitem__(self, cell_name):
+        cell = self._cells.get(cell_name)
+        if cell is None:
+            found = self._find_cell(fnv1a32(cell_name))
+            if found is None:
+                raise KeyError(cell_name)
+            cell = self._cells[cell_name] = ParamsCell(self, cell_name, *found)
+        return cell
+
+    def close(self):
+        self._file.close()
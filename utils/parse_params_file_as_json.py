@@ -22,7 +22,9 @@ def parse_params_file(file_content):
         cell_name = match.group('cell_name').strip()
         parameter_info = {
             "Parameter Name": match.group('parameter_name').strip(),
-            "Parameter Address": int(match.group('parameter_address'))
+            "Parameter Address": int(match.group('parameter_address')),
+            "Parameter Value": float(match.group('parameter_value')),
+            "Parameter Data": [int(byte, 16) for byte in re.findall(r'0x[0-9A-Fa-f]{2}', match.group('parameter_data'))]
         }
         parsed_data[cell_name].append(parameter_info)
 
@@ -38,4 +40,7 @@ def main():
     with open('params/params.json', 'w') as f:
         json.dump(parameters, f)
 
-main()
+
+if __name__ == "__main__":
+    main()
+
@@ -0,0 +1,20 @@
+# time.ticks_* only exist on MicroPython; on CPython fall back to a monotonic clock.
+import time
+
+try:
+    ticks_ms = time.ticks_ms
+    ticks_us = time.ticks_us
+    ticks_add = time.ticks_add
+    ticks_diff = time.ticks_diff
+except AttributeError:
+    def ticks_ms():
+        return time.monotonic_ns() // 1000000
+
+    def ticks_us():
+        return time.monotonic_ns() // 1000
+
+    def ticks_add(ticks, delta):
+        return ticks + delta
+
+    def ticks_diff(ticks_1, ticks_2):
+        return ticks_1 - ticks_2